@@ -0,0 +1,12 @@
+-- Author: Zane Miller
+-- Email: millerzanem@gmail.com
+-- Date: 10/19/2026
+-- Description: Lets several lookup workers lease scanned_upc_codes rows (SELECT ... FOR UPDATE SKIP LOCKED needs
+-- MySQL 8.0+). Rows get a surrogate id so a worker deletes exactly the rows it leased.
+
+ALTER TABLE scanned_upc_codes
+    ADD COLUMN id BIGINT UNSIGNED NOT NULL AUTO_INCREMENT PRIMARY KEY FIRST,
+    ADD COLUMN lease_owner VARCHAR(64) NULL DEFAULT NULL,
+    ADD COLUMN lease_expires DATETIME NULL DEFAULT NULL,
+    ADD INDEX scanned_upc_codes_lease (lease_expires),
+    ADD INDEX scanned_upc_codes_upc (upc_code);
@@ -0,0 +1,25 @@
+-- Author: Zane Miller
+-- Email: millerzanem@gmail.com
+-- Date: 10/19/2026
+-- Description: Keeps one scanned_upc_codes row per barcode. Existing duplicates are folded into the oldest row with
+-- the earliest upload date and the number of copies as its scan_count, then upc_code becomes a unique key so
+-- BackEndDB.upload_upc_to_buffer() upserts repeat scans. Run after 001_scanned_upc_codes_leases.sql.
+
+ALTER TABLE scanned_upc_codes
+    ADD COLUMN scan_count INT UNSIGNED NOT NULL DEFAULT 1 AFTER date_uploaded;
+
+UPDATE scanned_upc_codes kept
+    JOIN (SELECT upc_code, MIN(id) AS kept_id, MIN(date_uploaded) AS first_uploaded, COUNT(*) AS num_copies
+          FROM scanned_upc_codes
+          GROUP BY upc_code
+          HAVING COUNT(*) > 1) copies ON kept.id = copies.kept_id
+SET kept.date_uploaded = copies.first_uploaded,
+    kept.scan_count    = copies.num_copies;
+
+DELETE duplicate
+FROM scanned_upc_codes duplicate
+    JOIN scanned_upc_codes kept ON duplicate.upc_code = kept.upc_code AND duplicate.id > kept.id;
+
+ALTER TABLE scanned_upc_codes
+    DROP INDEX scanned_upc_codes_upc,
+    ADD UNIQUE INDEX scanned_upc_codes_upc (upc_code);
@@ -0,0 +1,17 @@
+-- Author: Zane Miller
+-- Email: millerzanem@gmail.com
+-- Date: 10/19/2026
+-- Description: Indexes backing the keyset sorted /comics and /series listings (FrontEndDB.COMIC_SORTS and
+-- SERIES_SORTS). Each ends in the row id so a page starts with an index range scan right after the cursor row.
+
+ALTER TABLE Comics
+    ADD INDEX comics_title_issue (title, issueNumber, id),
+    ADD INDEX comics_issue (issueNumber, id),
+    ADD INDEX comics_series_issue (seriesId, issueNumber, id);
+
+ALTER TABLE PurchasedComics
+    ADD INDEX purchased_comics_date (purchaseDate, comicId);
+
+ALTER TABLE Series
+    ADD INDEX series_title (title, id),
+    ADD INDEX series_start_year (startYear, title, id);
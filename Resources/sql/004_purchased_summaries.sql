@@ -0,0 +1,69 @@
+-- Author: Zane Miller
+-- Email: millerzanem@gmail.com
+-- Date: 10/19/2026
+-- Description: Denormalized rows of the /comics and /series listings, kept current by BackEndDB's purchase, comic,
+-- series and image upserts (BackEndDB.refresh_purchased_summaries()) and rebuilt from scratch with
+--     python -m backend.ui_drivers.lookup_ui_driver --rebuild-summaries
+-- The listings read these tables only, so the sort indexes of 003_listing_indexes.sql move here.
+
+CREATE TABLE PurchasedComicsSummary (
+    comicId            INT          NOT NULL PRIMARY KEY,
+    title              VARCHAR(255) NULL,
+    issueNumber        FLOAT        NULL,
+    seriesId           INT          NULL,
+    seriesTitle        VARCHAR(255) NULL,
+    thumbnail          VARCHAR(255) NULL,
+    thumbnailExtension VARCHAR(45)  NULL,
+    purchaseDate       DATE         NULL,
+    purchasePrice      FLOAT        NULL,
+    purchaseType       VARCHAR(45)  NULL,
+    updated            TIMESTAMP    NOT NULL DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+    INDEX purchased_comics_summary_title (title, issueNumber, comicId),
+    INDEX purchased_comics_summary_issue (issueNumber, comicId),
+    INDEX purchased_comics_summary_date (purchaseDate, comicId),
+    INDEX purchased_comics_summary_series (seriesTitle, seriesId, issueNumber, comicId),
+    INDEX purchased_comics_summary_series_id (seriesId)
+) ENGINE = InnoDB;
+
+CREATE TABLE PurchasedSeriesSummary (
+    seriesId           INT          NOT NULL PRIMARY KEY,
+    title              VARCHAR(255) NULL,
+    startYear          INT          NULL,
+    thumbnail          VARCHAR(255) NULL,
+    thumbnailExtension VARCHAR(45)  NULL,
+    purchasedCount     INT UNSIGNED NOT NULL DEFAULT 0,
+    updated            TIMESTAMP    NOT NULL DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+    INDEX purchased_series_summary_title (title, seriesId),
+    INDEX purchased_series_summary_year (startYear, title, seriesId)
+) ENGINE = InnoDB;
+
+INSERT INTO PurchasedComicsSummary
+    (comicId, title, issueNumber, seriesId, seriesTitle, thumbnail, thumbnailExtension, purchaseDate, purchasePrice,
+     purchaseType)
+SELECT PC.comicId, C.title, C.issueNumber, C.seriesId, S.title, C.thumbnail, I.pathExtension, PC.purchaseDate,
+       PC.purchasePrice, PC.purchaseType
+FROM PurchasedComics PC
+         INNER JOIN Comics C ON C.id = PC.comicId
+         LEFT JOIN Series S ON C.seriesId = S.id
+         LEFT JOIN Images I ON C.thumbnail = I.path;
+
+INSERT INTO PurchasedSeriesSummary (seriesId, title, startYear, thumbnail, thumbnailExtension, purchasedCount)
+SELECT S.id, S.title, S.startYear, S.thumbnail, I.pathExtension, COUNT(*)
+FROM PurchasedComics PC
+         INNER JOIN Comics C ON C.id = PC.comicId
+         INNER JOIN Series S ON C.seriesId = S.id
+         LEFT JOIN Images I ON S.thumbnail = I.path
+GROUP BY S.id, S.title, S.startYear, S.thumbnail, I.pathExtension;
+
+-- only the listings sorted on these
+ALTER TABLE Comics
+    DROP INDEX comics_title_issue,
+    DROP INDEX comics_issue,
+    DROP INDEX comics_series_issue;
+
+ALTER TABLE PurchasedComics
+    DROP INDEX purchased_comics_date;
+
+ALTER TABLE Series
+    DROP INDEX series_title,
+    DROP INDEX series_start_year;
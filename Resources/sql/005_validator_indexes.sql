@@ -0,0 +1,11 @@
+-- Author: Zane Miller
+-- Email: millerzanem@gmail.com
+-- Date: 10/19/2026
+-- Description: Indexes for the ETag/Last-Modified validators of the /comics and /series listings
+-- (FrontEndDB.get_purchased_*_validator()), so MAX(updated) is read off the end of an index instead of a table scan.
+
+ALTER TABLE PurchasedComicsSummary
+    ADD INDEX purchased_comics_summary_updated (updated);
+
+ALTER TABLE PurchasedSeriesSummary
+    ADD INDEX purchased_series_summary_updated (updated);
@@ -13,19 +13,45 @@ nav.Bar(
     'top', [
         nav.Item('Home', 'index'),
         nav.Item('Comics', 'comics'),
-        nav.Item('Series', 'series')]
+        nav.Item('Series', 'series'),
+        nav.Item('Search', 'search')]
 )
 
 from config import Config
 
 app.config.from_object(Config)
 
+from app.frontendDatabase.coverStore import CoverStore
+from app.frontendDatabase.frontendCache import CachedFrontEndDB, FrontEndCache, LRUCacheBackend, \
+    MemcachedCacheBackend
 from app.frontendDatabase.frontendDB import FrontEndDB
+from app.frontendDatabase.searchIndex import SearchIndex
 from backend.backendDatabase.backendDB import BackEndDB
 from backend.classes.lookup_driver import Lookup
+from backend.classes.lookup_scheduler import ApiBudget, LookupScheduler
+from backend.classes.refresh_jobs import RefreshJobs
 
-f_db = FrontEndDB()
+if app.config['FRONTEND_CACHE_MEMCACHED']:
+    cache_host, cache_port = app.config['FRONTEND_CACHE_MEMCACHED'].rsplit(':', 1)
+    cache_backend = MemcachedCacheBackend(cache_host, int(cache_port))
+else:
+    cache_backend = LRUCacheBackend(app.config['FRONTEND_CACHE_ENTRIES'])
+
+f_db = CachedFrontEndDB(FrontEndDB(), FrontEndCache(cache_backend, app.config['FRONTEND_CACHE_TTL']))
 b_db = BackEndDB()
-lookup = Lookup(b_db)
+search_index = SearchIndex(f_db.uncached, app.config['SEARCH_REFRESH_INTERVAL'])
+b_db.add_write_listener(f_db.cache.invalidate)
+b_db.add_write_listener(search_index.mark_dirty)
+
+# lookups run on the scheduler's worker thread with their own db connection
+lookup_scheduler = LookupScheduler(Lookup(BackEndDB()), ApiBudget(app.config['LOOKUP_API_DAILY_LIMIT']))
+lookup_scheduler.lookup.db.add_write_listener(f_db.cache.invalidate)
+lookup_scheduler.lookup.db.add_write_listener(search_index.mark_dirty)
+lookup_scheduler.start()
+refresh_jobs = RefreshJobs(lookup_scheduler)
+
+# the search index load and cover prefetch are started by run.py, not on import, so flask cli commands and workers
+# don't each run them (a search loads the index itself when it hasn't been)
+cover_store = CoverStore(app.config['COVER_STORE_DIR'], app.config['COVER_STORE_HOSTS'])
 
 from app.views import *
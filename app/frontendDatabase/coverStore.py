@@ -0,0 +1,203 @@
+"""
+Author: Zane Miller
+Email: millerzanem@gmail.com
+Date: 10/19/2026
+Description: Local store of the Marvel hosted cover images at the sizes the pages show, filled lazily by the /covers
+route and in bulk by a worker pool
+"""
+from __future__ import annotations
+
+import collections
+import hashlib
+import os
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+try:
+    from PIL import Image, ImageOps
+except ImportError:  # without Pillow every size is downloaded from Marvel's own resized variants
+    Image = ImageOps = None
+
+# size name -> (Marvel image variant, (width, height))
+COVER_SIZES = {
+        'portrait_small': ('portrait_small', (50, 75)),
+        'card'          : ('portrait_medium', (100, 150)),
+        'detail'        : ('portrait_uncanny', (300, 450)),
+}
+ORIGINAL_SIZE = 'original'
+COVER_HOSTS = ('i.annihil.us',)
+COVER_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.gif')
+COVER_PREFETCH_WORKERS = 4
+COVER_FETCH_TIMEOUT = 10
+JPEG_QUALITY = 85
+
+
+def image_key(thumbnail: str, extension: str) -> str:
+    """
+    :param thumbnail: an Images.path, e.g. http://i.annihil.us/u/prod/marvel/i/mg/3/40/4bb4680432f73
+    :param extension: its Images.pathExtension, e.g. .jpg
+    :return: the image's key in the store and /covers urls, e.g. i.annihil.us/u/prod/marvel/i/mg/3/40/4bb4680432f73.jpg
+    """
+    return thumbnail.split('://', 1)[-1] + extension
+
+
+def purchased_cover_keys(front_end_db) -> list[str]:
+    """ :return: image_key()s of the purchased comic and series covers, what a prefetch stores """
+    return [image_key(row['thumbnail'], row['thumbnailExtension']) for row in front_end_db.get_purchased_covers()]
+
+
+class CoverStore:
+    """
+    Cover images on disk under root/<size>/, one file per image key and size. A missing size is made from the
+    stored original with Pillow (or downloaded from Marvel's resized variant without it) the first time it's asked
+    for. Files are written to a temporary name and renamed, so concurrent requests never see half a file.
+    """
+
+    def __init__(self, root: str, hosts=COVER_HOSTS, timeout: int = COVER_FETCH_TIMEOUT):
+        """
+        :param root: directory the images are stored in
+        :param hosts: image hosts the store fetches from, any other key is refused
+        :param timeout: seconds to wait on an image download
+        """
+        self.root = root
+        self.hosts = tuple(hosts)
+        self.timeout = timeout
+
+        self._sessions = threading.local()  # one requests.Session per thread
+        self._prefetch_lock = threading.Lock()
+
+    def is_storable(self, key: str) -> bool:
+        """ :return: True if the key is an image on one of the store's hosts """
+        host, _, path = key.partition('/')
+        return host in self.hosts and os.path.splitext(path)[1].lower() in COVER_EXTENSIONS \
+            and '..' not in path.split('/') and not any(character in key for character in '?#\\')
+
+    def source_url(self, key: str, size: str) -> str:
+        """ :return: the Marvel url of the image at a COVER_SIZES size (or ORIGINAL_SIZE) """
+        base, extension = os.path.splitext(key)
+        if size == ORIGINAL_SIZE:
+            return f"https://{base}{extension}"
+        return f"https://{base}/{COVER_SIZES[size][0]}{extension}"
+
+    def get_cover(self, key: str, size: str) -> str | None:
+        """
+        Gets the file of an image at a size, making it first if it isn't stored yet
+        :param key: image_key() of the image
+        :param size: a COVER_SIZES name
+        :return: path of the file, None if it couldn't be fetched
+        :raises ValueError: unknown size or an image the store doesn't fetch
+        """
+        if size not in COVER_SIZES:
+            raise ValueError(f"unknown cover size {size!r}")
+        if not self.is_storable(key):
+            raise ValueError(f"not a storable cover {key!r}")
+
+        file_path = self._file_path(key, size)
+        if os.path.exists(file_path):
+            return file_path
+
+        try:
+            if Image is not None:
+                self._resize(self._get_original(key), file_path, COVER_SIZES[size][1])
+            else:
+                self._download(self.source_url(key, size), file_path)
+        except (requests.RequestException, OSError) as e:
+            print(f"COVER {key} {size} NOT STORED: {e}")
+            return None
+        return file_path
+
+    def prefetch(self, keys, sizes=tuple(COVER_SIZES), workers: int = COVER_PREFETCH_WORKERS) -> dict[str, int]:
+        """
+        Stores every size of many images with a pool of download threads. One prefetch runs at a time.
+        :param keys: image_key()s of the images
+        :param sizes: COVER_SIZES names to store
+        :param workers: download threads
+        :return: {'stored': files made, 'cached': files already stored, 'failed': files that couldn't be fetched,
+        'skipped': keys the store doesn't fetch}
+        """
+        counts = collections.Counter(stored=0, cached=0, failed=0, skipped=0)
+        keys = list(dict.fromkeys(keys))
+
+        def store(key: str) -> collections.Counter:
+            key_counts = collections.Counter()
+            if not self.is_storable(key):
+                key_counts['skipped'] += 1
+                return key_counts
+
+            for size in sizes:
+                if os.path.exists(self._file_path(key, size)):
+                    key_counts['cached'] += 1
+                else:
+                    key_counts['stored' if self.get_cover(key, size) is not None else 'failed'] += 1
+            return key_counts
+
+        with self._prefetch_lock, ThreadPoolExecutor(max_workers=workers, thread_name_prefix='CoverPrefetch') as pool:
+            for key_counts in pool.map(store, keys):
+                counts.update(key_counts)
+
+        return dict(counts)
+
+    def start_prefetch(self, app, load_keys, workers: int = COVER_PREFETCH_WORKERS):
+        """
+        Runs prefetch() on a background thread so startup doesn't wait for it
+        :param app: the flask app whose context load_keys runs in
+        :param load_keys: function returning the image_key()s to prefetch
+        :param workers: download threads
+        """
+        def prefetch():
+            with app.app_context():
+                try:
+                    counts = self.prefetch(load_keys(), workers=workers)
+                except Exception as e:
+                    print(f"COVER PREFETCH STOPPED: {e}")
+                    return
+            print(f"COVER PREFETCH DONE: {counts}")
+
+        threading.Thread(target=prefetch, name="CoverPrefetch", daemon=True).start()
+
+    def _file_path(self, key: str, size: str) -> str:
+        """ root/<size>/<2 hex>/<sha1 of the key><extension>, so no key can point outside the store """
+        digest = hashlib.sha1(key.encode()).hexdigest()
+        return os.path.join(self.root, size, digest[:2], digest + os.path.splitext(key)[1].lower())
+
+    def _get_original(self, key: str) -> str:
+        """ :return: path of the full size image, downloaded once for all its sizes """
+        file_path = self._file_path(key, ORIGINAL_SIZE)
+        if not os.path.exists(file_path):
+            self._download(self.source_url(key, ORIGINAL_SIZE), file_path)
+        return file_path
+
+    def _download(self, url: str, file_path: str):
+        session = getattr(self._sessions, 'session', None)
+        if session is None:
+            session = self._sessions.session = requests.Session()
+
+        response = session.get(url, timeout=self.timeout)
+        response.raise_for_status()
+        self._write(file_path, lambda file: file.write(response.content))
+
+    def _resize(self, original_path: str, file_path: str, size: tuple[int, int]):
+        """ Crops and scales the original to size, the way Marvel's portrait variants are """
+        with Image.open(original_path) as original:
+            image = ImageOps.fit(original, size, Image.LANCZOS)
+            image_format = original.format
+
+        if image_format == 'JPEG' and image.mode not in ('RGB', 'L'):
+            image = image.convert('RGB')
+        self._write(file_path, lambda file: image.save(file, format=image_format, quality=JPEG_QUALITY))
+
+    @staticmethod
+    def _write(file_path: str, write):
+        """ Writes a file through a temporary one in the same directory and renames it into place """
+        os.makedirs(os.path.dirname(file_path), exist_ok=True)
+        descriptor, temp_path = tempfile.mkstemp(dir=os.path.dirname(file_path), suffix='.tmp')
+        try:
+            with os.fdopen(descriptor, 'wb') as file:
+                write(file)
+            os.replace(temp_path, file_path)
+        except BaseException:
+            os.unlink(temp_path)
+            raise
@@ -0,0 +1,309 @@
+"""
+Author: Zane Miller
+Email: millerzanem@gmail.com
+Date: 10/19/2026
+Description: Read-through cache for the FrontEndDB page getters, invalidated by BackEndDB writes
+"""
+from __future__ import annotations
+
+import collections
+import inspect
+import pickle
+import threading
+import time
+
+from backend.backendDatabase.backendDB import BackEndDB
+
+DEFAULT_CACHE_TTL = 300
+DEFAULT_CACHE_ENTRIES = 1024
+ALL_IDS = '*'
+WRITE_SEQUENCE_TAG = 'frontend:writes'  # bumped by every invalidation
+COMIC = BackEndDB.COMIC_ENTITY
+PURCHASED = BackEndDB.PURCHASED_COMICS_ENTITY
+SERIES = BackEndDB.SERIES_ENTITY
+
+
+def entity_tag(entity: str, entity_id) -> str:
+    """
+    :param entity: entity table name, e.g. BackEndDB.COMIC_ENTITY
+    :param entity_id: the record's id, or ALL_IDS for the whole table
+    :return: the tag cached results that show this record are stored under
+    """
+    return f"{entity}:{entity_id}"
+
+
+class LRUCacheBackend:
+    """
+    In-process cache: least recently used entries are evicted past max_entries and every entry expires after its ttl.
+    Tag versions are kept apart from the entries so evicting them can never make a stale entry look current.
+    """
+
+    def __init__(self, max_entries: int = DEFAULT_CACHE_ENTRIES):
+        """
+        :param max_entries: entries kept before the least recently used is evicted
+        """
+        self.max_entries = max_entries
+        self._entries = collections.OrderedDict()  # (entries[key] = (expires, value))
+        self._tag_versions = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: str):
+        """
+        :return: the value, None if missing or expired
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry[0] < time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return entry[1]
+
+    def set(self, key: str, value, ttl: int):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def get_tag_versions(self, tags) -> dict[str, int]:
+        with self._lock:
+            return {tag: self._tag_versions.get(tag, 0) for tag in tags}
+
+    def bump_tags(self, tags):
+        with self._lock:
+            for tag in tags:
+                self._tag_versions[tag] = self._tag_versions.get(tag, 0) + 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+class MemcachedCacheBackend:
+    """
+    Cache shared through a local memcached daemon, so several app processes see each other's invalidations.
+    Needs pymemcache (pip install pymemcache).
+    """
+
+    def __init__(self, host: str = '127.0.0.1', port: int = 11211):
+        from pymemcache.client.base import Client
+
+        self._client = Client((host, port), connect_timeout=1, timeout=1)
+
+    def get(self, key: str):
+        return self._client.get(key)
+
+    def set(self, key: str, value, ttl: int):
+        self._client.set(key, value, expire=ttl)
+
+    def get_tag_versions(self, tags) -> dict[str, int]:
+        tags = list(tags)
+        versions = self._client.get_many([f"tag:{tag}" for tag in tags])
+        return {tag: int(versions.get(f"tag:{tag}", 0)) for tag in tags}
+
+    def bump_tags(self, tags):
+        for tag in tags:
+            # a tag memcached evicted restarts at the current time so it never matches an old version again
+            if self._client.incr(f"tag:{tag}", 1) is None:
+                self._client.set(f"tag:{tag}", str(time.time_ns()))
+
+    def clear(self):
+        self._client.flush_all()
+
+
+class FrontEndCache:
+    """
+    Read-through cache keyed by method and arguments. Each result is stored with the versions of the tags (entity
+    records) it shows; invalidating a tag bumps its version so every result showing that record misses next time.
+    Values are pickled so callers never share (and mutate) the cached objects.
+    """
+
+    def __init__(self, backend=None, ttl: int = DEFAULT_CACHE_TTL):
+        """
+        :param backend: LRUCacheBackend (default) or MemcachedCacheBackend
+        :param ttl: seconds a result is kept, which also bounds how stale writes from other processes can get
+        """
+        self.backend = backend if backend is not None else LRUCacheBackend()
+        self.ttl = ttl
+
+        self._stats_lock = threading.Lock()
+        self._hits = collections.Counter()
+        self._misses = collections.Counter()
+        self._invalidations = 0
+
+    def get_or_load(self, method_name: str, args: tuple, loader, tags_for, version: str = None):
+        """
+        Returns the cached result of method_name(*args), calling loader() on a miss
+        :param method_name: name of the cached method
+        :param args: its arguments, part of the key
+        :param loader: function computing the result
+        :param tags_for: function(args, result) -> tags the result shows
+        :param version: optional validator of the data the result must show (e.g. a page's ETag), part of the key
+        :return: the result
+        """
+        key = f"frontend:{method_name}:{':'.join(str(arg) for arg in args)}"
+        if version is not None:
+            key += f"@{version}"
+
+        cached = self.backend.get(key)
+        if cached is not None:
+            value, tag_versions = pickle.loads(cached)
+            if self.backend.get_tag_versions(tag_versions) == tag_versions:
+                self._count(self._hits, method_name)
+                return value
+
+        self._count(self._misses, method_name)
+
+        # a write while loading could be missing from the result, so it isn't cached then
+        write_sequence = self.backend.get_tag_versions([WRITE_SEQUENCE_TAG])
+        value = loader()
+        tag_versions = self.backend.get_tag_versions(tags_for(args, value))
+
+        if self.backend.get_tag_versions([WRITE_SEQUENCE_TAG]) == write_sequence:
+            self.backend.set(key, pickle.dumps((value, tag_versions)), self.ttl)
+
+        return value
+
+    def invalidate(self, entity: str, entity_id=None):
+        """
+        Invalidates every result showing a record, and every list of that entity. Registered as a BackEndDB write
+        listener.
+        :param entity: entity table name, e.g. BackEndDB.COMIC_ENTITY
+        :param entity_id: the record's id, None invalidates the whole entity
+        """
+        tags = {entity_tag(entity, ALL_IDS), WRITE_SEQUENCE_TAG}
+        if entity_id is not None:
+            tags.add(entity_tag(entity, entity_id))
+            # PurchasedComics rows are keyed by comic id and shown on the comic's page
+            if entity == PURCHASED:
+                tags.add(entity_tag(COMIC, entity_id))
+
+        self.backend.bump_tags(tags)
+        with self._stats_lock:
+            self._invalidations += 1
+
+    def get_stats(self) -> dict:
+        """
+        :return: {'hits', 'misses', 'hit_ratio', 'invalidations', 'methods': {method: {'hits', 'misses', 'hit_ratio'}}}
+        """
+        with self._stats_lock:
+            methods = {
+                    method: self._ratio(self._hits[method], self._misses[method])
+                    for method in sorted(set(self._hits) | set(self._misses))
+            }
+            stats = self._ratio(sum(self._hits.values()), sum(self._misses.values()))
+            stats['invalidations'] = self._invalidations
+
+        stats['methods'] = methods
+        return stats
+
+    def _count(self, counter: collections.Counter, method_name: str):
+        with self._stats_lock:
+            counter[method_name] += 1
+
+    @staticmethod
+    def _ratio(hits: int, misses: int) -> dict:
+        hit_ratio = round(hits / (hits + misses), 3) if hits + misses else None
+        return {'hits': hits, 'misses': misses, 'hit_ratio': hit_ratio}
+
+
+def _result_tags(result) -> set[str]:
+    """ Tags of every FrontEndEntity in a getter's result (a model, a list of them or a get_comic_page() dict) """
+    if isinstance(result, dict):
+        results = result.values()
+    elif isinstance(result, list):
+        results = result
+    else:
+        results = [result]
+
+    tags = set()
+    for item in results:
+        if isinstance(item, list):
+            tags |= _result_tags(item)
+        elif getattr(item, 'ENTITY', None) is not None and getattr(item, 'id', None) is not None:
+            tags.add(entity_tag(item.ENTITY, item.id))
+            # the interior story hangs off the cover story
+            if getattr(item, 'interiorStory', None) is not None:
+                tags |= _result_tags(item.interiorStory)
+
+    return tags
+
+
+def _tags_for(owner_entity: str = None, *list_entities: str):
+    """
+    Builds the tags_for function of a cached getter
+    :param owner_entity: entity whose id is the getter's first argument, None for list getters without arguments
+    :param list_entities: entities whose lists the result depends on (any write to them invalidates it)
+    """
+    def tags_for(args: tuple, result) -> set[str]:
+        tags = _result_tags(result) | {entity_tag(entity, ALL_IDS) for entity in list_entities}
+        if owner_entity is not None:
+            tags.add(entity_tag(owner_entity, args[0]))
+        return tags
+
+    return tags_for
+
+
+class CachedFrontEndDB:
+    """
+    FrontEndDB with its page getters read through a FrontEndCache. Other attributes pass straight through, and the
+    wrapped FrontEndDB stays reachable as .uncached.
+    """
+    CACHED_METHODS = {
+            'get_purchased_comics'               : _tags_for(None, COMIC, PURCHASED),
+            'get_purchased_comics_related_series': _tags_for(None, COMIC, PURCHASED, SERIES),
+            'get_purchased_comics_page'          : _tags_for(None, COMIC, PURCHASED, SERIES),
+            'get_purchased_series_page'          : _tags_for(None, COMIC, PURCHASED, SERIES),
+            'get_comic_page'                     : _tags_for(COMIC),
+            'get_single_comic_detail'            : _tags_for(COMIC),
+            'get_comic_characters'               : _tags_for(COMIC),
+            'get_comic_creators'                 : _tags_for(COMIC),
+            'get_comic_events'                   : _tags_for(COMIC),
+            'get_comic_images'                   : _tags_for(COMIC),
+            'get_comic_stories'                  : _tags_for(COMIC),
+            'get_comic_variants'                 : _tags_for(COMIC),
+            'get_single_series_detail'           : _tags_for(SERIES),
+            'get_series_characters'              : _tags_for(SERIES),
+            'get_series_events'                  : _tags_for(SERIES),
+    }
+
+    def __init__(self, front_end_db, cache: FrontEndCache, version: str = None):
+        """
+        :param front_end_db: the FrontEndDB to read through
+        :param cache: the cache the results are kept in
+        :param version: validator the cached results are keyed under, see validated()
+        """
+        self.uncached = front_end_db
+        self.cache = cache
+        self.version = version
+
+    def validated(self, version: str) -> CachedFrontEndDB:
+        """
+        Results read through the returned view are only shared with calls made under the same version. A page whose
+        ETag was just read from the database renders from it, so a result cached before another process's write
+        (which this process's invalidations never saw) can't go out under the newer ETag.
+        :param version: validator of the data the page shows, e.g. its ETag
+        :return: a CachedFrontEndDB on the same FrontEndDB and cache
+        """
+        return CachedFrontEndDB(self.uncached, self.cache, version)
+
+    def __getattr__(self, name):
+        attribute = getattr(self.uncached, name)
+        if name not in self.CACHED_METHODS:
+            return attribute
+
+        signature = inspect.signature(attribute)
+
+        def cached_getter(*args, **kwargs):
+            # keyword and positional calls (and omitted defaults) share one key, keyword-only arguments are appended
+            # sorted. Arguments the getter doesn't take raise TypeError here, before anything is cached.
+            bound = signature.bind(*args, **kwargs)
+            bound.apply_defaults()
+            key_args = bound.args + tuple(sorted(bound.kwargs.items()))
+            return self.cache.get_or_load(name, key_args, lambda: attribute(*bound.args, **bound.kwargs),
+                                          self.CACHED_METHODS[name], self.version)
+
+        return cached_getter
@@ -1,3 +1,8 @@
+from __future__ import annotations
+
+import base64
+import json
+
 from app import mysqldb
 from app.frontendModels.Character import FrontEndCharacter
 from app.frontendModels.Comic import FrontEndComic
@@ -24,6 +29,17 @@ class FrontEndDB:
     PURCHASED_COMICS_ENTITY = 'PurchasedComics'
     ENTITIES = (CHARACTER_ENTITY, COMIC_ENTITY, CREATOR_ENTITY, EVENT_ENTITY, IMAGE_ENTITY,
                 SERIES_ENTITY, STORY_ENTITY, URL_ENTITY, PURCHASED_COMICS_ENTITY)
+    # URLs.type (lower case) -> attribute name on the front end models
+    URL_COLUMNS = {'purchase': 'purchaseURL', 'detail': 'detailURL', 'comiclink': 'comicLink', 'reader': 'readerURL',
+                   'inapplink': 'inAppLink', 'wiki': 'wiki'}
+    # entity -> (*_has_URLs table, id column)
+    URL_TABLES = {
+            CHARACTER_ENTITY: ('Characters_has_URLs', 'characterId'),
+            COMIC_ENTITY    : ('Comics_has_URLs', 'comicId'),
+            CREATOR_ENTITY  : ('Creators_has_URLs', 'creatorId'),
+            EVENT_ENTITY    : ('Events_has_URLs', 'eventId'),
+            SERIES_ENTITY   : ('Series_has_URLs', 'seriesId'),
+    }
 
     def __init__(self):
         self.mysql = mysqldb
@@ -66,174 +82,353 @@ class FrontEndDB:
         cursor.execute(query, params)
         return [FrontEndSeries(series) for series in cursor]
 
+    ##################################################################################################
+    #
+    #           LISTING PAGES
+    #
+    ##################################################################################################
+    LISTING_PAGE_SIZE = 50
+    LISTING_MAX_PAGE_SIZE = 200
+    # sort name -> ((sql expression, row key), ...) ordered by, ending in a unique id. The listings read the summary
+    # tables BackEndDB keeps up to date, each sort is one of their indexes (see 004_purchased_summaries.sql)
+    COMIC_SORTS = {
+            'title'    : (('PCS.title', 'title'), ('PCS.issueNumber', 'issueNumber'), ('PCS.comicId', 'id')),
+            'issue'    : (('PCS.issueNumber', 'issueNumber'), ('PCS.comicId', 'id')),
+            'purchased': (('PCS.purchaseDate', 'purchaseDate'), ('PCS.comicId', 'id')),
+            'series'   : (('PCS.seriesTitle', 'seriesTitle'), ('PCS.seriesId', 'seriesId'),
+                          ('PCS.issueNumber', 'issueNumber'), ('PCS.comicId', 'id')),
+    }
+    SERIES_SORTS = {
+            'title': (('PSS.title', 'title'), ('PSS.seriesId', 'id')),
+            'year' : (('PSS.startYear', 'startYear'), ('PSS.title', 'title'), ('PSS.seriesId', 'id')),
+    }
+    DEFAULT_SORT = 'title'
+
+    def get_purchased_comics_page(self, sort: str = DEFAULT_SORT, descending: bool = False, after: str = None,
+                                  before: str = None, limit: int = LISTING_PAGE_SIZE) -> dict:
+        """
+        Gets one page of purchased comics and their id, title, issue number, thumbnail from PurchasedComicsSummary
+        :param sort: a COMIC_SORTS key
+        :param descending: sort descending
+        :param after: 'next' cursor of the previous page, returns the page after it
+        :param before: 'previous' cursor of the next page, returns the page before it
+        :param limit: comics per page, at most LISTING_MAX_PAGE_SIZE
+        :return: {'items': [FrontEndComic], 'previous': cursor | None, 'next': cursor | None}
+        :raises ValueError: unknown sort or invalid cursor
+        """
+        query = \
+            "SELECT PCS.comicId AS id, PCS.* " \
+            "FROM PurchasedComicsSummary PCS "
+
+        page = self._get_listing_page(query, self.COMIC_SORTS, sort, descending, after, before, limit)
+        page['items'] = [FrontEndComic(comic) for comic in page['items']]
+        return page
+
+    def get_purchased_series_page(self, sort: str = DEFAULT_SORT, descending: bool = False, after: str = None,
+                                  before: str = None, limit: int = LISTING_PAGE_SIZE) -> dict:
+        """
+        Gets one page of the series related to purchased comics and their id, title, thumbnail from
+        PurchasedSeriesSummary
+        :param sort: a SERIES_SORTS key
+        :param descending: sort descending
+        :param after: 'next' cursor of the previous page, returns the page after it
+        :param before: 'previous' cursor of the next page, returns the page before it
+        :param limit: series per page, at most LISTING_MAX_PAGE_SIZE
+        :return: {'items': [FrontEndSeries], 'previous': cursor | None, 'next': cursor | None}
+        :raises ValueError: unknown sort or invalid cursor
+        """
+        query = \
+            "SELECT PSS.seriesId AS id, PSS.* " \
+            "FROM PurchasedSeriesSummary PSS "
+
+        page = self._get_listing_page(query, self.SERIES_SORTS, sort, descending, after, before, limit)
+        page['items'] = [FrontEndSeries(series) for series in page['items']]
+        return page
+
+    def _get_listing_page(self, base_query: str, sorts: dict, sort: str, descending: bool, after: str | None,
+                          before: str | None, limit: int) -> dict:
+        """
+        Runs one keyset page of a listing: the rows after (or before) the cursor row in sort order, so every page
+        is an index range scan of limit + 1 rows however deep it is
+        :param base_query: SELECT ... FROM ... [WHERE ...] of the listing, without ORDER BY
+        :return: {'items': [row], 'previous': cursor | None, 'next': cursor | None}
+        """
+        if sort not in sorts:
+            raise ValueError(f"unknown sort {sort!r}")
+        columns = sorts[sort]
+        limit = max(1, min(int(limit), self.LISTING_MAX_PAGE_SIZE))
+
+        # a page before the cursor is read in reverse order and flipped back
+        backwards = before is not None
+        cursor_values = self._decode_cursor(before if backwards else after, sort, descending, len(columns))
+        scan_descending = descending != backwards
+
+        query = base_query
+        params = []
+        if cursor_values is not None:
+            keyset, params = self._keyset_condition(columns, cursor_values, scan_descending)
+            query += ("AND " if " WHERE " in base_query else "WHERE ") + keyset + " "
+
+        direction = "DESC" if scan_descending else "ASC"
+        query += f"ORDER BY {', '.join(f'{column} {direction}' for column, _ in columns)} LIMIT %s;"
+        params.append(limit + 1)
+
+        cursor = self.mysql.connection.cursor()
+        cursor.execute(query, tuple(params))
+        rows = list(cursor)
+
+        has_more = len(rows) > limit
+        rows = rows[:limit]
+        if backwards:
+            rows.reverse()
+
+        def make_cursor(row):
+            return self._encode_cursor([row[key] for _, key in columns], sort, descending)
+
+        has_previous = has_more if backwards else cursor_values is not None
+        has_next = cursor_values is not None if backwards else has_more
+        return {
+                'items'   : rows,
+                'previous': make_cursor(rows[0]) if rows and has_previous else None,
+                'next'    : make_cursor(rows[-1]) if rows and has_next else None,
+        }
+
+    @staticmethod
+    def _keyset_condition(columns, values: list, descending: bool) -> tuple[str, list]:
+        """
+        Builds the WHERE condition selecting the rows after values in (columns) order. MySQL sorts NULLs first
+        ascending and last descending, so a NULL column value compares accordingly instead of matching nothing.
+        :return: (condition, params)
+        """
+        def after(column, value):
+            if value is None:
+                return ("FALSE", []) if descending else (f"{column} IS NOT NULL", [])
+            if descending:
+                return f"({column} < %s OR {column} IS NULL)", [value]
+            return f"{column} > %s", [value]
+
+        def equal(column, value):
+            return (f"{column} IS NULL", []) if value is None else (f"{column} = %s", [value])
+
+        terms = []
+        params = []
+        for i, ((column, _), value) in enumerate(zip(columns, values)):
+            parts = [equal(prev_column, prev_value) for (prev_column, _), prev_value in zip(columns[:i], values[:i])]
+            parts.append(after(column, value))
+            terms.append("(" + " AND ".join(part for part, _ in parts) + ")")
+            params += [param for _, part_params in parts for param in part_params]
+
+        return "(" + " OR ".join(terms) + ")", params
+
+    @staticmethod
+    def _encode_cursor(values: list, sort: str, descending: bool) -> str:
+        """ Opaque url safe page cursor holding the sort values of a page's first or last row """
+        cursor = json.dumps([sort, descending, values], default=str, separators=(',', ':'))
+        return base64.urlsafe_b64encode(cursor.encode()).decode().rstrip('=')
+
+    @staticmethod
+    def _decode_cursor(cursor: str | None, sort: str, descending: bool, num_values: int) -> list | None:
+        """
+        :return: the sort values in a cursor made by _encode_cursor(), None for no cursor
+        :raises ValueError: the cursor is malformed or belongs to another sort order
+        """
+        if cursor is None:
+            return None
+
+        try:
+            cursor_sort, cursor_descending, values = json.loads(
+                    base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+            )
+        except (TypeError, ValueError):
+            raise ValueError(f"invalid cursor {cursor!r}")
+
+        if not isinstance(values, list) or len(values) != num_values \
+                or cursor_sort != sort or cursor_descending != descending:
+            raise ValueError("cursor belongs to another sort order")
+        return values
+
+    ##################################################################################################
+    #
+    #           SEARCH
+    #
+    ##################################################################################################
+    # entity -> SELECT of the (id, title, text, updated) documents app/frontendDatabase/searchIndex.py indexes
+    SEARCH_QUERIES = {
+            COMIC_ENTITY    : "SELECT id, title, description AS text, updated FROM Comics ",
+            SERIES_ENTITY   : "SELECT id, title, NULL AS text, updated FROM Series ",
+            CHARACTER_ENTITY: "SELECT id, Characters.name AS title, NULL AS text, updated FROM Characters ",
+            CREATOR_ENTITY  : "SELECT id, CONCAT_WS(' ', firstName, middleName, lastName, suffix) AS title, "
+                              "NULL AS text, updated FROM Creators ",
+    }
+
+    def get_search_documents(self, entity: str, updated_since=None, entity_ids=None) -> list[dict]:
+        """
+        Gets the searchable text of an entity's records
+        :param entity: a SEARCH_QUERIES key
+        :param updated_since: only records updated at or after this datetime
+        :param entity_ids: only these records
+        :return: [{'id', 'title', 'text', 'updated'}], text is the raw description (bytes) or None
+        """
+        query = self.SEARCH_QUERIES[entity]
+        params = ()
+        if updated_since is not None:
+            query += "WHERE updated >= %s"
+            params = (updated_since,)
+        elif entity_ids is not None:
+            if not entity_ids:
+                return []
+            query += f"WHERE id IN ({', '.join(['%s'] * len(entity_ids))})"
+            params = tuple(entity_ids)
+
+        cursor = self.mysql.connection.cursor()
+        cursor.execute(query + ";", params)
+        return list(cursor)
+
     ##################################################################################################
     #
     #           COMIC DETAIL PAGE
     #
     ##################################################################################################
+    COMIC_DETAIL_QUERY = \
+        "SELECT Comics.*, PurchasedComics.*, Images.pathExtension AS thumbnailExtension " \
+        "FROM Comics " \
+        "LEFT JOIN Images " \
+        "ON Comics.thumbnail = Images.path " \
+        "LEFT JOIN PurchasedComics " \
+        "ON Comics.id = PurchasedComics.comicId " \
+        "WHERE Comics.id=%s;"
+    COMIC_CHARACTERS_QUERY = \
+        "SELECT Cha.*, I.pathExtension as thumbnailExtension " \
+        "FROM Comics_has_Characters ChCha " \
+        "LEFT JOIN Characters Cha " \
+        "on ChCha.characterId = Cha.id " \
+        "LEFT JOIN Images I " \
+        "on Cha.thumbnail = I.path " \
+        "WHERE ChCha.comicId=%s;"
+    COMIC_CREATORS_QUERY = \
+        "SELECT ChCr.creatorRole as role, Cr.*, I.pathExtension as thumbnailExtension " \
+        "FROM Comics_has_Creators ChCr " \
+        "INNER JOIN Creators Cr " \
+        "ON ChCr.creatorId = Cr.id " \
+        "LEFT JOIN Images I " \
+        "ON Cr.thumbnail = I.path " \
+        "WHERE ChCr.comicId=%s;"
+    COMIC_EVENTS_QUERY = \
+        "SELECT E.*, I.pathExtension as thumbnailExtension " \
+        "FROM Comics_has_Events ChE " \
+        "LEFT JOIN Events E " \
+        "on ChE.eventId = E.id " \
+        "LEFT JOIN Images I " \
+        "on E.thumbnail = I.path " \
+        "WHERE ChE.comicId=%s;"
+    COMIC_IMAGES_QUERY = \
+        "SELECT ChI.imagePath as thumbnail, I.pathExtension as thumbnailExtension " \
+        "FROM Comics_has_Images ChI " \
+        "LEFT JOIN Images I " \
+        "on ChI.imagePath = I.path " \
+        "WHERE ChI.comicId = %s;"
+    # cover and interior stories in one query, split by type in _make_story_detail()
+    COMIC_STORIES_QUERY = \
+        "SELECT Stories.*, I.pathExtension AS thumbnailExtension from Comics_has_Stories ChS " \
+        "INNER JOIN Stories " \
+        "ON ChS.storyId = Stories.id AND Stories.type IN ('cover', 'interiorStory', 'story') " \
+        "LEFT JOIN Images I " \
+        "on Stories.thumbnail = I.path " \
+        "WHERE ChS.comicId=%s;"
+    COMIC_VARIANTS_QUERY = \
+        "SELECT C.*, I.pathExtension as thumbnailExtension " \
+        "FROM Comics_has_Variants ChV " \
+        "INNER JOIN Comics C " \
+        "on ChV.variantId = C.id " \
+        "LEFT JOIN Images I " \
+        "on C.thumbnail = I.path " \
+        "WHERE ChV.comicId = %s;"
+
+    def get_comic_page(self, comic_id: int) -> dict | None:
+        """
+        Loads everything the comic detail page renders on one cursor: the comic, its series, the related lists and
+        one UNION ALL query for the urls of every entity on the page
+        :param comic_id: the id of the comic
+        :return: render_template keyword arguments (comic_data, series_data, story_data, creator_data, event_data,
+        character_data, variant_data, image_data), None if there is no such comic
+        """
+        cursor = self.mysql.connection.cursor()
+        params = (comic_id,)
+
+        cursor.execute(self.COMIC_DETAIL_QUERY, params)
+        comic_row = cursor.fetchone()
+        if comic_row is None:
+            return None
+
+        series_row = None
+        if comic_row['seriesId'] is not None:
+            cursor.execute(self.SERIES_DETAIL_QUERY, (comic_row['seriesId'],))
+            series_row = cursor.fetchone()
+
+        related_rows = {}
+        for name, query in (('characters', self.COMIC_CHARACTERS_QUERY), ('creators', self.COMIC_CREATORS_QUERY),
+                            ('events', self.COMIC_EVENTS_QUERY), ('variants', self.COMIC_VARIANTS_QUERY),
+                            ('images', self.COMIC_IMAGES_QUERY), ('stories', self.COMIC_STORIES_QUERY)):
+            cursor.execute(query, params)
+            related_rows[name] = cursor.fetchall()
+
+        urls = self.get_urls(cursor, {
+                self.COMIC_ENTITY    : [comic_id] + [variant['id'] for variant in related_rows['variants']],
+                self.CHARACTER_ENTITY: [character['id'] for character in related_rows['characters']],
+                self.CREATOR_ENTITY  : [creator['id'] for creator in related_rows['creators']],
+                self.EVENT_ENTITY    : [event['id'] for event in related_rows['events']],
+                self.SERIES_ENTITY   : [series_row['id']] if series_row is not None else [],
+        })
+        no_urls = dict.fromkeys(self.URL_COLUMNS.values())
+
+        def with_urls(entity: str, row: dict) -> dict:
+            return {**row, **urls[entity].get(row['id'], no_urls)}
+
+        comic_detail = FrontEndComic(comic_row)
+        comic_detail.update_attributes(urls[self.COMIC_ENTITY][comic_id])
+        story_details = self._make_story_detail(related_rows['stories'])
+
+        return {
+                'comic_data'    : comic_detail,
+                'series_data'   : FrontEndSeries(with_urls(self.SERIES_ENTITY, series_row)) if series_row else {},
+                'story_data'    : story_details[0] if story_details else None,
+                'creator_data'  : [FrontEndCreator(with_urls(self.CREATOR_ENTITY, row))
+                                   for row in related_rows['creators']],
+                'event_data'    : [FrontEndEvent(with_urls(self.EVENT_ENTITY, row)) for row in related_rows['events']],
+                'character_data': [FrontEndCharacter(with_urls(self.CHARACTER_ENTITY, row))
+                                   for row in related_rows['characters']],
+                'variant_data'  : [FrontEndComic(with_urls(self.COMIC_ENTITY, row))
+                                   for row in related_rows['variants']],
+                'image_data'    : [FrontEndImage(row) for row in related_rows['images']],
+        }
+
     def get_comic_characters(self, comic_id: int) -> list[FrontEndCharacter]:
         """ Get the Event records for the related comic """
         cursor = self.mysql.connection.cursor()
         params = (comic_id,)
-        characters_query = \
-            "SELECT Cha.*, I.pathExtension as thumbnailExtension, " \
-            "(SELECT ChhUrl.url " \
-            "FROM Characters_has_URLs ChhUrl " \
-            "LEFT JOIN URLs UL " \
-            "ON ChhUrl.url = UL.url " \
-            "WHERE ChhUrl.characterId = ChCha.characterId AND UL.type = 'purchase') as purchaseURL, " \
-            "(SELECT ChhUrl.url " \
-            "FROM Characters_has_URLs ChhUrl " \
-            "LEFT JOIN URLs UL " \
-            "ON ChhUrl.url = UL.url " \
-            "WHERE ChhUrl.characterId = ChCha.characterId AND UL.type = 'detail') as detailURL, " \
-            "(SELECT ChhUrl.url " \
-            "FROM Characters_has_URLs ChhUrl " \
-            "LEFT JOIN URLs UL " \
-            "ON ChhUrl.url = UL.url " \
-            "WHERE ChhUrl.characterId = ChCha.characterId AND UL.type = 'comiclink') as comicLink, " \
-            "(SELECT ChhUrl.url " \
-            "FROM Characters_has_URLs ChhUrl " \
-            "LEFT JOIN URLs UL " \
-            "ON ChhUrl.url = UL.url " \
-            "WHERE ChhUrl.characterId = ChCha.characterId AND UL.type = 'reader') as readerURL, " \
-            "(SELECT ChhUrl.url " \
-            "FROM Characters_has_URLs ChhUrl " \
-            "LEFT JOIN URLs UL " \
-            "ON ChhUrl.url = UL.url " \
-            "WHERE ChhUrl.characterId = ChCha.characterId AND UL.type = 'inAppLink') as inAppLink, " \
-            "(SELECT ChhUrl.url " \
-            "FROM Characters_has_URLs ChhUrl " \
-            "LEFT JOIN URLs UL " \
-            "ON ChhUrl.url = UL.url " \
-            "WHERE ChhUrl.characterId = ChCha.characterId AND UL.type = 'wiki') as wiki " \
-            "FROM Comics_has_Characters ChCha " \
-            "LEFT JOIN Characters Cha " \
-            "on ChCha.characterId = Cha.id " \
-            "LEFT JOIN Images I " \
-            "on Cha.thumbnail = I.path " \
-            "WHERE ChCha.comicId=%s;"
 
-        cursor.execute(characters_query, params)
-        return [FrontEndCharacter(item) for item in cursor]
+        cursor.execute(self.COMIC_CHARACTERS_QUERY, params)
+        characters = self._add_urls(cursor, self.CHARACTER_ENTITY, cursor.fetchall())
+        return [FrontEndCharacter(item) for item in characters]
 
     def get_comic_creators(self, comic_id: int) -> list[FrontEndCreator]:
         """ Get the creator records for the related comic """
         cursor = self.mysql.connection.cursor()
         params = (comic_id,)
-        creators_query = \
-            "SELECT ChCr.creatorRole as role, Cr.*, I.pathExtension as thumbnailExtension " \
-            "FROM Comics_has_Creators ChCr " \
-            "INNER JOIN Creators Cr " \
-            "ON ChCr.creatorId = Cr.id " \
-            "LEFT JOIN Images I " \
-            "ON Cr.thumbnail = I.path " \
-            "WHERE ChCr.comicId=%s;"
-
-        cursor.execute(creators_query, params)
-        creator_details = [FrontEndCreator(item) for item in cursor]
-
-        url_query = \
-            "SELECT ChCr.creatorId, " \
-            "(SELECT CrhUrl.url " \
-            "FROM Creators_has_URLs CrhUrl " \
-            "LEFT JOIN URLs UL " \
-            "ON CrhUrl.url = UL.url " \
-            "WHERE CrhUrl.creatorId = ChCr.creatorId AND UL.type = 'purchase') as purchaseURL, " \
-            "(SELECT CrhUrl.url " \
-            "FROM Creators_has_URLs CrhUrl " \
-            "LEFT JOIN URLs UL " \
-            "ON CrhUrl.url = UL.url " \
-            "WHERE CrhUrl.creatorId = ChCr.creatorId AND UL.type = 'detail') as detailURL, " \
-            "(SELECT CrhUrl.url " \
-            "FROM Creators_has_URLs CrhUrl " \
-            "LEFT JOIN URLs UL " \
-            "ON CrhUrl.url = UL.url " \
-            "WHERE CrhUrl.creatorId = ChCr.creatorId AND UL.type = 'comiclink') as comicLink, " \
-            "(SELECT CrhUrl.url " \
-            "FROM Creators_has_URLs CrhUrl " \
-            "LEFT JOIN URLs UL " \
-            "ON CrhUrl.url = UL.url " \
-            "WHERE CrhUrl.creatorId = ChCr.creatorId AND UL.type = 'reader') as readerURL, " \
-            "(SELECT CrhUrl.url " \
-            "FROM Creators_has_URLs CrhUrl " \
-            "LEFT JOIN URLs UL " \
-            "ON CrhUrl.url = UL.url " \
-            "WHERE CrhUrl.creatorId = ChCr.creatorId AND UL.type = 'inAppLink') as inAppLink, " \
-            "(SELECT CrhUrl.url " \
-            "FROM Creators_has_URLs CrhUrl " \
-            "LEFT JOIN URLs UL " \
-            "ON CrhUrl.url = UL.url " \
-            "WHERE CrhUrl.creatorId = ChCr.creatorId AND UL.type = 'wiki') as wiki " \
-            "FROM Comics_has_Creators ChCr " \
-            "WHERE ChCr.comicId=%s;"
-
-        cursor.execute(url_query, params)
-
-        for url in cursor:
-            for creator in creator_details:
 
-                if creator.id == url['creatorId']:
-                    creator.update_attributes(url)
-                    break
-
-        return creator_details
+        cursor.execute(self.COMIC_CREATORS_QUERY, params)
+        creators = self._add_urls(cursor, self.CREATOR_ENTITY, cursor.fetchall())
+        return [FrontEndCreator(item) for item in creators]
 
     def get_single_comic_detail(self, comic_id: int) -> FrontEndComic:
         """ Get the comic record by id and the related urls """
         cursor = self.mysql.connection.cursor()
         params = (comic_id,)
 
-        detail_query = \
-            "SELECT Comics.*, PurchasedComics.*, Images.pathExtension AS thumbnailExtension " \
-            "FROM Comics " \
-            "LEFT JOIN Images " \
-            "ON Comics.thumbnail = Images.path " \
-            "LEFT JOIN PurchasedComics " \
-            "ON Comics.id = PurchasedComics.comicId " \
-            "WHERE Comics.id=%s;"
-
-        cursor.execute(detail_query, params)
+        cursor.execute(self.COMIC_DETAIL_QUERY, params)
         comic_details = [FrontEndComic(item) for item in cursor]
 
-        url_query = \
-            "SELECT " \
-            "(SELECT ChUL.url " \
-            "FROM Comics_has_URLs ChUL " \
-            "LEFT OUTER JOIN URLs UL " \
-            "ON ChUL.url = UL.url " \
-            "WHERE ChUL.comicId = C.id AND UL.type = 'purchase') as purchaseURL, " \
-            "(SELECT ChUL.url " \
-            "FROM Comics_has_URLs ChUL " \
-            "LEFT OUTER JOIN URLs UL " \
-            "ON ChUL.url = UL.url " \
-            "WHERE ChUL.comicId = C.id AND UL.type = 'detail') as detailURL, " \
-            "(SELECT ChUL.url " \
-            "FROM Comics_has_URLs ChUL " \
-            "LEFT OUTER JOIN URLs UL " \
-            "ON ChUL.url = UL.url " \
-            "WHERE ChUL.comicId = C.id AND UL.type = 'comiclink') as comicLink, " \
-            "(SELECT ChUL.url " \
-            "FROM Comics_has_URLs ChUL " \
-            "LEFT OUTER JOIN URLs UL " \
-            "ON ChUL.url = UL.url " \
-            "WHERE ChUL.comicId = C.id AND UL.type = 'reader') as readerURL, " \
-            "(SELECT ChUL.url " \
-            "FROM Comics_has_URLs ChUL " \
-            "LEFT OUTER JOIN URLs UL " \
-            "ON ChUL.url = UL.url " \
-            "WHERE ChUL.comicId = C.id AND UL.type = 'inAppLink') as inAppLink, " \
-            "(SELECT ChUL.url " \
-            "FROM Comics_has_URLs ChUL " \
-            "LEFT OUTER JOIN URLs UL " \
-            "ON ChUL.url = UL.url " \
-            "WHERE ChUL.comicId = C.id AND UL.type = 'wiki') as wiki " \
-            "FROM Comics C " \
-            "WHERE C.id=%s;"
-        cursor.execute(url_query, params)
-
-        for url in cursor:
-            comic_details[0].update_attributes(url)
+        comic_details[0].update_attributes(self.get_entity_urls(cursor, self.COMIC_ENTITY, [comic_id])[comic_id])
 
         return comic_details[0]
 
@@ -241,60 +436,17 @@ class FrontEndDB:
         """ Get the Event records for the related comic """
         cursor = self.mysql.connection.cursor()
         params = (comic_id,)
-        events_query = \
-            "SELECT E.*, I.pathExtension as thumbnailExtension, " \
-            "(SELECT EhUrl.url " \
-            "FROM Events_has_URLs EhUrl " \
-            "LEFT JOIN URLs UL " \
-            "ON EhUrl.url = UL.url " \
-            "WHERE EhUrl.eventId = ChE.eventId AND UL.type = 'purchase') as purchaseURL, " \
-            "(SELECT EhUrl.url " \
-            "FROM Events_has_URLs EhUrl " \
-            "LEFT JOIN URLs UL " \
-            "ON EhUrl.url = UL.url " \
-            "WHERE EhUrl.eventId = ChE.eventId AND UL.type = 'detail') as detailURL, " \
-            "(SELECT EhUrl.url " \
-            "FROM Events_has_URLs EhUrl " \
-            "LEFT JOIN URLs UL " \
-            "ON EhUrl.url = UL.url " \
-            "WHERE EhUrl.eventId = ChE.eventId AND UL.type = 'comiclink') as comicLink, " \
-            "(SELECT EhUrl.url " \
-            "FROM Events_has_URLs EhUrl " \
-            "LEFT JOIN URLs UL " \
-            "ON EhUrl.url = UL.url " \
-            "WHERE EhUrl.eventId = ChE.eventId AND UL.type = 'reader') as readerURL, " \
-            "(SELECT EhUrl.url " \
-            "FROM Events_has_URLs EhUrl " \
-            "LEFT JOIN URLs UL " \
-            "ON EhUrl.url = UL.url " \
-            "WHERE EhUrl.eventId = ChE.eventId AND UL.type = 'inAppLink') as inAppLink, " \
-            "(SELECT EhUrl.url " \
-            "FROM Events_has_URLs EhUrl " \
-            "LEFT JOIN URLs UL " \
-            "ON EhUrl.url = UL.url " \
-            "WHERE EhUrl.eventId = ChE.eventId AND UL.type = 'wiki') as wiki " \
-            "FROM Comics_has_Events ChE " \
-            "LEFT JOIN Events E " \
-            "on ChE.eventId = E.id " \
-            "LEFT JOIN Images I " \
-            "on E.thumbnail = I.path " \
-            "WHERE ChE.comicId=%s;"
 
-        cursor.execute(events_query, params)
-        return [FrontEndEvent(event) for event in cursor]
+        cursor.execute(self.COMIC_EVENTS_QUERY, params)
+        events = self._add_urls(cursor, self.EVENT_ENTITY, cursor.fetchall())
+        return [FrontEndEvent(event) for event in events]
 
     def get_comic_images(self, comic_id: int) -> list[FrontEndImage]:
         """ Get the current comics variant comics """
         cursor = self.mysql.connection.cursor()
         params = (comic_id,)
-        images_query = \
-            "SELECT ChI.imagePath as thumbnail, I.pathExtension as thumbnailExtension " \
-            "FROM Comics_has_Images ChI " \
-            "LEFT JOIN Images I " \
-            "on ChI.imagePath = I.path " \
-            "WHERE ChI.comicId = %s;"
 
-        cursor.execute(images_query, params)
+        cursor.execute(self.COMIC_IMAGES_QUERY, params)
         return [FrontEndImage(item) for item in cursor]
 
     def get_comic_stories(self, comic_id: int) -> list[FrontEndStory]:
@@ -302,92 +454,33 @@ class FrontEndDB:
         cursor = self.mysql.connection.cursor()
         params = (comic_id,)
 
-        cover_story_query = \
-            "SELECT Stories.*, I.pathExtension AS thumbnailExtension from Comics_has_Stories ChS " \
-            "INNER JOIN Stories " \
-            "ON ChS.storyId = Stories.id AND Stories.type = 'cover' " \
-            "LEFT JOIN Images I " \
-            "on Stories.thumbnail = I.path " \
-            "WHERE ChS.comicId=%s;"
-
-        cursor.execute(cover_story_query, params)
-        story_details = [FrontEndStory(item) for item in cursor]
-
-        interior_story_query = \
-            "SELECT Stories.*, I.pathExtension AS thumbnailExtension from Comics_has_Stories ChS " \
-            "INNER JOIN Stories " \
-            "ON ChS.storyId = Stories.id AND (Stories.type = 'interiorStory' OR Stories.type = 'story') " \
-            "LEFT JOIN Images I " \
-            "on Stories.thumbnail = I.path " \
-            "WHERE ChS.comicId=%s;"
-
-        cursor.execute(interior_story_query, params)
-        for interiorStory in cursor:
-            story_details[0].update_attributes(attributes=interiorStory, qualifier='interiorStory')
-
-        return story_details
+        cursor.execute(self.COMIC_STORIES_QUERY, params)
+        return self._make_story_detail(cursor.fetchall())
 
     def get_comic_variants(self, comic_id: int) -> list[FrontEndComic]:
         """ Get the current comics variant comics """
         cursor = self.mysql.connection.cursor()
         params = (comic_id,)
-        variants_query = \
-            "SELECT C.*, I.pathExtension as thumbnailExtension " \
-            "FROM Comics_has_Variants ChV " \
-            "INNER JOIN Comics C " \
-            "on ChV.variantId = C.id " \
-            "LEFT JOIN Images I " \
-            "on C.thumbnail = I.path " \
-            "WHERE ChV.comicId = %s;"
-
-        cursor.execute(variants_query, params)
-        variant_details = [FrontEndComic(item) for item in cursor]
-
-        url_query = \
-            "SELECT ChV.variantId, " \
-            "(SELECT ChUL.url " \
-            "FROM Comics_has_URLs ChUL " \
-            "LEFT OUTER JOIN URLs UL " \
-            "ON ChUL.url = UL.url " \
-            "WHERE ChUL.comicId = ChV.variantId AND UL.type = 'purchase') as purchaseURL, " \
-            "(SELECT ChUL.url " \
-            "FROM Comics_has_URLs ChUL " \
-            "LEFT OUTER JOIN URLs UL " \
-            "ON ChUL.url = UL.url " \
-            "WHERE ChUL.comicId = ChV.variantId AND UL.type = 'detail') as detailURL, " \
-            "(SELECT ChUL.url " \
-            "FROM Comics_has_URLs ChUL " \
-            "LEFT OUTER JOIN URLs UL " \
-            "ON ChUL.url = UL.url " \
-            "WHERE ChUL.comicId = ChV.variantId AND UL.type = 'comiclink') as comicLink, " \
-            "(SELECT ChUL.url " \
-            "FROM Comics_has_URLs ChUL " \
-            "LEFT OUTER JOIN URLs UL " \
-            "ON ChUL.url = UL.url " \
-            "WHERE ChUL.comicId = ChV.variantId AND UL.type = 'reader') as readerURL, " \
-            "(SELECT ChUL.url " \
-            "FROM Comics_has_URLs ChUL " \
-            "LEFT OUTER JOIN URLs UL " \
-            "ON ChUL.url = UL.url " \
-            "WHERE ChUL.comicId = ChV.variantId AND UL.type = 'inAppLink') as inAppLink, " \
-            "(SELECT ChUL.url " \
-            "FROM Comics_has_URLs ChUL " \
-            "LEFT OUTER JOIN URLs UL " \
-            "ON ChUL.url = UL.url " \
-            "WHERE ChUL.comicId = ChV.variantId AND UL.type = 'wiki') as wiki " \
-            "FROM Comics_has_Variants ChV " \
-            "WHERE ChV.comicId=%s;"
-
-        cursor.execute(url_query, params)
 
-        for url in cursor:
-            for variant in variant_details:
+        cursor.execute(self.COMIC_VARIANTS_QUERY, params)
+        variants = self._add_urls(cursor, self.COMIC_ENTITY, cursor.fetchall())
+        return [FrontEndComic(item) for item in variants]
+
+    @staticmethod
+    def _make_story_detail(story_rows) -> list[FrontEndStory]:
+        """
+        Makes the cover stories and sets the interior story as the first one's interiorStory
+        :param story_rows: rows of COMIC_STORIES_QUERY
+        :return: the cover stories
+        """
+        story_details = [FrontEndStory(row) for row in story_rows if row['type'].lower() == 'cover']
 
-                if variant.id == url['variantId']:
-                    variant.update_attributes(url)
-                    break
+        if story_details:
+            for interiorStory in story_rows:
+                if interiorStory['type'].lower() != 'cover':
+                    story_details[0].interiorStory = FrontEndStory(interiorStory)
 
-        return variant_details
+        return story_details
 
     ##################################################################################################
     #
@@ -395,51 +488,23 @@ class FrontEndDB:
     #
     ##################################################################################################
 
+    SERIES_DETAIL_QUERY = \
+        "SELECT S.*, " \
+        "Images.pathExtension AS thumbnailExtension " \
+        "FROM Series S " \
+        "LEFT JOIN Images " \
+        "ON S.thumbnail = Images.path " \
+        "WHERE S.id=%s;"
+
     def get_single_series_detail(self, series_id: int) -> FrontEndSeries:
         """ Gets the comics related Series's details """
         cursor = self.mysql.connection.cursor()
         params = (series_id,)
 
-        detail_query = \
-            "SELECT S.*, " \
-            "Images.pathExtension AS thumbnailExtension, " \
-            "(SELECT ShUL.url " \
-            "FROM Series_has_URLs ShUL " \
-            "LEFT JOIN URLs UL " \
-            "ON ShUL.url = UL.url " \
-            "WHERE ShUL.seriesId = S.id AND UL.type = 'purchase') as purchaseURL, " \
-            "(SELECT ShUL.url " \
-            "FROM Series_has_URLs ShUL " \
-            "LEFT JOIN URLs UL " \
-            "ON ShUL.url = UL.url " \
-            "WHERE ShUL.seriesId = S.id AND UL.type = 'detail') as detailURL, " \
-            "(SELECT ShUL.url " \
-            "FROM Series_has_URLs ShUL " \
-            "LEFT JOIN URLs UL " \
-            "ON ShUL.url = UL.url " \
-            "WHERE ShUL.seriesId = S.id AND UL.type = 'comiclink') as comicLink, " \
-            "(SELECT ShUL.url " \
-            "FROM Series_has_URLs ShUL " \
-            "LEFT JOIN URLs UL " \
-            "ON ShUL.url = UL.url " \
-            "WHERE ShUL.seriesId = S.id AND UL.type = 'reader') as readerURL, " \
-            "(SELECT ShUL.url " \
-            "FROM Series_has_URLs ShUL " \
-            "LEFT JOIN URLs UL " \
-            "ON ShUL.url = UL.url " \
-            "WHERE ShUL.seriesId = S.id AND UL.type = 'inAppLink') as inAppLink, " \
-            "(SELECT ShUL.url " \
-            "FROM Series_has_URLs ShUL " \
-            "LEFT JOIN URLs UL " \
-            "ON ShUL.url = UL.url " \
-            "WHERE ShUL.seriesId = S.id AND UL.type = 'wiki') as wiki " \
-            "FROM Series S " \
-            "LEFT JOIN Images " \
-            "ON S.thumbnail = Images.path " \
-            "WHERE S.id=%s;"
-        cursor.execute(detail_query, params)
-
-        return [FrontEndSeries(series) for series in cursor][0]
+        cursor.execute(self.SERIES_DETAIL_QUERY, params)
+        series_details = self._add_urls(cursor, self.SERIES_ENTITY, cursor.fetchall())
+
+        return [FrontEndSeries(series) for series in series_details][0]
 
     def get_series_characters(self, series_id: int) -> list[FrontEndCharacter]:
         """
@@ -449,37 +514,7 @@ class FrontEndDB:
         cursor = self.mysql.connection.cursor()
         params = (series_id,)
         characters_query = \
-            "SELECT Cha.*, I.pathExtension as thumbnailExtension, " \
-            "(SELECT ChhUrl.url " \
-            "FROM Characters_has_URLs ChhUrl " \
-            "LEFT JOIN URLs UL " \
-            "ON ChhUrl.url = UL.url " \
-            "WHERE ChhUrl.characterId = ShCha.characterId AND UL.type = 'purchase') as purchaseURL, " \
-            "(SELECT ChhUrl.url " \
-            "FROM Characters_has_URLs ChhUrl " \
-            "LEFT JOIN URLs UL " \
-            "ON ChhUrl.url = UL.url " \
-            "WHERE ChhUrl.characterId = ShCha.characterId AND UL.type = 'detail') as detailURL, " \
-            "(SELECT ChhUrl.url " \
-            "FROM Characters_has_URLs ChhUrl " \
-            "LEFT JOIN URLs UL " \
-            "ON ChhUrl.url = UL.url " \
-            "WHERE ChhUrl.characterId = ShCha.characterId AND UL.type = 'comiclink') as comicLink, " \
-            "(SELECT ChhUrl.url " \
-            "FROM Characters_has_URLs ChhUrl " \
-            "LEFT JOIN URLs UL " \
-            "ON ChhUrl.url = UL.url " \
-            "WHERE ChhUrl.characterId = ShCha.characterId AND UL.type = 'reader') as readerURL, " \
-            "(SELECT ChhUrl.url " \
-            "FROM Characters_has_URLs ChhUrl " \
-            "LEFT JOIN URLs UL " \
-            "ON ChhUrl.url = UL.url " \
-            "WHERE ChhUrl.characterId = ShCha.characterId AND UL.type = 'inAppLink') as inAppLink, " \
-            "(SELECT ChhUrl.url " \
-            "FROM Characters_has_URLs ChhUrl " \
-            "LEFT JOIN URLs UL " \
-            "ON ChhUrl.url = UL.url " \
-            "WHERE ChhUrl.characterId = ShCha.characterId AND UL.type = 'wiki') as wiki " \
+            "SELECT Cha.*, I.pathExtension as thumbnailExtension " \
             "FROM Series_has_Characters ShCha " \
             "LEFT JOIN Characters Cha " \
             "on ShCha.characterId = Cha.id " \
@@ -488,7 +523,8 @@ class FrontEndDB:
             "WHERE ShCha.seriesId=%s;"
 
         cursor.execute(characters_query, params)
-        return [FrontEndCharacter(character) for character in cursor]
+        characters = self._add_urls(cursor, self.CHARACTER_ENTITY, cursor.fetchall())
+        return [FrontEndCharacter(character) for character in characters]
 
     def get_series_events(self, series_id: int) -> list[FrontEndEvent]:
         """
@@ -498,37 +534,7 @@ class FrontEndDB:
         cursor = self.mysql.connection.cursor()
         params = (series_id,)
         events_query = \
-            "SELECT E.*, I.pathExtension as thumbnailExtension, " \
-            "(SELECT EhUrl.url " \
-            "FROM Events_has_URLs EhUrl " \
-            "LEFT JOIN URLs UL " \
-            "ON EhUrl.url = UL.url " \
-            "WHERE EhUrl.eventId = ShE.eventId AND UL.type = 'purchase') as purchaseURL, " \
-            "(SELECT EhUrl.url " \
-            "FROM Events_has_URLs EhUrl " \
-            "LEFT JOIN URLs UL " \
-            "ON EhUrl.url = UL.url " \
-            "WHERE EhUrl.eventId = ShE.eventId AND UL.type = 'detail') as detailURL, " \
-            "(SELECT EhUrl.url " \
-            "FROM Events_has_URLs EhUrl " \
-            "LEFT JOIN URLs UL " \
-            "ON EhUrl.url = UL.url " \
-            "WHERE EhUrl.eventId = ShE.eventId AND UL.type = 'comiclink') as comicLink, " \
-            "(SELECT EhUrl.url " \
-            "FROM Events_has_URLs EhUrl " \
-            "LEFT JOIN URLs UL " \
-            "ON EhUrl.url = UL.url " \
-            "WHERE EhUrl.eventId = ShE.eventId AND UL.type = 'reader') as readerURL, " \
-            "(SELECT EhUrl.url " \
-            "FROM Events_has_URLs EhUrl " \
-            "LEFT JOIN URLs UL " \
-            "ON EhUrl.url = UL.url " \
-            "WHERE EhUrl.eventId = ShE.eventId AND UL.type = 'inAppLink') as inAppLink, " \
-            "(SELECT EhUrl.url " \
-            "FROM Events_has_URLs EhUrl " \
-            "LEFT JOIN URLs UL " \
-            "ON EhUrl.url = UL.url " \
-            "WHERE EhUrl.eventId = ShE.eventId AND UL.type = 'wiki') as wiki " \
+            "SELECT E.*, I.pathExtension as thumbnailExtension " \
             "FROM Series_has_Events ShE " \
             "LEFT JOIN Events E " \
             "on ShE.eventId = E.id " \
@@ -537,4 +543,185 @@ class FrontEndDB:
             "WHERE ShE.seriesId=%s;"
 
         cursor.execute(events_query, params)
-        return [FrontEndEvent(event) for event in cursor]
+        events = self._add_urls(cursor, self.EVENT_ENTITY, cursor.fetchall())
+        return [FrontEndEvent(event) for event in events]
+
+    ##################################################################################################
+    #
+    #           VALIDATORS
+    #
+    ##################################################################################################
+    @staticmethod
+    def _related_updated(name: str, link_table: str, link_column: str, owner_id: str, table: str, id_column: str,
+                         key: str = 'id') -> str:
+        """ :return: the {name}Count and {name}Updated (newest updated) columns of the records linked to an owner """
+        return f"(SELECT COUNT(*) FROM {link_table} L WHERE L.{link_column} = {owner_id}) AS {name}Count, " \
+               f"(SELECT UNIX_TIMESTAMP(MAX(T.updated)) FROM {link_table} L " \
+               f"INNER JOIN {table} T ON L.{id_column} = T.{key} " \
+               f"WHERE L.{link_column} = {owner_id}) AS {name}Updated"
+
+    COMIC_VALIDATOR_QUERY = \
+        "SELECT UNIX_TIMESTAMP() AS now, UNIX_TIMESTAMP(C.updated) AS comicUpdated, " \
+        "(SELECT UNIX_TIMESTAMP(PC.updated) FROM PurchasedComics PC WHERE PC.comicId = C.id) AS purchasedUpdated, " \
+        "(SELECT UNIX_TIMESTAMP(S.updated) FROM Series S WHERE S.id = C.seriesId) AS seriesUpdated, " \
+        f"{_related_updated('characters', 'Comics_has_Characters', 'comicId', 'C.id', 'Characters', 'characterId')}, " \
+        f"{_related_updated('creators', 'Comics_has_Creators', 'comicId', 'C.id', 'Creators', 'creatorId')}, " \
+        f"{_related_updated('events', 'Comics_has_Events', 'comicId', 'C.id', 'Events', 'eventId')}, " \
+        f"{_related_updated('images', 'Comics_has_Images', 'comicId', 'C.id', 'Images', 'imagePath', 'path')}, " \
+        f"{_related_updated('stories', 'Comics_has_Stories', 'comicId', 'C.id', 'Stories', 'storyId')}, " \
+        f"{_related_updated('variants', 'Comics_has_Variants', 'comicId', 'C.id', 'Comics', 'variantId')} " \
+        "FROM Comics C " \
+        "WHERE C.id = %s;"
+    SERIES_VALIDATOR_QUERY = \
+        "SELECT UNIX_TIMESTAMP() AS now, UNIX_TIMESTAMP(S.updated) AS seriesUpdated, " \
+        f"{_related_updated('characters', 'Series_has_Characters', 'seriesId', 'S.id', 'Characters', 'characterId')} " \
+        "FROM Series S " \
+        "WHERE S.id = %s;"
+    PURCHASED_COMICS_VALIDATOR_QUERY = \
+        "SELECT UNIX_TIMESTAMP() AS now, COUNT(*) AS comicsCount, UNIX_TIMESTAMP(MAX(updated)) AS comicsUpdated " \
+        "FROM PurchasedComicsSummary;"
+    PURCHASED_SERIES_VALIDATOR_QUERY = \
+        "SELECT UNIX_TIMESTAMP() AS now, COUNT(*) AS seriesCount, UNIX_TIMESTAMP(MAX(updated)) AS seriesUpdated " \
+        "FROM PurchasedSeriesSummary;"
+
+    def get_comic_validator(self, comic_id: int) -> dict | None:
+        """
+        Gets what the comic detail page shows changes in, with one query: the updated time of the comic, its purchase
+        and series and the count and newest updated time of its characters, creators, events, images, stories and
+        variants
+        :param comic_id: the id of the comic
+        :return: {'now': db unix time, '*Updated': unix time | None, '*Count': int}, None if there is no such comic
+        """
+        return self._get_validator(self.COMIC_VALIDATOR_QUERY, (comic_id,))
+
+    def get_series_validator(self, series_id: int) -> dict | None:
+        """
+        Gets what the series detail page shows changes in: the series' updated time and the count and newest updated
+        time of its characters
+        :param series_id: the id of the series
+        :return: {'now': db unix time, '*Updated': unix time | None, '*Count': int}, None if there is no such series
+        """
+        return self._get_validator(self.SERIES_VALIDATOR_QUERY, (series_id,))
+
+    def get_purchased_comics_validator(self) -> dict:
+        """
+        Gets the number of purchased comic summary rows and the newest one's updated time, which change with every
+        page of the /comics listing
+        :return: {'now': db unix time, 'comicsUpdated': unix time | None, 'comicsCount': int}
+        """
+        return self._get_validator(self.PURCHASED_COMICS_VALIDATOR_QUERY, ())
+
+    def get_purchased_series_validator(self) -> dict:
+        """
+        Gets the number of purchased series summary rows and the newest one's updated time, which change with every
+        page of the /series listing
+        :return: {'now': db unix time, 'seriesUpdated': unix time | None, 'seriesCount': int}
+        """
+        return self._get_validator(self.PURCHASED_SERIES_VALIDATOR_QUERY, ())
+
+    def _get_validator(self, query: str, params: tuple) -> dict | None:
+        cursor = self.mysql.connection.cursor()
+        cursor.execute(query, params)
+        row = cursor.fetchone()
+        if row is None:
+            return None
+
+        # UNIX_TIMESTAMP() is a Decimal for fractional second columns
+        return {key: int(value) if value is not None else None for key, value in row.items()}
+
+    ##################################################################################################
+    #
+    #           COVERS
+    #
+    ##################################################################################################
+    def get_purchased_covers(self) -> list[dict]:
+        """
+        Gets the thumbnails of every purchased comic and of the series they belong to, for the cover store prefetch
+        :return: [{'thumbnail', 'thumbnailExtension'}] without duplicates
+        """
+        cursor = self.mysql.connection.cursor()
+        query = \
+            "SELECT thumbnail, thumbnailExtension " \
+            "FROM PurchasedComicsSummary " \
+            "WHERE thumbnail IS NOT NULL AND thumbnailExtension IS NOT NULL " \
+            "UNION " \
+            "SELECT thumbnail, thumbnailExtension " \
+            "FROM PurchasedSeriesSummary " \
+            "WHERE thumbnail IS NOT NULL AND thumbnailExtension IS NOT NULL;"
+
+        cursor.execute(query)
+        return list(cursor.fetchall())
+
+    ##################################################################################################
+    #
+    #           URLS
+    #
+    ##################################################################################################
+
+    def get_entity_urls(self, cursor, entity: str, entity_ids) -> dict[int, dict]:
+        """
+        Gets the purchase, detail, comiclink, reader, inAppLink and wiki urls of many entities with one query on
+        *_has_URLs and pivots them into the purchaseURL, detailURL, comicLink, readerURL, inAppLink and wiki
+        attributes the detail pages use. Replaces six correlated subqueries per row.
+        :param cursor: dict cursor to run the query on
+        :param entity: CHARACTER_ENTITY, COMIC_ENTITY, CREATOR_ENTITY, EVENT_ENTITY or SERIES_ENTITY
+        :param entity_ids: ids of the entities
+        :return: urls[entity_id] = {'purchaseURL': url or None, ...} for every id
+        """
+        return self.get_urls(cursor, {entity: entity_ids})[entity]
+
+    def get_urls(self, cursor, ids_by_entity: dict) -> dict[str, dict[int, dict]]:
+        """
+        get_entity_urls() for several entities at once, one UNION ALL query for all of them
+        :param cursor: dict cursor to run the query on
+        :param ids_by_entity: {entity: entity ids}, entities as in get_entity_urls()
+        :return: urls[entity][entity_id] = {'purchaseURL': url or None, ...} for every id
+        """
+        urls = {
+                entity: {
+                        entity_id: dict.fromkeys(self.URL_COLUMNS.values())
+                        for entity_id in entity_ids if entity_id is not None
+                }
+                for entity, entity_ids in ids_by_entity.items()
+        }
+
+        url_selects = []
+        params = []
+        for entity, entity_urls in urls.items():
+            if not entity_urls:
+                continue
+
+            url_table, id_column = self.URL_TABLES[entity]
+            url_selects.append(
+                f"SELECT '{entity}' AS entity, hUL.{id_column} AS entityId, UL.type AS urlType, hUL.url "
+                f"FROM {url_table} hUL "
+                f"INNER JOIN URLs UL "
+                f"ON hUL.url = UL.url "
+                f"WHERE hUL.{id_column} IN ({', '.join(['%s'] * len(entity_urls))})"
+            )
+            params.extend(entity_urls)
+
+        if not url_selects:
+            return urls
+
+        cursor.execute(" UNION ALL ".join(url_selects) + ";", tuple(params))
+        for url in cursor:
+            column = self.URL_COLUMNS.get(url['urlType'].lower()) if url['urlType'] else None
+            entity_urls = urls[url['entity']][url['entityId']]
+            if column is not None and entity_urls[column] is None:
+                entity_urls[column] = url['url']
+
+        return urls
+
+    def _add_urls(self, cursor, entity: str, rows) -> list[dict]:
+        """
+        Adds the url attributes from get_entity_urls() to each row
+        :param cursor: dict cursor to run the url query on
+        :param entity: entity the rows' ids belong to
+        :param rows: dict rows with an 'id'
+        :return: the rows with the url attributes added
+        """
+        urls = self.get_entity_urls(cursor, entity, [row['id'] for row in rows])
+        no_urls = dict.fromkeys(self.URL_COLUMNS.values())
+
+        return [{**row, **urls.get(row['id'], no_urls)} for row in rows]
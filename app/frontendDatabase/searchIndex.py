@@ -0,0 +1,287 @@
+"""
+Author: Zane Miller
+Email: millerzanem@gmail.com
+Date: 10/19/2026
+Description: In-process inverted index over comic and series titles, comic descriptions, character and creator names
+with prefix and typo tolerant matching, behind the /search route
+"""
+from __future__ import annotations
+
+import bisect
+import collections
+import heapq
+import html
+import re
+import threading
+import time
+import unicodedata
+
+from backend.backendDatabase.backendDB import BackEndDB
+
+SEARCH_ENTITIES = (BackEndDB.COMIC_ENTITY, BackEndDB.SERIES_ENTITY, BackEndDB.CHARACTER_ENTITY,
+                   BackEndDB.CREATOR_ENTITY)
+SEARCH_REFRESH_INTERVAL = 30
+SEARCH_RESULTS_PER_ENTITY = 20
+MAX_PREFIX_EXPANSIONS = 200
+MIN_PREFIX_LENGTH = 2
+MIN_TYPO_LENGTH = 4
+TITLE_WEIGHT = 3.0
+TEXT_WEIGHT = 1.0
+EXACT_MATCH = 1.0
+PREFIX_MATCH = 0.6
+TYPO_MATCH = 0.4
+# left out of the description postings, titles keep them
+STOPWORDS = frozenset({
+        'a', 'an', 'and', 'are', 'as', 'at', 'be', 'but', 'by', 'for', 'from', 'has', 'have', 'he', 'her', 'his', 'in',
+        'into', 'is', 'it', 'its', 'of', 'on', 'or', 'she', 'that', 'the', 'their', 'them', 'they', 'this', 'to',
+        'was', 'were', 'when', 'who', 'will', 'with',
+})
+
+SearchHit = collections.namedtuple('SearchHit', ['entity', 'id', 'title', 'score'])
+
+_TAG_PATTERN = re.compile(r'<[^>]*>')
+_TOKEN_PATTERN = re.compile(r'[a-z0-9]+')
+
+
+def tokenize(text) -> list[str]:
+    """
+    :param text: str, bytes (the BLOB description columns) or None
+    :return: lower case word tokens with html tags and accents removed
+    """
+    if not text:
+        return []
+    if isinstance(text, bytes):
+        text = text.decode(errors='replace')
+
+    text = html.unescape(_TAG_PATTERN.sub(' ', text))
+    text = unicodedata.normalize('NFKD', text).encode('ascii', 'ignore').decode().lower()
+    return _TOKEN_PATTERN.findall(text)
+
+
+def _deletes(token: str) -> set[str]:
+    """ :return: the token with each one of its letters removed """
+    return {token[:i] + token[i + 1:] for i in range(len(token))}
+
+
+def _within_one_edit(a: str, b: str) -> bool:
+    """ :return: True if a and b differ by at most one inserted, deleted or replaced letter or two swapped letters """
+    if abs(len(a) - len(b)) > 1:
+        return False
+    if len(a) > len(b):
+        a, b = b, a
+
+    i = 0
+    while i < len(a) and a[i] == b[i]:
+        i += 1
+
+    if len(a) < len(b):
+        return a[i:] == b[i + 1:]
+    if i >= len(a) - 1:
+        return True
+    return a[i + 1:] == b[i + 1:] or (a[i] == b[i + 1] and a[i + 1] == b[i] and a[i + 2:] == b[i + 2:])
+
+
+class SearchIndex:
+    """
+    Inverted index token -> {(entity, id): weight} over the SEARCH_ENTITIES, loaded through FrontEndDB on first use.
+    Before each search the records a BackEndDB write listener reported are reloaded, and every refresh_interval the
+    records any process (lookup daemon, workers) updated since the last load are too.
+    """
+
+    def __init__(self, front_end_db, refresh_interval: int = SEARCH_REFRESH_INTERVAL):
+        """
+        :param front_end_db: the (uncached) FrontEndDB the documents are loaded with
+        :param refresh_interval: seconds between checks for records updated by other processes
+        """
+        self.front_end_db = front_end_db
+        self.refresh_interval = refresh_interval
+
+        self._documents = {}  # (documents[(entity, id)] = (title, tokens))
+        self._postings = {}  # (postings[token][(entity, id)] = TITLE_WEIGHT or TEXT_WEIGHT)
+        self._typo_keys = collections.defaultdict(list)  # (typo_keys[title token minus a letter] = [title tokens])
+        self._typo_tokens = set()  # title tokens registered in typo_keys
+        self._sorted_tokens = None  # vocabulary for prefix matching, rebuilt after the index changes
+        self._updated_since = {}  # (updated_since[entity] = newest updated timestamp loaded)
+        self._last_refresh = None
+        self._lock = threading.RLock()
+
+        self._dirty = collections.defaultdict(set)  # (dirty[entity] = ids written since the last refresh)
+        self._dirty_lock = threading.Lock()
+
+    def mark_dirty(self, entity: str, entity_id=None):
+        """
+        Queues a record to be reloaded before the next search. Registered as a BackEndDB write listener.
+        :param entity: entity table name, e.g. BackEndDB.COMIC_ENTITY
+        :param entity_id: the written record's id, None reloads every record updated since the last refresh
+        """
+        if entity in SEARCH_ENTITIES:
+            with self._dirty_lock:
+                self._dirty[entity].add(entity_id)
+
+    def start_loading(self, app):
+        """
+        Loads the index on a background thread so the first search doesn't wait for it
+        :param app: the flask app whose context the FrontEndDB queries run in
+        """
+        def load():
+            with app.app_context():
+                try:
+                    self.refresh()
+                except Exception as e:
+                    print(f"SEARCH INDEX NOT LOADED, RETRYING ON THE FIRST SEARCH: {e}")
+
+        threading.Thread(target=load, name="SearchIndexLoad", daemon=True).start()
+
+    def refresh(self, force: bool = False):
+        """
+        Brings the index up to date: reloads the records marked dirty and, once refresh_interval has passed (or on
+        the first call), every record updated since the last load
+        :param force: check for updated records now
+        """
+        with self._lock:
+            with self._dirty_lock:
+                dirty, self._dirty = self._dirty, collections.defaultdict(set)
+
+            poll = force or self._last_refresh is None or time.monotonic() - self._last_refresh >= self.refresh_interval
+            try:
+                for entity in SEARCH_ENTITIES:
+                    if poll or None in dirty[entity]:
+                        rows = self.front_end_db.get_search_documents(
+                                entity, updated_since=self._updated_since.get(entity)
+                        )
+                        newest = max((row['updated'] for row in rows if row['updated'] is not None), default=None)
+                        if newest is not None and (entity not in self._updated_since
+                                                   or newest > self._updated_since[entity]):
+                            self._updated_since[entity] = newest
+                    elif dirty[entity]:
+                        rows = self.front_end_db.get_search_documents(entity, entity_ids=sorted(dirty[entity]))
+                    else:
+                        continue
+
+                    for row in rows:
+                        self._add_document(entity, row)
+            except Exception:
+                # try these records again next time
+                with self._dirty_lock:
+                    for entity, entity_ids in dirty.items():
+                        self._dirty[entity] |= entity_ids
+                raise
+
+            if poll:
+                self._last_refresh = time.monotonic()
+
+    def search(self, query: str, limit: int = SEARCH_RESULTS_PER_ENTITY) -> dict[str, dict]:
+        """
+        Finds the records matching every word of the query. A word matches a token equal to it, starting with it
+        (2+ letters) or one typo away from it (4+ letters, not numbers). Title matches outrank description matches
+        and exact matches outrank prefix and typo matches.
+        :param query: the search words
+        :param limit: hits returned per entity
+        :return: {entity: {'total': number of matches, 'hits': [SearchHit] best first}} for every SEARCH_ENTITIES
+        """
+        self.refresh()
+        results = {entity: {'total': 0, 'hits': []} for entity in SEARCH_ENTITIES}
+
+        with self._lock:
+            scores = None
+            for token in dict.fromkeys(tokenize(query)):
+                token_scores = {}
+                for match, match_weight in self._expand(token):
+                    for key, weight in self._postings[match].items():
+                        if weight * match_weight > token_scores.get(key, 0):
+                            token_scores[key] = weight * match_weight
+
+                if scores is None:
+                    scores = token_scores
+                else:
+                    scores = {key: score + token_scores[key] for key, score in scores.items() if key in token_scores}
+                if not scores:
+                    break
+
+            hits_by_entity = collections.defaultdict(list)
+            for (entity, entity_id), score in (scores or {}).items():
+                title = self._documents[(entity, entity_id)][0]
+                hits_by_entity[entity].append(SearchHit(entity, entity_id, title, round(score, 2)))
+
+        for entity, hits in hits_by_entity.items():
+            results[entity]['total'] = len(hits)
+            results[entity]['hits'] = heapq.nsmallest(limit, hits, key=lambda hit: (-hit.score, len(hit.title),
+                                                                                    hit.title))
+        return results
+
+    def get_stats(self) -> dict:
+        """
+        :return: {'documents': {entity: count}, 'tokens', 'updated_since': {entity: iso timestamp}}
+        """
+        with self._lock:
+            documents = collections.Counter(entity for entity, _ in self._documents)
+            return {
+                    'documents'    : {entity: documents[entity] for entity in SEARCH_ENTITIES},
+                    'tokens'       : len(self._postings),
+                    'updated_since': {
+                            entity: updated.isoformat() if updated is not None else None
+                            for entity, updated in self._updated_since.items()
+                    },
+            }
+
+    def _expand(self, token: str):
+        """ :return: (index token, match weight) pairs a query token matches """
+        matches = {}
+        if token in self._postings:
+            matches[token] = EXACT_MATCH
+
+        if len(token) >= MIN_PREFIX_LENGTH:
+            if self._sorted_tokens is None:
+                self._sorted_tokens = sorted(self._postings)
+            start = bisect.bisect_left(self._sorted_tokens, token)
+            for match in self._sorted_tokens[start:start + MAX_PREFIX_EXPANSIONS]:
+                if not match.startswith(token):
+                    break
+                matches.setdefault(match, PREFIX_MATCH)
+
+        if len(token) >= MIN_TYPO_LENGTH and not token.isdigit():
+            candidates = set(self._typo_keys.get(token, ()))
+            for key in _deletes(token):
+                candidates.update(self._typo_keys.get(key, ()))
+                candidates.add(key)
+            for match in candidates:
+                if match in self._postings and _within_one_edit(token, match):
+                    matches.setdefault(match, TYPO_MATCH)
+
+        return matches.items()
+
+    def _add_document(self, entity: str, row: dict):
+        """ (Re)indexes one get_search_documents() row """
+        key = (entity, row['id'])
+        self._remove_document(key)
+
+        weights = dict.fromkeys(tokenize(row['title']), TITLE_WEIGHT)
+        for token in tokenize(row['text']):
+            if token not in STOPWORDS:
+                weights.setdefault(token, TEXT_WEIGHT)
+
+        self._documents[key] = (row['title'] or '', tuple(weights))
+        for token, weight in weights.items():
+            if token not in self._postings:
+                self._postings[token] = {}
+                self._sorted_tokens = None
+            self._postings[token][key] = weight
+
+            if weight == TITLE_WEIGHT and token not in self._typo_tokens and len(token) >= MIN_TYPO_LENGTH \
+                    and not token.isdigit():
+                self._typo_tokens.add(token)
+                for typo_key in _deletes(token):
+                    self._typo_keys[typo_key].append(token)
+
+    def _remove_document(self, key: tuple):
+        """ Drops a record's postings, typo keys of dropped tokens are left and skipped when matching """
+        document = self._documents.pop(key, None)
+        if document is None:
+            return
+
+        for token in document[1]:
+            postings = self._postings[token]
+            postings.pop(key, None)
+            if not postings:
+                del self._postings[token]
+                self._sorted_tokens = None
@@ -5,7 +5,6 @@ class FrontEndCharacter(FrontEndEntity):
     """
     DOCSTRING
     """
-
-    def __init__(self, entity_detail_dict):
-        super().__init__(entity_detail_dict)
-        self.ENTITY = 'Characters'
+    ENTITY = 'Characters'
+    __slots__ = ('name',)
+    FIELDS = FrontEndEntity.FIELDS + __slots__
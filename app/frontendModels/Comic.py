@@ -1,9 +1,31 @@
+from __future__ import annotations
+
 from app.frontendModels.FrontEndEntity import FrontEndEntity
 
 
 class FrontEndComic(FrontEndEntity):
     """ Comic Entity class model for front end Comic """
+    ENTITY = "Comics"
+    # Comics and PurchasedComics columns, plus the listing's seriesTitle
+    __slots__ = ('digitalId', 'issueNumber', 'isbn', 'upc', 'diamondCode', 'ean', 'issn', 'format', 'pageCount',
+                 'textObjects', 'onSaleDate', 'focDate', 'unlimitedDate', 'digitalPurchaseDate', 'printPrice',
+                 'digitalPurchasePrice', 'seriesId', 'originalIssue', 'isVariant', 'comicId', 'purchaseDate',
+                 'purchasePrice', 'purchaseType', 'isPurchased', 'seriesTitle', '_variantDescription')
+    FIELDS = FrontEndEntity.FIELDS + __slots__[:-1] + ('variantDescription',)
 
     def __init__(self, entity_detail_dict):
+        self._variantDescription = None
         super().__init__(entity_detail_dict)
-        self.ENTITY = "Comics"
+
+        if self.purchaseDate and self.purchaseType and self.purchasePrice:
+            self.isPurchased = True
+
+    @property
+    def variantDescription(self) -> str | None:
+        if isinstance(self._variantDescription, bytes):
+            self._variantDescription = self._variantDescription.decode()
+        return self._variantDescription
+
+    @variantDescription.setter
+    def variantDescription(self, value):
+        self._variantDescription = value
@@ -5,7 +5,6 @@ class FrontEndCreator(FrontEndEntity):
     """
     Creator Entity CLass Model for front end Creator
     """
-
-    def __init__(self, entity_detail_dict):
-        super().__init__(entity_detail_dict)
-        self.ENTITY = 'Creators'
+    ENTITY = 'Creators'
+    __slots__ = ('firstName', 'middleName', 'lastName', 'suffix', 'role')
+    FIELDS = FrontEndEntity.FIELDS + __slots__
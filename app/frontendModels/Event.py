@@ -5,7 +5,6 @@ class FrontEndEvent(FrontEndEntity):
     """
     DOCSTRING
     """
-
-    def __init__(self, entity_detail_dict):
-        super().__init__(entity_detail_dict)
-        self.ENTITY = 'Event'
+    ENTITY = 'Events'
+    __slots__ = ('start', 'end', 'nextEventId', 'previousEventId', 'next', 'previous')
+    FIELDS = FrontEndEntity.FIELDS + __slots__
@@ -1,45 +1,63 @@
+from __future__ import annotations
+
+
 class FrontEndEntity:
-    """ Generic entity class model """
+    """
+    Generic entity class model. The columns in a model's FIELDS are kept in __slots__ instead of a per instance
+    __dict__, any other column of the row in _extra. Fields the row didn't have read as None and the BLOB
+    description is decoded on first read.
+    """
+    ENTITY = None
+    # columns all the entity queries may select (url attributes from FrontEndDB.URL_COLUMNS)
+    __slots__ = ('id', 'title', 'modified', 'resourceURI', 'thumbnail', 'thumbnailExtension', 'updated',
+                 'purchaseURL', 'detailURL', 'comicLink', 'readerURL', 'inAppLink', 'wiki', '_description', '_extra')
+    FIELDS = __slots__[:-2] + ('description',)
+    _FIELD_SET = frozenset(FIELDS)
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls._FIELD_SET = frozenset(cls.FIELDS)
 
     def __init__(self, entity_detail_dict):
-        self.id = None
-        self.title = None
-        self.description = None
-        self.seriesId = None
-        self.variantDescription = None
-        self.purchaseDate = None
-        self.purchaseType = None
-        self.purchasePrice = None
-        self.isPurchased = None
-        self.textObjects = {}
-
-        self.ENTITY = None
-
-        for key in entity_detail_dict:
-            setattr(self, key, entity_detail_dict[key])
-
-        if self.description:
-            self.description = self.description.decode()
-        if self.variantDescription:
-            self.variantDescription = self.variantDescription.decode()
-
-        if self.purchaseDate and self.purchaseType and self.purchasePrice:
-            self.isPurchased = True
-
-    def update_attributes(self, attributes, qualifier: str = None):
+        self._description = None
+        self._extra = None
+        self.update_attributes(entity_detail_dict)
+
+    def update_attributes(self, attributes):
         """
-        DOCSTRING
-        :param qualifier:
-        :param attributes:
+        Sets the columns of a row on the model
+        :param attributes: dict of column name -> value
         """
-        if qualifier is None:
-            for key in attributes:
-                setattr(self, key, attributes[key])
-        else:
-            for key in attributes:
-                temp_key = qualifier + '.' + str(key)
-                setattr(self, temp_key, attributes[key])
+        fields = self._FIELD_SET
+        for key, value in attributes.items():
+            if key in fields:
+                setattr(self, key, value)
+            else:
+                if self._extra is None:
+                    self._extra = {}
+                self._extra[key] = value
+
+    @property
+    def description(self) -> str | None:
+        if isinstance(self._description, bytes):
+            self._description = self._description.decode()
+        return self._description
+
+    @description.setter
+    def description(self, value):
+        self._description = value
+
+    def __getattr__(self, name):
+        # only called for names not set on the instance
+        if name in self._FIELD_SET:
+            return None
+        if name.startswith('_'):
+            raise AttributeError(name)
+        if self._extra is not None and name in self._extra:
+            return self._extra[name]
+        raise AttributeError(f"{type(self).__name__} has no attribute {name!r}")
 
     def __repr__(self):
         """"""
-        return f"<{self.ENTITY}: %s="">" % self.__dict__
+        columns = {name: getattr(self, name) for name in self.FIELDS if getattr(self, name) is not None}
+        return f"<{self.ENTITY}: {columns | (self._extra or {})}>"
@@ -5,7 +5,6 @@ class FrontEndImage(FrontEndEntity):
     """
     Image Entity CLass model
     """
-
-    def __init__(self, entity_detail_dict):
-        super().__init__(entity_detail_dict)
-        self.ENTITY = 'Images'
+    ENTITY = 'Images'
+    __slots__ = ()
+    FIELDS = FrontEndEntity.FIELDS + __slots__
@@ -5,7 +5,6 @@ class FrontEndSeries(FrontEndEntity):
     """
     Series Entity class model
     """
-
-    def __init__(self, entity_detail_dict):
-        super().__init__(entity_detail_dict)
-        self.ENTITY = 'Series'
+    ENTITY = 'Series'
+    __slots__ = ('startYear', 'endYear', 'rating', 'type', 'nextSeriesId', 'previousSeriesId', 'next', 'previous')
+    FIELDS = FrontEndEntity.FIELDS + __slots__
@@ -5,7 +5,7 @@ class FrontEndStory(FrontEndEntity):
     """
     Story Entity Class model
     """
-
-    def __init__(self, entity_detail_dict):
-        super().__init__(entity_detail_dict)
-        self.ENTITY = "Stories"
+    ENTITY = "Stories"
+    # interiorStory: the comic's interior FrontEndStory, set on its cover story by FrontEndDB._make_story_detail()
+    __slots__ = ('type', 'interiorStory')
+    FIELDS = FrontEndEntity.FIELDS + __slots__
@@ -13,3 +13,63 @@ function isPurchasedChanged() {
 }
 
 
+
+const REFRESH_POLL_INTERVAL = 1000;
+
+/**
+ * Queues the comic refresh as a background job and shows its progress under the button, reloading the page once it
+ * is done. Falls back to the plain form submit if the job can't be queued.
+ */
+function refreshComic(event, form) {
+    event.preventDefault();
+    let status = document.getElementById("refreshStatus");
+    status.textContent = "Queueing refresh...";
+
+    fetch(form.action + "?format=json")
+        .then(response => {
+            if (!response.ok) {
+                throw new Error(response.statusText);
+            }
+            return response.json();
+        })
+        .then(job => pollRefreshJob("/refresh/jobs/" + job.id, status))
+        .catch(() => form.submit());
+    return false;
+}
+
+function pollRefreshJob(jobUrl, status) {
+    fetch(jobUrl)
+        .then(response => {
+            if (!response.ok) {
+                throw new Error(response.statusText);
+            }
+            return response.json();
+        })
+        .then(job => {
+            status.textContent = describeRefreshJob(job);
+            if (job.status === "done") {
+                window.location.reload();
+            } else if (job.status !== "failed") {
+                setTimeout(() => pollRefreshJob(jobUrl, status), REFRESH_POLL_INTERVAL);
+            }
+        })
+        .catch(() => {
+            status.textContent = "Lost track of the refresh, reload the page to see its results";
+        });
+}
+
+function describeRefreshJob(job) {
+    if (job.status === "queued") {
+        return "Refresh queued...";
+    } else if (job.status === "failed") {
+        return "Refresh failed: " + job.error;
+    } else if (job.status === "done") {
+        return "Refresh done, reloading...";
+    }
+
+    let counts = job.counts[job.phase] || {done: 0, total: 0};
+    let phasesLeft = Object.keys(job.counts)
+        .filter(phase => phase !== job.phase && job.counts[phase].done < job.counts[phase].total);
+    return "Refreshing " + job.phase + " " + counts.done + " / " + counts.total
+        + (phasesLeft.length ? " (left: " + phasesLeft.join(", ") + ")" : "");
+}
@@ -6,14 +6,23 @@ Description: Frontend driver for web ui
 """
 from __future__ import annotations
 
+import hashlib
 import json
 import os
+import time
 from collections import namedtuple
+from datetime import datetime, timezone
 
-from flask import render_template, redirect, request, url_for
+import click
+from flask import Response, abort, jsonify, make_response, render_template, redirect, request, send_file, url_for
+from werkzeug.http import is_resource_modified
 
-from app import app, f_db, lookup, b_db
+from app import app, f_db, lookup_scheduler, b_db, search_index, cover_store, refresh_jobs
+from app.frontendDatabase.coverStore import COVER_SIZES, image_key, purchased_cover_keys
 from app.forms.editComicForm import EditComicForm
+from backend.classes.lookup_driver import Lookup
+from backend.classes.lookup_scheduler import LookupScheduler
+from backend.classes.refresh_jobs import FINISHED_STATUSES, RefreshJob
 
 dirname = os.path.dirname(__file__)
 
@@ -24,16 +33,125 @@ def index():
     return render_template("home.html")
 
 
+########################################################################################################################
+#
+#                           CONDITIONAL REQUESTS
+#
+########################################################################################################################
+def _validator_salt() -> str:
+    """
+    Hash of Config.PAGE_VERSION and the templates' contents. Every worker (and host) serving the same release salts
+    the ETags the same way, so any of them can answer a revalidation and they share the f_db.validated() results,
+    while pages rendered with older templates never match.
+    """
+    digest = hashlib.sha1(str(app.config['PAGE_VERSION']).encode())
+    template_dir = os.path.join(app.root_path, app.template_folder)
+    for root, dirs, files in os.walk(template_dir):
+        dirs.sort()
+        for file_name in sorted(files):
+            file_path = os.path.join(root, file_name)
+            digest.update(os.path.relpath(file_path, template_dir).encode())
+            with open(file_path, 'rb') as template_file:
+                digest.update(template_file.read())
+    return digest.hexdigest()[:12]
+
+
+VALIDATOR_SALT = _validator_salt()
+
+
+def _page_validators(validator: dict | None) -> tuple[str, datetime | None] | None:
+    """
+    Turns a FrontEndDB *_validator() row into a page's ETag and Last-Modified
+    :param validator: {'now', '*Updated', '*Count'} of the records the page shows
+    :return: (etag, last modified), None if the page can't be validated: no such record, or a record written in the
+    current second, which a second write within that second would leave with the same updated time
+    """
+    if validator is None:
+        return None
+
+    validator = dict(validator)
+    now = validator.pop('now')
+    newest = max((value for key, value in validator.items() if key.endswith('Updated') and value is not None),
+                 default=None)
+    if newest is not None and newest >= now:
+        return None
+
+    etag = hashlib.sha1(f"{request.path}:{VALIDATOR_SALT}:{sorted(validator.items())}".encode()).hexdigest()
+    return etag, datetime.fromtimestamp(newest, timezone.utc) if newest is not None else None
+
+
+def _is_not_modified(validators: tuple | None) -> bool:
+    """ :return: True if the request's If-None-Match (or If-Modified-Since) matches the page's validators """
+    if validators is None:
+        return False
+    return not is_resource_modified(request.environ, etag=validators[0], last_modified=validators[1])
+
+
+def _with_validators(response, validators: tuple | None):
+    """
+    Adds the page's ETag and Last-Modified to a response, and makes browsers check them before reusing the page
+    :return: the response
+    """
+    response.headers['Cache-Control'] = 'no-cache'
+    if validators is not None:
+        response.set_etag(validators[0])
+        if validators[1] is not None:
+            response.last_modified = validators[1]
+    return response
+
+
+def _not_modified(validators: tuple):
+    """ :return: an empty 304 response carrying the page's validators """
+    return _with_validators(make_response('', 304), validators)
+
+
+def _page_db(validators: tuple | None):
+    """
+    The validators come straight from MySQL, but f_db's cache can hold results from before a write another process
+    made. Pages render from results cached under their ETag, or uncached when they have none.
+    :return: the FrontEndDB (or cached view of it) to render the page from
+    """
+    if validators is None:
+        return f_db.uncached
+    return f_db.validated(validators[0])
+
+
 ########################################################################################################################
 #
 #                           COMICS
 #
 ########################################################################################################################
+def _listing_page_args() -> tuple:
+    """
+    Reads the listing query string: ?sort=<name>&order=asc|desc&after=<cursor>|before=<cursor>&limit=<n>
+    :return: (sort, descending, after, before, limit) as the FrontEndDB *_page() methods take them
+    """
+    return (
+            request.args.get('sort', f_db.DEFAULT_SORT),
+            request.args.get('order', 'asc') == 'desc',
+            request.args.get('after'),
+            request.args.get('before'),
+            request.args.get('limit', f_db.LISTING_PAGE_SIZE, type=int),
+    )
+
+
 @app.route('/comics', methods=['GET'])
 def comics():
-    """ Browse a list of all purchased comics currently in the frontendDatabase """
-    comics_data = f_db.get_purchased_comics()
-    return render_template("comic_pages/comics.html", comics_data=comics_data)
+    """ Browse the purchased comics currently in the frontendDatabase, one sorted page at a time """
+    page_args = _listing_page_args()
+    validators = _page_validators(f_db.get_purchased_comics_validator())
+    if _is_not_modified(validators):
+        return _not_modified(validators)
+
+    try:
+        page = _page_db(validators).get_purchased_comics_page(*page_args)
+    except ValueError:
+        abort(400)
+
+    return _with_validators(make_response(render_template(
+        "comic_pages/comics.html", comics_data=page['items'], page=page, sorts=f_db.COMIC_SORTS,
+        sort=page_args[0], order='desc' if page_args[1] else 'asc', limit=page_args[4]
+        )), validators)
 
 
 @app.route('/view/comic/<int:comic_id>', methods=["GET"])
@@ -44,97 +162,158 @@ def view_comic(comic_id):
     :return: render_template("comic_detail.html", comic_data, series_data, story_data, creator_data, event_data,
     character_data, image_data, variant_data)
     """
-    comic_detail = f_db.get_single_comic_detail(comic_id)
-
-    series_id = comic_detail.seriesId
-    series_detail = {}
-    if series_id is not None:
-        series_detail = f_db.get_single_series_detail(series_id)
-    story_detail = f_db.get_comic_stories(comic_id)[0]
-    creators_list = f_db.get_comic_creators(comic_id)
-    events_list = f_db.get_comic_events(comic_id)
-    character_list = f_db.get_comic_characters(comic_id)
-    variant_list = f_db.get_comic_variants(comic_id)
-    image_list = f_db.get_comic_images(comic_id)
-
-    return render_template(
-        "comic_pages/comic_detail.html",
-        comic_data=comic_detail,
-        series_data=series_detail,
-        story_data=story_detail,
-        creator_data=creators_list,
-        event_data=events_list,
-        character_data=character_list,
-        variant_data=variant_list,
-        image_data=image_list
-    )
+    validators = _page_validators(f_db.get_comic_validator(comic_id))
+    if _is_not_modified(validators):
+        return _not_modified(validators)
+
+    load_start = time.perf_counter()
+    comic_page = _page_db(validators).get_comic_page(comic_id)
+    if comic_page is None:
+        abort(404)
+
+    render_start = time.perf_counter()
+    response = make_response(render_template("comic_pages/comic_detail.html", **comic_page))
+
+    # server side latency shows up in the browser's network timing tab
+    response.headers['Server-Timing'] = \
+        f"db;dur={(render_start - load_start) * 1000:.1f}, render;dur={(time.perf_counter() - render_start) * 1000:.1f}"
+    return _with_validators(response, validators)
 
 
-def _update_comic_helper(comic_id):
+# dependencies of a comic refreshed after it, in this order
+REFRESH_DEPENDENCIES = (Lookup.CHARACTER_ENTITY, Lookup.CREATOR_ENTITY, Lookup.EVENT_ENTITY, Lookup.SERIES_ENTITY,
+                        Lookup.STORY_ENTITY, Lookup.VARIANT_ENTITY)
+# seconds between keep-alive comments of a quiet refresh job event stream
+REFRESH_EVENTS_KEEPALIVE = 15
+
+
+def _update_comic_helper(lookup: Lookup, comic_id, job: RefreshJob):
     """
-    Driver function for updating a comic and each of its entity dependencies
+    Driver function for updating a comic and each of its entity dependencies. Runs on the lookup scheduler's thread.
+    Only the comic's own dependencies are looked up, one record at a time, reporting each to the job.
+    :param lookup: the scheduler's Lookup
     :param comic_id: the id of the comic to update
+    :param job: the refresh's progress
     """
 
-    # create lookup object Lookup(f_db)
+    # lookup the comic book and store it in backend db
+    job.set_totals({lookup.COMIC_ENTITY: 1})
+    job.progress(lookup.COMIC_ENTITY, 0)
     lookup.comic_books[comic_id] = None
-
-    # lookup the comic book (lookup.lookup_marvel_comic_by_id(comic_id) and
-    lookup.lookup_marvel_comic_by_id(comic_id)
-    # store complete comic book in backend db (lookup.update_complete_comic_book_byID(comic_id)
-    lookup.update_complete_comic_book_byID(comic_id)
+    _refresh_and_forget(lookup, lookup.COMIC_ENTITY, comic_id)
+    job.progress(lookup.COMIC_ENTITY, 1)
 
     # get comic_has_entity ids from backend db
-    lookup.get_comic_has_entity_ids_from_db(lookup.CHARACTER_ENTITY, comic_id)
-    lookup.get_comic_has_entity_ids_from_db(lookup.CREATOR_ENTITY, comic_id)
-    lookup.get_comic_has_entity_ids_from_db(lookup.EVENT_ENTITY, comic_id)
-    lookup.get_comic_has_entity_ids_from_db(lookup.SERIES_ENTITY, comic_id)
-    lookup.get_comic_has_entity_ids_from_db(lookup.STORY_ENTITY, comic_id)
-    lookup.get_comic_has_entity_ids_from_db(lookup.VARIANT_ENTITY, comic_id)
-
-    # process each entity
-    for character_id in lookup.characters:
-        lookup.lookup_marvel_character_by_id(character_id)
-    for character_id in lookup.characters:
-        lookup.update_complete_character(character_id)
-
-    for creator_id in lookup.creators:
-        lookup.lookup_marvel_creator_by_id(creator_id)
-    for creator_id in lookup.creators:
-        lookup.update_complete_creator(creator_id)
-
-    for event_id in lookup.events:
-        lookup.lookup_marvel_event_by_id(event_id)
-    for event_id in lookup.events:
-        lookup.update_complete_event(event_id)
-
-    for series_id in lookup.series:
-        lookup.lookup_marvel_series_by_id(series_id)
-    for series_id in lookup.series:
-        lookup.update_complete_series(series_id)
-
-    for story_id in lookup.stories:
-        lookup.lookup_marvel_story_by_id(story_id)
-    for story_id in lookup.stories:
-        lookup.update_complete_story(story_id)
-
-    for variant_id in lookup.variants:
-        lookup.lookup_marvel_variant_by_id(variant_id)
-    for variant_id in lookup.variants:
-        lookup.update_complete_variant(variant_id)
-
-
-@app.route('/refresh/comic/<int:comic_id>', methods=["GET"])
+    dependency_ids = {
+            entity: list(dict.fromkeys(lookup.get_comic_has_entity_ids_from_db(entity, comic_id)))
+            for entity in REFRESH_DEPENDENCIES
+    }
+    job.set_totals({entity: len(entity_ids) for entity, entity_ids in dependency_ids.items()})
+
+    # lookup and store each dependency
+    for entity, entity_ids in dependency_ids.items():
+        for num_done, entity_id in enumerate(entity_ids):
+            job.progress(entity, num_done)
+            _refresh_and_forget(lookup, entity, entity_id)
+        job.progress(entity, len(entity_ids))
+
+
+def _refresh_and_forget(lookup: Lookup, entity: str, entity_id: int):
+    """
+    Refreshes one record, then drops it from the scheduler's long lived Lookup so manual refreshes don't keep every
+    object they made
+    """
+    try:
+        lookup.refresh_entity_by_id(entity, entity_id)
+    finally:
+        LookupScheduler.get_entity_dict(lookup, entity).pop(entity_id, None)
+
+
+@app.route('/refresh/comic/<int:comic_id>', methods=["GET", "POST"])
 def refresh_comic(comic_id):
     """
-    Update the comic and its dependencies
+    Queue a refresh of the comic and its dependencies on the lookup scheduler, ahead of any background refresh. A
+    refresh of a comic that is already queued or running joins that job.
     :param comic_id: the id of the comic to update
-    :return:
+    :return: redirect to the comic, or with ?format=json the job (202) to poll at /refresh/jobs/<job id>
     """
-    if request.method == 'GET':
-        _update_comic_helper(comic_id)
+    job = refresh_jobs.submit(comic_id, _update_comic_helper)
+
+    if request.args.get('format') == 'json':
+        return jsonify(job.to_dict()), 202, {'Location': url_for('refresh_job', job_id=job.id)}
+    return redirect(url_for('view_comic', comic_id=comic_id))
+
+
+@app.route('/refresh/jobs/<string:job_id>', methods=["GET"])
+def refresh_job(job_id):
+    """
+    A refresh job's status (queued, running, done, failed), current phase and records done / total per phase
+    :param job_id: the id refresh_comic returned
+    :return: json job
+    """
+    job = refresh_jobs.get(job_id)
+    if job is None:
+        abort(404)
+    return jsonify(job.to_dict())
+
+
+@app.route('/refresh/jobs/<string:job_id>/events', methods=["GET"])
+def refresh_job_events(job_id):
+    """
+    Server-sent events of a refresh job: the job as json every time it changes, until it finishes
+    :param job_id: the id refresh_comic returned
+    :return: text/event-stream response
+    """
+    job = refresh_jobs.get(job_id)
+    if job is None:
+        abort(404)
+
+    def events():
+        version = -1
+        while True:
+            state, new_version = job.wait_for_change(version, REFRESH_EVENTS_KEEPALIVE)
+            if new_version == version:
+                yield ": keep-alive\n\n"
+                continue
+
+            version = new_version
+            yield f"data: {json.dumps(state)}\n\n"
+            if state['status'] in FINISHED_STATUSES:
+                return
+
+    return Response(events(), mimetype='text/event-stream', headers={'Cache-Control': 'no-cache'})
+
+
+@app.route('/refresh/stale/<string:entity>', methods=["GET"])
+def refresh_stale(entity):
+    """
+    Queue a background refresh of every stale record of an entity (Comics, Characters, Creators, Events, Series,
+    Stories). User refreshes are always run first.
+    :param entity: the entity table name
+    :return: redirect to the home page
+    """
+    if entity == Lookup.COMIC_ENTITY or entity in Lookup.COMIC_DEPENDENCIES:
+        lookup_scheduler.submit_stale_sweep(entity)
+
+    return redirect(url_for('index'))
 
-        return redirect(url_for('view_comic', comic_id=comic_id))
+
+@app.route('/lookup/stats', methods=["GET"])
+def lookup_stats():
+    """
+    Lookup scheduler queue wait times per priority class and the remaining api budget
+    :return: json stats
+    """
+    return jsonify(lookup_scheduler.get_stats())
+
+
+@app.route('/cache/stats', methods=["GET"])
+def cache_stats():
+    """
+    Front end cache hits, misses and hit ratio overall and per FrontEndDB method, and the number of invalidations
+    :return: json stats
+    """
+    return jsonify(f_db.cache.get_stats())
 
 
 def _edit_comic_helper(comic_id) -> EditComicForm:
@@ -244,9 +423,21 @@ def edit_comic(comic_id) -> redirect or render_template:
 
 @app.route('/series', methods=['GET'])
 def series():
-    """ Browse a list of all series related to purchased comics currently in the frontendDatabase """
-    series_data = f_db.get_purchased_comics_related_series()
-    return render_template("series_pages/series.html", series_data=series_data)
+    """ Browse the series related to purchased comics currently in the frontendDatabase, one sorted page at a time """
+    page_args = _listing_page_args()
+    validators = _page_validators(f_db.get_purchased_series_validator())
+    if _is_not_modified(validators):
+        return _not_modified(validators)
+
+    try:
+        page = _page_db(validators).get_purchased_series_page(*page_args)
+    except ValueError:
+        abort(400)
+
+    return _with_validators(make_response(render_template(
+        "series_pages/series.html", series_data=page['items'], page=page, sorts=f_db.SERIES_SORTS,
+        sort=page_args[0], order='desc' if page_args[1] else 'asc', limit=page_args[4]
+        )), validators)
 
 
 @app.route('/view/series/<int:series_id>', methods=["GET"])
@@ -257,9 +448,112 @@ def view_series(series_id) -> render_template:
     :return: render_template("comic_detail.html", comic_data, series_data, story_data, creator_data, event_data,
     character_data, image_data, variant_data)
     """
-    series_detail = f_db.get_single_series_detail(series_id)
-    character_detail = f_db.get_series_characters(series_id)
+    validators = _page_validators(f_db.get_series_validator(series_id))
+    if _is_not_modified(validators):
+        return _not_modified(validators)
 
-    return render_template(
+    page_db = _page_db(validators)
+    series_detail = page_db.get_single_series_detail(series_id)
+    character_detail = page_db.get_series_characters(series_id)
+
+    return _with_validators(make_response(render_template(
         "series_pages/series_detail.html", series_data=series_detail, character_data=character_detail
-        )
+        )), validators)
+
+
+########################################################################################################################
+#
+#                           SEARCH
+#
+########################################################################################################################
+
+@app.route('/search', methods=["GET"])
+def search():
+    """
+    Search comics, series, characters and creators by title, name or comic description. ?q=<words>, add
+    &format=json for the hits as json.
+    :return: search results page or json
+    """
+    query = request.args.get('q', '').strip()
+
+    search_start = time.perf_counter()
+    results = search_index.search(query) if query else {}
+    search_ms = (time.perf_counter() - search_start) * 1000
+
+    if request.args.get('format') == 'json':
+        response = jsonify({
+                entity: {'total': entity_results['total'], 'hits': [hit._asdict() for hit in entity_results['hits']]}
+                for entity, entity_results in results.items()
+        })
+    else:
+        response = make_response(render_template("search.html", query=query, results=results))
+
+    response.headers['Server-Timing'] = f"search;dur={search_ms:.1f}"
+    return response
+
+
+@app.route('/search/stats', methods=["GET"])
+def search_stats():
+    """
+    Search index documents per entity, vocabulary size and how far its updated watermarks got
+    :return: json stats
+    """
+    return jsonify(search_index.get_stats())
+
+
+########################################################################################################################
+#
+#                           COVERS
+#
+########################################################################################################################
+# a stored cover never changes, Marvel gives new images new paths
+COVER_MAX_AGE = 365 * 24 * 60 * 60
+
+
+@app.template_global()
+def cover_url(thumbnail: str, extension: str, size: str) -> str:
+    """
+    Templates' src for an image at a COVER_SIZES size: the /covers route for images the store fetches, Marvel's own
+    resized variant for any other
+    :param thumbnail: the Images.path
+    :param extension: its Images.pathExtension
+    :param size: a COVER_SIZES name
+    :return: the url, '' without a thumbnail
+    """
+    if not thumbnail or not extension:
+        return ''
+
+    key = image_key(thumbnail, extension)
+    if not cover_store.is_storable(key):
+        return f"{thumbnail}/{COVER_SIZES[size][0]}{extension}"
+    return url_for('cover', size=size, key=key)
+
+
+@app.route('/covers/<string:size>/<path:key>', methods=["GET"])
+def cover(size, key):
+    """
+    Serve an image from the local cover store, storing it first on a miss
+    :param size: a COVER_SIZES name (portrait_small, card, detail)
+    :param key: the image's coverStore.image_key()
+    :return: the image, or a redirect to Marvel's copy if it couldn't be stored
+    """
+    try:
+        file_path = cover_store.get_cover(key, size)
+    except ValueError:
+        abort(404)
+
+    if file_path is None:
+        return redirect(cover_store.source_url(key, size))
+    return send_file(file_path, max_age=COVER_MAX_AGE)
+
+
+@app.cli.command('prefetch-covers')
+@click.option('--workers', type=int, default=None, help="download threads (default COVER_PREFETCH_WORKERS)")
+def prefetch_covers(workers):
+    """ Store every size of the purchased comic and series covers in the local cover store """
+    keys = purchased_cover_keys(f_db.uncached)
+    print(f"PREFETCHING {len(keys)} COVERS AT {len(COVER_SIZES)} SIZES")
+
+    counts = cover_store.prefetch(keys, workers=workers or app.config['COVER_PREFETCH_WORKERS'])
+    print(f"STORED {counts['stored']}, ALREADY STORED {counts['cached']}, FAILED {counts['failed']}, "
+          f"NOT STORABLE {counts['skipped']}")
@@ -31,6 +31,12 @@ class BackEndDB:
     PURCHASED_COMICS_ENTITY = 'PurchasedComics'
     ENTITIES = (CHARACTER_ENTITY, COMIC_ENTITY, CREATOR_ENTITY, EVENT_ENTITY, IMAGE_ENTITY,
                 SERIES_ENTITY, STORY_ENTITY, URL_ENTITY, PURCHASED_COMICS_ENTITY)
+    STREAM_BATCH_SIZE = 1000
+    DELETE_BATCH_SIZE = 500
+    # repeat scans of a buffered barcode keep the earliest upload date and count the scan (needs migration 002)
+    BUFFER_UPSERT = "ON DUPLICATE KEY UPDATE date_uploaded = LEAST(date_uploaded, VALUES(date_uploaded)), " \
+                    "scan_count = scan_count + 1, updated = CURRENT_TIMESTAMP"
+    CONNECT_TIMEOUT = 5
 
     def __init__(self):
         """
@@ -47,19 +53,23 @@ class BackEndDB:
         self._db = db_credentials.db
 
         self._connection = self._connect_to_database()
-        self.cursor = self._connection.cursor(MySQLdb.cursors.DictCursor)
+        self.cursor = self._connection.cursor(MySQLdb.cursors.DictCursor) if self._connection else None
 
         self.DB_DEBUG = False
+        self.DB_STREAM_READS = False  # opt in to unbuffered server side cursors for the large buffer/id reads
+        self.write_listeners = []  # called as listener(entity, entity_id) after each committed entity write
 
     ####################################################################################################################
     #
     #                                       GET FROM DATABASE
     #
     ####################################################################################################################
-    def get_upcs_from_buffer(self):
+    def get_upcs_from_buffer(self, stream: bool = None, as_tuples: bool = False):
         """
         Selects all entries from scanned_upc_codes from comic_books backendDatabase
-        :return: db cursor
+        :param stream: stream the rows from a server side cursor (defaults to DB_STREAM_READS)
+        :param as_tuples: return (upc_code, date_uploaded) tuples instead of dicts
+        :return: list of rows, or a row generator when streaming
         """
         if self._connection is None:
             print(
@@ -70,16 +80,111 @@ class BackEndDB:
         query = "SELECT upc_code, date_uploaded FROM scanned_upc_codes;"
 
         try:
-            self._execute_commit(query)
-            return self.cursor.fetchall()
+            return self._fetch_rows(query, stream=stream, as_tuples=as_tuples)
         except InvalidCursorExecute:
             print(f"GET UPCS ERROR")
             self._connection.rollback()
 
-    def get_stale_entity(self, entity_name: str):
+    def get_upcs_from_buffer_since(self, last_id: int, stream: bool = None):
+        """
+        Selects only the scanned_upc_codes rows added after a watermark, so a continuous lookup can poll the buffer
+        without re-reading rows it already queued
+        :param last_id: highest scanned_upc_codes id already read, 0 reads the whole buffer
+        :param stream: stream the rows from a server side cursor (defaults to DB_STREAM_READS)
+        :return: (id, upc_code, date_uploaded) tuples in id order, or a row generator when streaming
+        """
+        if self._connection is None:
+            print(
+                "No connection to the backendDatabase found! Have you called connect_to_database() first?"
+            )
+            return []
+
+        query = "SELECT id, upc_code, date_uploaded FROM scanned_upc_codes WHERE id > %s ORDER BY id;"
+        params = (last_id,)
+
+        try:
+            return self._fetch_rows(query, params, stream=stream, as_tuples=True)
+        except InvalidCursorExecute:
+            print(f"GET UPCS SINCE {last_id} ERROR")
+            self._connection.rollback()
+            return []
+
+    def lease_upcs_from_buffer(self, lease_owner: str, batch_size: int, lease_seconds: int) -> list[tuple]:
+        """
+        Atomically leases a batch of scanned_upc_codes rows for one lookup worker. Rows other workers are leasing are
+        skipped (FOR UPDATE SKIP LOCKED) and every buffered copy of a leased barcode is leased with it, so no barcode
+        is handled by two workers. Leases that expire are picked up again by the next lease.
+        :param lease_owner: unique name of the worker
+        :param batch_size: max number of rows to pick
+        :param lease_seconds: seconds until the lease expires
+        :return: [(id, upc_code, date_uploaded), ...] leased to lease_owner, empty if nothing is left
+        """
+        if self._connection is None:
+            print(
+                "No connection to the backendDatabase found! Have you called connect_to_database() first?"
+            )
+            return []
+
+        free_lease = "lease_expires IS NULL OR lease_expires < NOW()"
+        cursor = self._connection.cursor()
+
+        try:
+            cursor.execute(
+                f"SELECT upc_code FROM scanned_upc_codes WHERE {free_lease} "
+                f"ORDER BY id LIMIT %s FOR UPDATE SKIP LOCKED;", (batch_size,)
+            )
+            upc_codes = sorted({upc_code for upc_code, in cursor.fetchall()})
+
+            if not upc_codes:
+                self._connection.commit()
+                return []
+
+            upc_placeholders = ', '.join(['%s'] * len(upc_codes))
+            cursor.execute(
+                f"UPDATE scanned_upc_codes "
+                f"SET lease_owner = %s, lease_expires = NOW() + INTERVAL %s SECOND "
+                f"WHERE upc_code IN ({upc_placeholders}) AND ({free_lease} OR lease_owner = %s);",
+                (lease_owner, lease_seconds, *upc_codes, lease_owner)
+            )
+
+            # a barcode with a copy still leased by another worker stays with that worker
+            cursor.execute(
+                f"SELECT DISTINCT upc_code FROM scanned_upc_codes "
+                f"WHERE upc_code IN ({upc_placeholders}) AND lease_owner <> %s AND lease_expires >= NOW();",
+                (*upc_codes, lease_owner)
+            )
+            contended_upc_codes = [upc_code for upc_code, in cursor.fetchall()]
+            if contended_upc_codes:
+                contended_placeholders = ', '.join(['%s'] * len(contended_upc_codes))
+                cursor.execute(
+                    f"UPDATE scanned_upc_codes SET lease_owner = NULL, lease_expires = NULL "
+                    f"WHERE lease_owner = %s AND upc_code IN ({contended_placeholders});",
+                    (lease_owner, *contended_upc_codes)
+                )
+
+            cursor.execute(
+                f"SELECT id, upc_code, date_uploaded FROM scanned_upc_codes "
+                f"WHERE lease_owner = %s AND upc_code IN ({upc_placeholders}) ORDER BY id;",
+                (lease_owner, *upc_codes)
+            )
+            leased_rows = list(cursor.fetchall())
+            self._connection.commit()
+            return leased_rows
+        except MySQLdb.Error as e:
+            # a deadlock between two workers leasing copies of the same barcode rolls one of them back
+            print(f"LEASE UPCS FOR {lease_owner} ERROR: {e}")
+            self._rollback_or_disconnect()
+            return []
+        finally:
+            cursor.close()
+
+    def get_stale_entity(self, entity_name: str, stream: bool = None, as_tuples: bool = False):
         """
         Selects the Entity records that have a modified date older than a year ago or no modified date at all.
         Entities with no modified date were most likely added as a bare bones foreign key dependency.
+        :param entity_name: the name of the entity table
+        :param stream: stream the rows from a server side cursor (defaults to DB_STREAM_READS)
+        :param as_tuples: return (id,) tuples instead of dicts
         :return: set of entity ids to update
         """
         if entity_name in self.ENTITIES:
@@ -90,26 +195,87 @@ class BackEndDB:
                     f"YEAR(CURRENT_TIMESTAMP) - YEAR({entity_name}.modified) > 1 LIMIT 55, 5;"
 
             try:
-                self._execute_commit(query)
-                return self.cursor.fetchall()
+                return self._fetch_rows(query, stream=stream, as_tuples=as_tuples)
             except InvalidCursorExecute:
                 print(f"GET STALE {entity_name.upper()} ERROR")
                 self._connection.rollback()
 
-    def get_comic_purchased_ids(self):
+    def get_comic_purchased_ids(self, stream: bool = None, as_tuples: bool = False):
         """
         Gets a list of all purchased comic ids
+        :param stream: stream the rows from a server side cursor (defaults to DB_STREAM_READS)
+        :param as_tuples: return (comicId,) tuples instead of dicts
         :return: list of purchased comic ids
         """
 
         query = "SELECT comicId FROM PurchasedComics;"
         try:
-            self._execute_commit(query)
-            return self.cursor.fetchall()
+            return self._fetch_rows(query, stream=stream, as_tuples=as_tuples)
         except InvalidCursorExecute:
             print(f"GET PURCHASED COMIC IDS FROM PurchasedComics ERROR")
             self._connection.rollback()
 
+    def get_known_upcs(self, upc_prefix: str):
+        """
+        Streams every barcode that is either still in the scanned_upc_codes buffer or belongs to a purchased comic,
+        formatted the way the scanner formats them (prefix + '-' + upc)
+        :param upc_prefix: the scanner barcode prefix e.g. MAV18
+        :return: generator of (upc_code,) tuples
+        """
+        if self._connection is None:
+            print(
+                "No connection to the backendDatabase found! Have you called connect_to_database() first?"
+            )
+            return None
+
+        query = "SELECT upc_code FROM scanned_upc_codes " \
+                "UNION " \
+                "SELECT CONCAT(%s, '-', C.upc) " \
+                "FROM PurchasedComics PC " \
+                "INNER JOIN Comics C " \
+                "ON C.id = PC.comicId " \
+                "WHERE C.upc IS NOT NULL AND C.upc <> '';"
+        params = (upc_prefix,)
+
+        try:
+            return self._fetch_rows(query, params, stream=True, as_tuples=True)
+        except InvalidCursorExecute:
+            print(f"GET KNOWN UPCS ERROR")
+            self._connection.rollback()
+
+    def get_comic_upc_index(self):
+        """
+        Streams the upc and id of every comic with a upc so Lookup can resolve rescanned barcodes without the
+        Marvel api
+        :return: generator of (upc, comicId) tuples
+        """
+        query = "SELECT upc, id FROM Comics WHERE upc IS NOT NULL AND upc <> '';"
+
+        try:
+            return self._fetch_rows(query, stream=True, as_tuples=True)
+        except InvalidCursorExecute:
+            print(f"GET COMIC UPC INDEX ERROR")
+            self._connection.rollback()
+
+    def get_comic_purchase_defaults(self, comic_id: int):
+        """
+        Gets the stored on sale / digital dates and prices of a comic, used as the purchase defaults for comics
+        resolved from the local barcode index
+        :param comic_id: the comic's id
+        :return: dict with onSaleDate, printPrice, digitalPurchaseDate and digitalPurchasePrice or None
+        """
+        query = "SELECT onSaleDate, printPrice, digitalPurchaseDate, digitalPurchasePrice " \
+                "FROM Comics " \
+                "WHERE id = %s;"
+        params = (comic_id,)
+
+        try:
+            self._execute_commit(query, params)
+            return self.cursor.fetchone()
+        except InvalidCursorExecute:
+            print(f"GET COMIC {comic_id} PURCHASE DEFAULTS ERROR")
+            self._connection.rollback()
+
     def get_comic_has_entity_ids(self, entity: str, comic_id: int):
         """
         Get the entity Ids related to the given comic
@@ -150,12 +316,14 @@ class BackEndDB:
 
     def upload_upc_to_buffer(self, params: tuple[str, str]):
         """
-        Uploads a tuple of strings (upc and YYYY-MM-DD) to the scanned_upc_codes table in the comic_books backendDatabase
+        Uploads a tuple of strings (upc and YYYY-MM-DD) to the scanned_upc_codes table in the comic_books backendDatabase.
+        A barcode already in the buffer keeps one row with the earliest upload date and its scan_count goes up.
         :param params: (upc: str, YYYY-MM-DD: str)
         :return: cursor object from connection
         """
 
-        query = "INSERT INTO comic_books.scanned_upc_codes(upc_code, date_uploaded, updated) VALUES (%s, %s, CURRENT_TIMESTAMP);"
+        query = f"INSERT INTO comic_books.scanned_upc_codes(upc_code, date_uploaded, updated) " \
+                f"VALUES (%s, %s, CURRENT_TIMESTAMP) {self.BUFFER_UPSERT};"
 
         try:
             self._execute_commit(query, params)
@@ -163,6 +331,31 @@ class BackEndDB:
             print(f"UPC {params[0]} NOT UPLOADED TO BUFFER") if self.DB_DEBUG else 0
             self._connection.rollback()
 
+    def upload_upcs_to_buffer(self, params_list: list[tuple[str, str]]) -> bool:
+        """
+        Uploads a list of (upc, YYYY-MM-DD) tuples to the scanned_upc_codes table as a single multi-row upsert with
+        one commit, see upload_upc_to_buffer()
+        :param params_list: [(upc: str, YYYY-MM-DD: str), ...]
+        :return: True if the rows were committed, False otherwise
+        """
+        if not params_list:
+            return True
+
+        # built by hand, executemany only rewrites VALUES clauses made of nothing but placeholders
+        query = f"INSERT INTO comic_books.scanned_upc_codes(upc_code, date_uploaded, updated) " \
+                f"VALUES {', '.join(['(%s, %s, CURRENT_TIMESTAMP)'] * len(params_list))} {self.BUFFER_UPSERT};"
+        params = tuple(value for upc_params in params_list for value in upc_params)
+
+        try:
+            print("Executing %s with %s" % (query, params)) if self.DB_DEBUG else 0
+            self.cursor.execute(query, params)
+            self._commit_to_db()
+            return True
+        except (InvalidCursorExecute, MySQLdb.Error) as e:
+            print(f"{len(params_list)} UPCS NOT UPLOADED TO BUFFER: {e}")
+            self._rollback_or_disconnect()
+            return False
+
     def upload_complete_comic_book(self, params: tuple):
         """
         Inserts a new comic book record in the comic_books.comics table
@@ -207,6 +400,8 @@ class BackEndDB:
 
         try:
             self._execute_commit(query, params)
+            self.refresh_purchased_summaries(comic_ids=[params[0]])
+            self._notify_write(self.COMIC_ENTITY, params[0])
         except InvalidCursorExecute:
             print(f"COMIC {params[0]} : {params[2]} NOT UPLOADED TO Comics TABLE") if self.DB_DEBUG else 0
             self._connection.rollback()
@@ -233,6 +428,7 @@ class BackEndDB:
 
         try:
             self._execute_commit(query, params)
+            self._notify_write(self.CREATOR_ENTITY, params[0])
         except InvalidCursorExecute:
             print(f"CREATOR {params[0]} : {params[2]} NOT UPLOADED TO Comics TABLE") if self.DB_DEBUG else 0
             self._connection.rollback()
@@ -252,6 +448,8 @@ class BackEndDB:
                 f"updated = CURRENT_TIMESTAMP;"
         try:
             self._execute_commit(query, params)
+            self.refresh_purchased_summaries(comic_ids=[params[0]])
+            self._notify_write(self.PURCHASED_COMICS_ENTITY, params[0])
         except InvalidCursorExecute:
             print(f"PURCHASED COMIC {params[0]} NOT UPLOADED TO PurchasedComics TABLE")
             self._connection.rollback()
@@ -280,6 +478,8 @@ class BackEndDB:
                 f"updated = CURRENT_TIMESTAMP;"
         try:
             self._execute_commit(query, params)
+            self.refresh_purchased_summaries(series_ids=[params[0]])
+            self._notify_write(self.SERIES_ENTITY, params[0])
         except InvalidCursorExecute:
             print(f"SERIES {params[0]} NOT UPLOADED TO Series TABLE")
             self._connection.rollback()
@@ -302,6 +502,7 @@ class BackEndDB:
                 f"updated = CURRENT_TIMESTAMP;"
         try:
             self._execute_commit(query, params)
+            self._notify_write(self.STORY_ENTITY, params[0])
         except InvalidCursorExecute:
             print(f"STORY {params[0]} NOT UPLOADED TO Stories TABLE")
             self._connection.rollback()
@@ -323,6 +524,7 @@ class BackEndDB:
                 f"updated = CURRENT_TIMESTAMP;"
         try:
             self._execute_commit(query, params)
+            self._notify_write(self.CHARACTER_ENTITY, params[0])
         except InvalidCursorExecute:
             print(f"STORY {params[0]} NOT UPLOADED TO Stories TABLE")
             self._connection.rollback()
@@ -349,6 +551,7 @@ class BackEndDB:
                 f"updated = CURRENT_TIMESTAMP;"
         try:
             self._execute_commit(query, params)
+            self._notify_write(self.EVENT_ENTITY, params[0])
         except InvalidCursorExecute:
             print(f"EVENT {params[0]} NOT UPLOADED TO Events TABLE")
             self._connection.rollback()
@@ -375,6 +578,7 @@ class BackEndDB:
 
         try:
             self._execute_commit(query, params)
+            self._update_summary_thumbnails(image_path, image_extension)
         except InvalidCursorExecute:
             print(f"IMAGE {image_path + image_extension} NOT UPLOADED TO Images TABLE")
             self._connection.rollback()
@@ -585,6 +789,7 @@ class BackEndDB:
 
         try:
             self._execute_commit(query, params)
+            self._notify_write(self.COMIC_ENTITY, comic_id)
         except InvalidCursorExecute:
             print(
                 f"COMIC : VARIANT M:M RELATIONSHIP {comic_id} : {variant_id} WITH NOT UPLOADED TO Comics_has_Variants TABLE"
@@ -616,6 +821,7 @@ class BackEndDB:
 
             try:
                 self._execute_commit(query, params)
+                self._notify_write(parent_entity, parent_id)
             except InvalidCursorExecute:
                 print(
                     f"{parent_entity.upper()} : CHARACTER M:M RELATIONSHIP {parent_id} : {character_id} WITH NOT UPLOADED TO {tableName} TABLE"
@@ -649,6 +855,7 @@ class BackEndDB:
 
             try:
                 self._execute_commit(query, params)
+                self._notify_write(parent_entity, parent_id)
             except InvalidCursorExecute:
                 print(
                     f"{parent_entity.upper()} : CREATOR M:M RELATIONSHIP {parent_id} : {creator_id} WITH "
@@ -679,6 +886,7 @@ class BackEndDB:
 
             try:
                 self._execute_commit(query, params)
+                self._notify_write(parent_entity, parent_id)
             except InvalidCursorExecute:
                 print(
                     f"{parent_entity.upper()} : EVENTS M:M RELATIONSHIP {parent_id} : {event_id} NOT UPLOADED TO {tableName} TABLE"
@@ -709,6 +917,7 @@ class BackEndDB:
 
                 try:
                     self._execute_commit(query, params)
+                    self._notify_write(parent_entity, parent_id)
                 except InvalidCursorExecute:
                     print(
                         f"{parent_entity.upper()} : IMAGE M:M RELATIONSHIP {parent_id} : {image_path} NOT UPLOADED TO "
@@ -738,6 +947,7 @@ class BackEndDB:
 
             try:
                 self._execute_commit(query, params)
+                self._notify_write(parent_entity, parent_id)
             except InvalidCursorExecute:
                 print(
                     f"{parent_entity.upper()} : STORY M:M RELATIONSHIP {parent_id} : {story_id} "
@@ -772,6 +982,7 @@ class BackEndDB:
 
                 try:
                     self._execute_commit(query, params)
+                    self._notify_write(parent_entity, parent_id)
                 except InvalidCursorExecute:
                     print(
                         f"{parent_entity.upper()} : URL M:M RELATIONSHIP {parent_id} : {url} "
@@ -799,16 +1010,223 @@ class BackEndDB:
             print(f"DELETE {upc_code} NOT DELETED FROM scanned_upc_codes TABLE")
             self._connection.rollback()
 
+    def delete_upcs_from_buffer(self, upc_codes: list[str], max_id: int = None) -> int:
+        """
+        Deletes every buffered copy of the given barcodes, DELETE_BATCH_SIZE barcodes per statement
+        :param upc_codes: full upc_code strings including prefix
+        :param max_id: only delete rows up to this scanned_upc_codes id, so copies scanned after the buffer was read
+        are kept for the next poll
+        :return: number of rows deleted
+        """
+        num_deleted = 0
+
+        for batch_start in range(0, len(upc_codes), self.DELETE_BATCH_SIZE):
+            batch = upc_codes[batch_start:batch_start + self.DELETE_BATCH_SIZE]
+            query = f"DELETE FROM scanned_upc_codes WHERE upc_code IN ({', '.join(['%s'] * len(batch))})"
+            params = tuple(batch)
+            if max_id is not None:
+                query += " AND id <= %s"
+                params += (max_id,)
+
+            try:
+                self._execute_commit(query + ';', params)
+                num_deleted += self.cursor.rowcount
+            except InvalidCursorExecute:
+                print(f"{len(batch)} UPCS NOT DELETED FROM scanned_upc_codes TABLE")
+                self._connection.rollback()
+
+        return num_deleted
+
+    def delete_leased_upcs(self, lease_owner: str, row_ids: list[int]) -> int:
+        """
+        Deletes committed scanned_upc_codes rows that are still leased to the worker. Rows whose lease expired and
+        were leased by another worker are left to that worker.
+        :param lease_owner: unique name of the worker
+        :param row_ids: scanned_upc_codes ids returned by lease_upcs_from_buffer()
+        :return: number of rows deleted
+        """
+        if not row_ids:
+            return 0
+
+        query = f"DELETE FROM scanned_upc_codes " \
+                f"WHERE lease_owner = %s AND id IN ({', '.join(['%s'] * len(row_ids))});"
+        params = (lease_owner, *row_ids)
+
+        try:
+            self._execute_commit(query, params)
+            return self.cursor.rowcount
+        except InvalidCursorExecute:
+            print(f"LEASED ROWS {row_ids} NOT DELETED FROM scanned_upc_codes TABLE")
+            self._connection.rollback()
+            return 0
+
+    def release_leased_upcs(self, lease_owner: str, row_ids: list[int], hold_seconds: int = None) -> int:
+        """
+        Ends a worker's lease on scanned_upc_codes rows it didn't commit, so they can be leased again
+        :param lease_owner: unique name of the worker
+        :param row_ids: scanned_upc_codes ids returned by lease_upcs_from_buffer()
+        :param hold_seconds: keep the rows leased this many more seconds instead of freeing them right away
+        :return: number of rows released
+        """
+        if not row_ids:
+            return 0
+
+        if hold_seconds is None:
+            lease_update, params = "lease_owner = NULL, lease_expires = NULL", ()
+        else:
+            lease_update, params = "lease_expires = NOW() + INTERVAL %s SECOND", (hold_seconds,)
+
+        query = f"UPDATE scanned_upc_codes SET {lease_update} " \
+                f"WHERE lease_owner = %s AND id IN ({', '.join(['%s'] * len(row_ids))});"
+        params += (lease_owner, *row_ids)
+
+        try:
+            self._execute_commit(query, params)
+            return self.cursor.rowcount
+        except InvalidCursorExecute:
+            print(f"LEASED ROWS {row_ids} NOT RELEASED")
+            self._connection.rollback()
+            return 0
+
     def delete_from_purchased_comics(self, comic_id: int):
         query = "DELETE FROM PurchasedComics WHERE comicId=%s;"
         params = (comic_id,)
 
         try:
             self._execute_commit(query, params)
+            self.refresh_purchased_summaries(comic_ids=[comic_id])
+            self._notify_write(self.PURCHASED_COMICS_ENTITY, comic_id)
         except InvalidCursorExecute:
             print(f"DELETE {comic_id} NOT DELETED FROM PurchasedComics TABLE")
             self._connection.rollback()
 
+    ####################################################################################################################
+    #
+    #                                   PURCHASED SUMMARIES
+    #
+    ####################################################################################################################
+    # listing rows of PurchasedComicsSummary / PurchasedSeriesSummary, see Resources/sql/004_purchased_summaries.sql
+    COMIC_SUMMARY_INSERT = \
+        "INSERT INTO PurchasedComicsSummary " \
+        "(comicId, title, issueNumber, seriesId, seriesTitle, thumbnail, thumbnailExtension, purchaseDate, " \
+        "purchasePrice, purchaseType) " \
+        "SELECT PC.comicId, C.title, C.issueNumber, C.seriesId, S.title, C.thumbnail, I.pathExtension, " \
+        "PC.purchaseDate, PC.purchasePrice, PC.purchaseType " \
+        "FROM PurchasedComics PC " \
+        "INNER JOIN Comics C " \
+        "ON C.id = PC.comicId " \
+        "LEFT JOIN Series S " \
+        "ON C.seriesId = S.id " \
+        "LEFT JOIN Images I " \
+        "ON C.thumbnail = I.path "
+    SERIES_SUMMARY_INSERT = \
+        "INSERT INTO PurchasedSeriesSummary " \
+        "(seriesId, title, startYear, thumbnail, thumbnailExtension, purchasedCount) " \
+        "SELECT S.id, S.title, S.startYear, S.thumbnail, I.pathExtension, COUNT(*) " \
+        "FROM PurchasedComics PC " \
+        "INNER JOIN Comics C " \
+        "ON C.id = PC.comicId " \
+        "INNER JOIN Series S " \
+        "ON C.seriesId = S.id " \
+        "LEFT JOIN Images I " \
+        "ON S.thumbnail = I.path "
+    SERIES_SUMMARY_GROUP_BY = "GROUP BY S.id, S.title, S.startYear, S.thumbnail, I.pathExtension"
+
+    def refresh_purchased_summaries(self, comic_ids=(), series_ids=()) -> bool:
+        """
+        Rewrites the listing summary rows of some comics and series from the base tables, in one transaction.
+        Comics no longer purchased and series without purchased comics lose their rows. A comic's series, before and
+        after the write, is refreshed with it, and a series' title is copied to its comics' rows.
+        :param comic_ids: comics whose Comics or PurchasedComics record changed
+        :param series_ids: series whose Series record changed
+        :return: True if the summaries were committed
+        """
+        comic_ids = [comic_id for comic_id in comic_ids if comic_id is not None]
+        series_ids = {series_id for series_id in series_ids if series_id is not None}
+        if not comic_ids and not series_ids:
+            return True
+
+        try:
+            if comic_ids:
+                comic_in = f"({', '.join(['%s'] * len(comic_ids))})"
+                self.cursor.execute(
+                    f"SELECT seriesId FROM PurchasedComicsSummary WHERE comicId IN {comic_in} "
+                    f"UNION SELECT seriesId FROM Comics WHERE id IN {comic_in};", tuple(comic_ids) * 2
+                )
+                changed_series_ids = {row['seriesId'] for row in self.cursor.fetchall()} - {None}
+
+                self.cursor.execute(f"DELETE FROM PurchasedComicsSummary WHERE comicId IN {comic_in};",
+                                    tuple(comic_ids))
+                self.cursor.execute(f"{self.COMIC_SUMMARY_INSERT}WHERE PC.comicId IN {comic_in};", tuple(comic_ids))
+            else:
+                changed_series_ids = set()
+
+            if series_ids:
+                series_in = f"({', '.join(['%s'] * len(series_ids))})"
+                self.cursor.execute(
+                    f"UPDATE PurchasedComicsSummary PCS "
+                    f"INNER JOIN Series S "
+                    f"ON PCS.seriesId = S.id "
+                    f"SET PCS.seriesTitle = S.title "
+                    f"WHERE S.id IN {series_in};", tuple(series_ids)
+                )
+
+            series_ids = list(series_ids | changed_series_ids)
+            if series_ids:
+                series_in = f"({', '.join(['%s'] * len(series_ids))})"
+                self.cursor.execute(f"DELETE FROM PurchasedSeriesSummary WHERE seriesId IN {series_in};",
+                                    tuple(series_ids))
+                self.cursor.execute(
+                    f"{self.SERIES_SUMMARY_INSERT}WHERE S.id IN {series_in} {self.SERIES_SUMMARY_GROUP_BY};",
+                    tuple(series_ids)
+                )
+
+            self._commit_to_db()
+            return True
+        except (InvalidCursorExecute, MySQLdb.Error) as e:
+            print(f"PURCHASED SUMMARIES OF COMICS {comic_ids} SERIES {series_ids} NOT REFRESHED: {e}")
+            self._rollback_or_disconnect()
+            return False
+
+    def rebuild_purchased_summaries(self) -> tuple[int, int]:
+        """
+        Rebuilds PurchasedComicsSummary and PurchasedSeriesSummary from the base tables in one transaction, so the
+        listings keep reading the old rows until it commits
+        :return: (comic rows, series rows) written
+        """
+        try:
+            self.cursor.execute("DELETE FROM PurchasedComicsSummary;")
+            self.cursor.execute(self.COMIC_SUMMARY_INSERT + ";")
+            num_comics = self.cursor.rowcount
+            self.cursor.execute("DELETE FROM PurchasedSeriesSummary;")
+            self.cursor.execute(f"{self.SERIES_SUMMARY_INSERT}{self.SERIES_SUMMARY_GROUP_BY};")
+            num_series = self.cursor.rowcount
+            self._commit_to_db()
+        except (InvalidCursorExecute, MySQLdb.Error) as e:
+            print(f"PURCHASED SUMMARIES NOT REBUILT: {e}")
+            self._rollback_or_disconnect()
+            return 0, 0
+
+        self._notify_write(self.PURCHASED_COMICS_ENTITY, None)
+        return num_comics, num_series
+
+    def _update_summary_thumbnails(self, image_path: str, image_extension: str):
+        """
+        Copies a new image's extension to the summary rows showing it as their thumbnail
+        """
+        try:
+            for table in ('PurchasedComicsSummary', 'PurchasedSeriesSummary'):
+                self.cursor.execute(f"UPDATE {table} SET thumbnailExtension = %s WHERE thumbnail = %s;",
+                                    (image_extension, image_path))
+            self._commit_to_db()
+        except (InvalidCursorExecute, MySQLdb.Error) as e:
+            print(f"SUMMARY THUMBNAILS OF {image_path} NOT UPDATED: {e}")
+            self._rollback_or_disconnect()
+            return
+
+        # the cached listings read these summary rows
+        self._notify_write(self.PURCHASED_COMICS_ENTITY, None)
+
     ####################################################################################################################
     #
     #                                   UTILITIES
@@ -838,6 +1256,26 @@ class BackEndDB:
             print(f"{parent_entity} HAS NO RELATION... ") if self.DB_DEBUG else 0
             return None
 
+    def add_write_listener(self, listener):
+        """
+        Registers a function called after every committed write to an entity record or its relations, e.g. to
+        invalidate a cache of the front end pages
+        :param listener: function(entity: str, entity_id) -> None
+        """
+        self.write_listeners.append(listener)
+
+    def _notify_write(self, entity: str, entity_id):
+        """
+        Tells the write listeners a record changed. A failing listener is reported but never fails the write.
+        :param entity: entity table name, e.g. COMIC_ENTITY
+        :param entity_id: the written record's id
+        """
+        for listener in self.write_listeners:
+            try:
+                listener(entity, entity_id)
+            except Exception as e:
+                print(f"WRITE LISTENER FAILED FOR {entity} {entity_id}: {e}")
+
     ####################################################################################################################
     #
     #                                       DATABASE MANAGEMENT
@@ -847,7 +1285,36 @@ class BackEndDB:
         """
         Closes the db connection
         """
-        self.cursor.close()
+        if self.cursor is not None:
+            self.cursor.close()
+
+    def is_connected(self) -> bool:
+        """
+        Checks whether there is an open connection to the backendDatabase
+        :return: True if connected
+        """
+        return self._connection is not None and self.cursor is not None
+
+    def reconnect(self) -> bool:
+        """
+        Opens a new connection and cursor, e.g. after the server went away
+        :return: True if the new connection succeeded
+        """
+        self._connection = self._connect_to_database()
+        self.cursor = self._connection.cursor(MySQLdb.cursors.DictCursor) if self._connection else None
+        return self.is_connected()
+
+    def _rollback_or_disconnect(self):
+        """
+        Rolls back the current transaction. If the connection itself is gone it is dropped so is_connected() reports
+        it and the next caller can reconnect.
+        """
+        try:
+            self._connection.rollback()
+        except MySQLdb.Error:
+            print("BackEndDB CONNECTION LOST...")
+            self._connection = None
+            self.cursor = None
 
     def _commit_to_db(self):
         """
@@ -860,7 +1327,14 @@ class BackEndDB:
         manages connecting to the backendDatabase
         :return: the MySQLdb.connect() object
         """
-        db_connection = MySQLdb.connect(self._host, self._user, self._passwd, self._db)
+        try:
+            db_connection = MySQLdb.connect(
+                self._host, self._user, self._passwd, self._db, connect_timeout=self.CONNECT_TIMEOUT
+            )
+        except MySQLdb.OperationalError as e:
+            print(f"BackEndDB NOT CONNECTED... {e}")
+            return None
+
         if db_connection:
             print("BackEndDB CONNECTED...")
             return db_connection
@@ -877,3 +1351,83 @@ class BackEndDB:
             self.cursor.execute(query, params)
 
         self._commit_to_db()
+
+    def _fetch_rows(self, query, params=None, stream: bool = None, as_tuples: bool = False):
+        """
+        Runs a read query and returns its rows. Buffered reads hold the whole result set in memory, streamed reads
+        yield the rows from an unbuffered server side cursor.
+        :param query: the select query to run
+        :param params: optional query parameters
+        :param stream: stream the rows from a server side cursor (defaults to DB_STREAM_READS)
+        :param as_tuples: return plain tuples instead of dicts
+        :return: list of rows, or a row generator when streaming
+        """
+        if stream is None:
+            stream = self.DB_STREAM_READS
+
+        if stream:
+            return self._stream_rows(query, params, as_tuples)
+
+        if not as_tuples:
+            self._execute_commit(query, params)
+            return self.cursor.fetchall()
+
+        cursor = self._connection.cursor(MySQLdb.cursors.Cursor)
+        try:
+            print("Executing %s with %s" % (query, params)) if self.DB_DEBUG else 0
+            cursor.execute(query, params)
+            self._commit_to_db()
+            return cursor.fetchall()
+        finally:
+            cursor.close()
+
+    def _stream_rows(self, query, params=None, as_tuples: bool = False):
+        """
+        Runs a read query on an unbuffered SSCursor/SSDictCursor and returns a generator over its rows. The query is
+        executed here and its errors are raised as InvalidCursorExecute, so they reach the caller's try/except
+        instead of escaping later from wherever the rows are iterated. Rows are pulled from the server
+        STREAM_BATCH_SIZE at a time. The connection can't run another query until the generator is exhausted or
+        closed.
+        :param query: the select query to run
+        :param params: optional query parameters
+        :param as_tuples: yield plain tuples instead of dicts
+        :return: row generator
+        """
+        cursor_class = MySQLdb.cursors.SSCursor if as_tuples else MySQLdb.cursors.SSDictCursor
+        cursor = self._connection.cursor(cursor_class)
+
+        try:
+            print("Streaming %s with %s" % (query, params)) if self.DB_DEBUG else 0
+            cursor.execute(query, params)
+        except MySQLdb.Error as e:
+            cursor.close()
+            raise InvalidCursorExecute(e) from e
+
+        return self._iterate_stream(cursor)
+
+    def _iterate_stream(self, cursor):
+        """
+        Yields the rows of an executed unbuffered cursor. A fetch error ends the stream early and rolls back (or drops
+        the lost connection) instead of escaping into the code iterating it.
+        :param cursor: an SSCursor/SSDictCursor _stream_rows() executed the query on
+        """
+        failed = False
+        try:
+            rows = cursor.fetchmany(self.STREAM_BATCH_SIZE)
+            while rows:
+                yield from rows
+                rows = cursor.fetchmany(self.STREAM_BATCH_SIZE)
+        except (InvalidCursorExecute, MySQLdb.Error) as e:
+            print(f"STREAM ROWS ERROR: {e}")
+            failed = True
+        finally:
+            # closing an unbuffered cursor drains any unread rows so the connection is usable again
+            try:
+                cursor.close()
+            except MySQLdb.Error:
+                failed = True
+
+            if failed:
+                self._rollback_or_disconnect()
+            else:
+                self._commit_to_db()
@@ -0,0 +1,381 @@
+"""
+Author: Zane Miller
+Email: millerzanem@gmail.com
+Date: 10/19/2026
+Description: Resident lookup service. Scanner uploads wake it over a socket and it looks up the new
+scanned_upc_codes rows on a warm Lookup (one kept open db connection and http session).
+"""
+
+from __future__ import annotations
+
+import datetime
+import ipaddress
+import json
+import os
+import signal
+import socket
+import socketserver
+import threading
+import time
+
+import requests
+from keys import db_credentials
+
+from backend.classes.lookup_scheduler import APP_DAILY_CALL_LIMIT, BACKGROUND_PRIORITY, MARVEL_DAILY_CALL_LIMIT, \
+    ApiBudget
+from backend.classes.lookup_worker import WORKER_BATCH_SIZE, WORKER_LEASE_SECONDS
+
+# the scanner Pi and the daemon usually run on different machines, so the address comes from the same credentials
+# module as the db connection: lookup_daemon_host is where scanners send WAKE, lookup_daemon_bind_host (defaults to
+# lookup_daemon_host, '0.0.0.0' listens on every interface) is where the daemon listens. SHUTDOWN is only accepted
+# from the daemon's own machine
+DAEMON_HOST = getattr(db_credentials, 'lookup_daemon_host', '127.0.0.1')
+DAEMON_BIND_HOST = getattr(db_credentials, 'lookup_daemon_bind_host', DAEMON_HOST)
+DAEMON_PORT = int(getattr(db_credentials, 'lookup_daemon_port', 47020))
+DAEMON_POLL_INTERVAL = 60
+# the key's calls the web app's scheduler doesn't get, the daemon runs background work only so it reserves none
+DAEMON_DAILY_CALL_LIMIT = MARVEL_DAILY_CALL_LIMIT - APP_DAILY_CALL_LIMIT
+DAEMON_CLIENT_TIMEOUT = 0.5
+DAEMON_CHECKPOINT_PATH = os.path.join(os.path.expanduser('~'), '.pi-comic-scanner', 'lookup_daemon.json')
+WAKE_COMMAND = 'WAKE'
+STATUS_COMMAND = 'STATUS'
+SHUTDOWN_COMMAND = 'SHUTDOWN'
+
+
+def send_daemon_command(command: str, host: str = DAEMON_HOST, port: int = DAEMON_PORT,
+                        timeout: float = DAEMON_CLIENT_TIMEOUT) -> dict | None:
+    """
+    Sends one command to a running LookupDaemon
+    :param command: WAKE_COMMAND, STATUS_COMMAND or SHUTDOWN_COMMAND
+    :return: the daemon's reply, None if no daemon is listening
+    """
+    try:
+        with socket.create_connection((host, port), timeout=timeout) as connection:
+            connection.sendall(command.encode() + b'\n')
+            reply = connection.makefile('rb').readline()
+    except OSError:
+        return None
+
+    return json.loads(reply) if reply else None
+
+
+def notify_lookup_daemon(host: str = DAEMON_HOST, port: int = DAEMON_PORT) -> bool:
+    """
+    Best effort wake up after new rows were uploaded to the buffer. Without a daemon running this returns right away.
+    :return: True if a daemon was woken
+    """
+    return send_daemon_command(WAKE_COMMAND, host, port) is not None
+
+
+class _DaemonRequestHandler(socketserver.StreamRequestHandler):
+    """ Answers one newline terminated command with one line of json """
+
+    def handle(self):
+        command = self.rfile.readline(64).strip().decode(errors='replace').upper()
+        # the socket may listen on the LAN for scanner wake ups, but only this machine may stop the daemon
+        if command == SHUTDOWN_COMMAND and not ipaddress.ip_address(self.client_address[0]).is_loopback:
+            reply = {'ok': False, 'error': f"{SHUTDOWN_COMMAND} is only accepted from this machine"}
+        else:
+            reply = self.server.lookup_daemon.handle_command(command)
+        self.wfile.write(json.dumps(reply).encode() + b'\n')
+
+
+class _DaemonServer(socketserver.ThreadingTCPServer):
+    allow_reuse_address = True
+    daemon_threads = True
+
+
+class LookupDaemon:
+    """
+    Looks up the buffer whenever it is woken, or every poll_interval seconds as a fallback, and commits it. Rows are
+    leased in batches like a LookupWorker's, so uploads that commit out of id order are never skipped and workers can
+    share the buffer with the daemon. The buffer itself is the durable queue; the checkpoint keeps what the buffer
+    can't: the api calls used today, barcodes that already failed today (their rows stay leased until tomorrow) and
+    the running totals. The Lookup must have purchase_rules set since nobody is there to answer its prompts.
+    """
+
+    def __init__(self, lookup, api_budget: ApiBudget = None, checkpoint_path: str = DAEMON_CHECKPOINT_PATH,
+                 host: str = DAEMON_BIND_HOST, port: int = DAEMON_PORT, poll_interval: int = DAEMON_POLL_INTERVAL,
+                 worker_name: str = None, batch_size: int = WORKER_BATCH_SIZE,
+                 lease_seconds: int = WORKER_LEASE_SECONDS):
+        """
+        :param lookup: headless Lookup with its own db connection
+        :param api_budget: daily api budget, defaults to DAEMON_DAILY_CALL_LIMIT with no user reserve
+        :param checkpoint_path: json file the daemon state is saved to after every pass
+        :param host: address the command socket listens on
+        :param port: port the command socket listens on
+        :param poll_interval: seconds between passes when nobody wakes the daemon
+        :param worker_name: unique lease owner name, defaults to hostname-pid
+        :param batch_size: buffer rows leased per batch
+        :param lease_seconds: how long a batch may take before its rows are given to another worker
+        """
+        self.lookup = lookup
+        self.api_budget = api_budget if api_budget is not None else ApiBudget(DAEMON_DAILY_CALL_LIMIT, user_reserve=0)
+        self.checkpoint_path = checkpoint_path
+        self.host = host
+        self.port = port
+        self.poll_interval = poll_interval
+        self.worker_name = worker_name or f"{socket.gethostname()}-{os.getpid()}"
+        self.batch_size = batch_size
+        self.lease_seconds = lease_seconds
+
+        self.failed_barcodes = {}  # (failed_barcodes[barcode] = ISO date of its last failed lookup)
+        self.num_passes = 0
+        self.num_committed = 0  # since the first run, restored from the checkpoint
+        self.num_committed_session = 0
+
+        self._status = {'backlog': 0, 'queued': 0, 'last_pass': None}
+        self._status_lock = threading.Lock()
+        self._wake_event = threading.Event()
+        self._stop_event = threading.Event()
+        self._server = None
+        self._start_time = None
+
+    def run(self):
+        """
+        Serves commands and runs passes until SHUTDOWN, SIGTERM or SIGINT. The pass in progress is finished, the
+        checkpoint saved and the db closed before returning. Must be called from the main thread for the signal
+        handlers.
+        """
+        self.load_checkpoint()
+
+        self._server = _DaemonServer((self.host, self.port), _DaemonRequestHandler)
+        self._server.lookup_daemon = self
+        threading.Thread(target=self._server.serve_forever, name="LookupDaemonSocket", daemon=True).start()
+
+        signal.signal(signal.SIGTERM, self._handle_signal)
+        signal.signal(signal.SIGINT, self._handle_signal)
+
+        print(f"LOOKUP DAEMON LISTENING ON {self.host}:{self.port}")
+        self._start_time = time.perf_counter()
+        self._wake_event.set()  # catch up on whatever was scanned while the daemon was down
+
+        try:
+            while not self._stop_event.is_set():
+                self._wake_event.wait(self.poll_interval)
+                if self._stop_event.is_set():
+                    break
+                self._wake_event.clear()
+                self.process_pass()
+        finally:
+            self._server.shutdown()
+            self._server.server_close()
+            self.save_checkpoint()
+            self.lookup.db.close_cursor()
+            print("LOOKUP DAEMON STOPPED")
+
+    def stop(self):
+        """ Stops the daemon after the barcode it is looking up """
+        self._stop_event.set()
+        self._wake_event.set()
+
+    def wake(self):
+        """ Starts a pass now instead of at the next poll """
+        self._wake_event.set()
+
+    def process_pass(self) -> int:
+        """
+        Leases the buffer batch by batch, looks up each batch while the api budget allows, commits what was found and
+        deletes it from the buffer. A pass ends when nothing is left to lease or a batch is interrupted (shutdown,
+        budget or network); the untried rows of that batch are released for the next pass.
+        :return: number of barcodes committed
+        """
+        if not self.lookup.db.is_connected() and not self.lookup.db.reconnect():
+            print("LOOKUP DAEMON: DATABASE UNAVAILABLE, RETRYING NEXT PASS")
+            return 0
+
+        pass_start = time.perf_counter()
+        num_leased = 0
+        num_committed = 0
+        interrupted = False
+
+        while not interrupted and not self._stop_event.is_set() and self.api_budget.allows(BACKGROUND_PRIORITY):
+            num_batch_rows = self.lookup.lease_barcodes_from_db(self.worker_name, self.batch_size, self.lease_seconds)
+            if num_batch_rows == 0:
+                break
+
+            num_leased += num_batch_rows
+            self._update_status()
+            interrupted = not self._look_up_batch()
+            num_committed += self._commit_batch(interrupted)
+
+        self.num_passes += 1
+        self.num_committed += num_committed
+        self.num_committed_session += num_committed
+        self._update_status({
+                'finished'    : datetime.datetime.now().isoformat(timespec='seconds'),
+                'leased_rows' : num_leased,
+                'committed'   : num_committed,
+                'pass_seconds': round(time.perf_counter() - pass_start, 2),
+        })
+        self.save_checkpoint()
+
+        return num_committed
+
+    def _look_up_batch(self) -> bool:
+        """
+        Looks up the leased batch's backlog
+        :return: False if the batch was interrupted by a shutdown, the api budget or a failed request
+        """
+        today = datetime.date.today().isoformat()
+
+        for barcode in self.get_backlog():
+            if self._stop_event.is_set() or not self.api_budget.allows(BACKGROUND_PRIORITY):
+                return False
+
+            api_calls_before = self.lookup.api_calls
+            try:
+                self.lookup.lookup_marvel_comic_by_upc(barcode)
+            except (requests.RequestException, KeyError, ValueError) as e:
+                # network down or an error response (e.g. rate limited), try again next pass
+                print(f"LOOKUP DAEMON: LOOKUP OF {barcode} FAILED: {e}")
+                return False
+            finally:
+                self.api_budget.spend(self.lookup.api_calls - api_calls_before)
+
+            if barcode not in self.lookup.lookedUp_barcodes:
+                self.failed_barcodes[barcode] = today
+            self._update_status()
+
+        return True
+
+    def _commit_batch(self, interrupted: bool) -> int:
+        """
+        Commits the batch's looked up barcodes, deletes their rows and settles the leases of the rest: barcodes that
+        failed today stay leased until tomorrow, untried ones of an interrupted batch are released right away and
+        ones that didn't commit are retried when their lease expires.
+        :param interrupted: _look_up_batch() stopped early
+        :return: number of barcodes committed
+        """
+        for barcode in list(self.lookup.lookedUp_barcodes):
+            self.lookup.upload_complete_comic_book_byUPC(barcode)
+
+        num_committed = self.lookup.get_num_committed_barcodes()
+        self.lookup.remove_committed_from_buffer_db()
+
+        now = datetime.datetime.now()
+        today = now.date().isoformat()
+        tomorrow = datetime.datetime.combine(now.date() + datetime.timedelta(days=1), datetime.time())
+        self.lookup.release_leased_barcodes(
+            [barcode for barcode in self.lookup.leased_row_ids if self.failed_barcodes.get(barcode) == today],
+            hold_seconds=int((tomorrow - now).total_seconds()) + 1
+        )
+        if interrupted:
+            self.lookup.release_leased_barcodes(
+                [barcode for barcode in self.lookup.leased_row_ids if barcode not in self.lookup.lookedUp_barcodes]
+            )
+
+        self.lookup.clear_barcode_batch()
+        return num_committed
+
+    def get_backlog(self) -> list[str]:
+        """
+        :return: barcodes of the leased batch still to be looked up, leaving out barcodes that already failed today
+        """
+        today = datetime.date.today().isoformat()
+        return [
+                barcode for barcode in self.lookup.queued_barcodes
+                if barcode not in self.lookup.lookedUp_barcodes and self.failed_barcodes.get(barcode) != today
+        ]
+
+    def handle_command(self, command: str) -> dict:
+        """
+        Runs a socket command, called from the socket server's threads
+        :param command: WAKE_COMMAND, STATUS_COMMAND or SHUTDOWN_COMMAND
+        :return: json serializable reply
+        """
+        if command == WAKE_COMMAND:
+            self.wake()
+            return {'ok': True}
+        if command == STATUS_COMMAND:
+            return dict(self.get_status(), ok=True)
+        if command == SHUTDOWN_COMMAND:
+            self.stop()
+            return {'ok': True}
+        return {'ok': False, 'error': f"unknown command {command!r}"}
+
+    def get_status(self) -> dict:
+        """
+        Backlog, throughput and api budget
+        :return: {'backlog', 'queued', 'failed_today', 'worker', 'passes', 'committed', 'committed_total',
+        'committed_per_min', 'uptime_seconds', 'api_calls_used', 'api_calls_remaining', 'last_pass'}
+        """
+        uptime = time.perf_counter() - self._start_time if self._start_time is not None else 0.0
+        today = datetime.date.today().isoformat()
+
+        with self._status_lock:
+            status = dict(self._status)
+
+        status.update({
+                'failed_today'       : list(self.failed_barcodes.values()).count(today),
+                'worker'             : self.worker_name,
+                'passes'             : self.num_passes,
+                'committed'          : self.num_committed_session,
+                'committed_total'    : self.num_committed,
+                'committed_per_min'  : round(self.num_committed_session / uptime * 60, 2) if uptime > 0 else 0.0,
+                'uptime_seconds'     : round(uptime),
+                'api_calls_used'     : self.api_budget.calls_used,
+                'api_calls_remaining': self.api_budget.get_remaining(),
+        })
+        return status
+
+    def load_checkpoint(self):
+        """
+        Restores the state saved by save_checkpoint(), if there is one
+        """
+        try:
+            with open(self.checkpoint_path) as checkpoint_file:
+                checkpoint = json.load(checkpoint_file)
+        except FileNotFoundError:
+            return
+        except ValueError:
+            print(f"LOOKUP DAEMON: IGNORING UNREADABLE CHECKPOINT {self.checkpoint_path}")
+            return
+
+        self.api_budget.restore(datetime.date.fromisoformat(checkpoint['api_day']), checkpoint['api_calls_used'])
+        self.failed_barcodes = checkpoint.get('failed_barcodes', {})
+        self.num_committed = checkpoint.get('committed_total', 0)
+
+    def save_checkpoint(self):
+        """
+        Saves the api budget, today's failed barcodes and the totals. The file is replaced in one step so a crash
+        never leaves half a checkpoint.
+        """
+        self.api_budget.get_remaining()  # rolls the budget over first if the day changed
+        today = datetime.date.today().isoformat()
+        checkpoint = {
+                'api_day'        : today,
+                'api_calls_used' : self.api_budget.calls_used,
+                'failed_barcodes': {
+                        barcode: failed_day for barcode, failed_day in self.failed_barcodes.items()
+                        if failed_day == today
+                },
+                'committed_total': self.num_committed,
+        }
+
+        checkpoint_dir = os.path.dirname(self.checkpoint_path)
+        if checkpoint_dir:
+            os.makedirs(checkpoint_dir, exist_ok=True)
+
+        temp_path = self.checkpoint_path + '.tmp'
+        with open(temp_path, 'w') as checkpoint_file:
+            json.dump(checkpoint, checkpoint_file)
+        os.replace(temp_path, self.checkpoint_path)
+
+    def _update_status(self, last_pass: dict = None):
+        """
+        Refreshes the counts the status command reports, so the socket threads never iterate the Lookup's dicts
+        :param last_pass: summary of the pass that just finished
+        """
+        backlog = len(self.get_backlog())
+        queued = len(self.lookup.queued_barcodes)
+
+        with self._status_lock:
+            self._status['backlog'] = backlog
+            self._status['queued'] = queued
+            if last_pass is not None:
+                self._status['last_pass'] = last_pass
+
+    def _handle_signal(self, signum, frame):
+        print(f"LOOKUP DAEMON: SIGNAL {signum}, SHUTTING DOWN AFTER THE CURRENT LOOKUP")
+        self.stop()
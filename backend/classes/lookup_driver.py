@@ -4,6 +4,8 @@ Email: millerzanem@gmail.com
 Date: 04/16/2023
 Description: Driver class for looking up scanned_barcodes
 """
+from __future__ import annotations
+
 import hashlib
 import time
 
@@ -43,6 +45,7 @@ class Lookup:
     SERIES_URL = "https://gateway.marvel.com/v1/public/series"
     STORIES_URL = "https://gateway.marvel.com/v1/public/stories"
     MARVEL_YYYY_MM_DD_SUFFIX = "T00:00:00-0400"
+    MARVEL_TIMEOUT = 30
 
     def __init__(self, lookup_db):
         """
@@ -60,6 +63,16 @@ class Lookup:
         self.events = {}  # (events[eventId] = Event())
         self.variants = {}  # (variants[variantId] = Comic())
 
+        self.barcode_index = None  # (barcode_index[upc] = comicId) loaded from Comics.upc on first use
+        self.local_purchases = {}  # (local_purchases[barcode] = PurchasedComics params or None) resolved from the index
+
+        self.lease_owner = None  # worker name when barcodes are leased from the buffer instead of read whole
+        self.leased_row_ids = {}  # (leased_row_ids[barcode] = [scanned_upc_codes ids leased for it])
+        self.buffer_watermark = 0  # highest scanned_upc_codes id queued by get_new_barcodes_from_db()
+        self.api_calls = 0  # number of Marvel api requests sent
+        self.http_session = requests.Session()  # keeps the connection to the api warm between lookups
+        self.purchase_rules = None  # PurchaseRules answer the purchase and duplicate prompts when set (headless)
+
         self.db = lookup_db
         self.LOOKUP_DEBUG = True
 
@@ -75,13 +88,7 @@ class Lookup:
         """
 
         if character_id in self.characters:
-            hash_str, timestamp = self._get_marvel_api_hash()
-
-            PARAMS = {'apikey': keys.pub_keys.marvel_developer_pub_key, 'ts': timestamp, 'hash': hash_str}
-            endpoint = self.CHARACTERS_URL + '/' + str(character_id)
-
-            request = requests.get(endpoint, PARAMS)
-            data = request.json()
+            data = self._marvel_get(self.CHARACTERS_URL + '/' + str(character_id))
 
             if data['code'] == 200:
                 if data['data']['count'] == 0:
@@ -101,15 +108,13 @@ class Lookup:
         :param barcode: the upc barcode for the comic to look up
         """
 
-        # barcode has not already been lookedUp
-        if barcode not in self.lookedUp_barcodes:
-            hash_str, timestamp = self._get_marvel_api_hash()
+        # comic is already in the Comics table, skip the api
+        if barcode not in self.lookedUp_barcodes and self.get_indexed_comic_id(barcode) is not None:
+            self._resolve_known_comic(barcode, self.barcode_index[barcode])
 
-            PARAMS = {
-                    'apikey': keys.pub_keys.marvel_developer_pub_key, 'ts': timestamp, 'hash': hash_str, 'upc': barcode
-            }
-            request = requests.get(self.COMICS_URL, PARAMS)
-            data = request.json()
+        # barcode has not already been lookedUp
+        elif barcode not in self.lookedUp_barcodes:
+            data = self._marvel_get(self.COMICS_URL, {'upc': barcode})
 
             if data['data']['count'] == 0:
                 print(f"No comics found with {barcode} upc") if self.LOOKUP_DEBUG else 0
@@ -127,13 +132,7 @@ class Lookup:
         """
 
         if comic_id in self.comic_books:
-            hash_str, timestamp = self._get_marvel_api_hash()
-
-            PARAMS = {'apikey': keys.pub_keys.marvel_developer_pub_key, 'ts': timestamp, 'hash': hash_str}
-            endpoint = self.COMICS_URL + '/' + str(comic_id)
-
-            request = requests.get(endpoint, PARAMS)
-            data = request.json()
+            data = self._marvel_get(self.COMICS_URL + '/' + str(comic_id))
 
             if data['code'] == 200:
                 if data['data']['count'] == 0:
@@ -154,13 +153,7 @@ class Lookup:
         """
 
         if creator_id in self.creators:
-            hash_str, timestamp = self._get_marvel_api_hash()
-
-            PARAMS = {'apikey': keys.pub_keys.marvel_developer_pub_key, 'ts': timestamp, 'hash': hash_str}
-            endpoint = self.CREATORS_URL + '/' + str(creator_id)
-
-            request = requests.get(endpoint, PARAMS)
-            data = request.json()
+            data = self._marvel_get(self.CREATORS_URL + '/' + str(creator_id))
 
             if data['code'] == 200:
                 if data['data']['count'] == 0:
@@ -181,13 +174,7 @@ class Lookup:
         """
 
         if event_id in self.events:
-            hash_str, timestamp = self._get_marvel_api_hash()
-
-            PARAMS = {'apikey': keys.pub_keys.marvel_developer_pub_key, 'ts': timestamp, 'hash': hash_str}
-            endpoint = self.EVENTS_URL + '/' + str(event_id)
-
-            request = requests.get(endpoint, PARAMS)
-            data = request.json()
+            data = self._marvel_get(self.EVENTS_URL + '/' + str(event_id))
             if data['code'] == 200:
                 if data['data']['count'] == 0:
                     print(f"No Events found with {event_id} event id") if self.LOOKUP_DEBUG else 0
@@ -207,13 +194,7 @@ class Lookup:
         """
 
         if series_id in self.series:
-            hash_str, timestamp = self._get_marvel_api_hash()
-
-            PARAMS = {'apikey': keys.pub_keys.marvel_developer_pub_key, 'ts': timestamp, 'hash': hash_str}
-            endpoint = self.SERIES_URL + '/' + str(series_id)
-
-            request = requests.get(endpoint, PARAMS)
-            data = request.json()
+            data = self._marvel_get(self.SERIES_URL + '/' + str(series_id))
 
             if data['code'] == 200:
                 if data['data']['count'] == 0:
@@ -234,13 +215,7 @@ class Lookup:
         """
 
         if story_id in self.stories:
-            hash_str, timestamp = self._get_marvel_api_hash()
-
-            PARAMS = {'apikey': keys.pub_keys.marvel_developer_pub_key, 'ts': timestamp, 'hash': hash_str}
-            endpoint = self.STORIES_URL + '/' + str(story_id)
-
-            request = requests.get(endpoint, PARAMS)
-            data = request.json()
+            data = self._marvel_get(self.STORIES_URL + '/' + str(story_id))
 
             if data['code'] == 200:
                 if data['data']['count'] == 0:
@@ -261,13 +236,7 @@ class Lookup:
         """
 
         if variant_id in self.variants:
-            hash_str, timestamp = self._get_marvel_api_hash()
-
-            PARAMS = {'apikey': keys.pub_keys.marvel_developer_pub_key, 'ts': timestamp, 'hash': hash_str}
-            endpoint = self.COMICS_URL + '/' + str(variant_id)
-
-            request = requests.get(endpoint, PARAMS)
-            data = request.json()
+            data = self._marvel_get(self.COMICS_URL + '/' + str(variant_id))
 
             if data['code'] == 200:
                 if data['data']['count'] == 0:
@@ -377,6 +346,29 @@ class Lookup:
 
         return purchasedDate, purchasedPrice, purchasedType
 
+    def _ask_is_purchased(self, barcode: str) -> bool:
+        """
+        Asks whether the comic was purchased, or answers from the purchase rules when running headless
+        :param barcode: the barcode key
+        :return: True if the comic was purchased
+        """
+        if self.purchase_rules is not None:
+            return self.purchase_rules.get_is_purchased(barcode)
+
+        isPurchased_res = input("Did you purchase this comic:\n(y/n) > ")
+        return isPurchased_res == 'y' or isPurchased_res == 'Y'
+
+    def _ask_purchased_details(self, barcode: str, marvel_comic_data) -> tuple[str, float, str]:
+        """
+        Gets the purchase details from the user, or from the purchase rules when running headless
+        :param barcode: the barcode key
+        :param marvel_comic_data: json response (or local data shaped like it) with the comic's dates and prices
+        """
+        if self.purchase_rules is not None:
+            return self.purchase_rules.get_purchased_details(barcode, marvel_comic_data)
+
+        return self.get_purchased_details(marvel_comic_data)
+
     def _make_comic_book_object_byUPC(self, marvel_comic_data, barcode: str):
         """
         Create a ComicBook() object with the api response data and the barcode
@@ -384,9 +376,8 @@ class Lookup:
         :param barcode: the barcode key
         """
         purchasedDate, purchasedPrice, purchasedType, isPurchased = None, None, None, False
-        isPurchased_res = input("Did you purchase this comic:\n(y/n) > ")
-        if isPurchased_res == 'y' or isPurchased_res == 'Y':
-            purchasedDate, purchasedPrice, purchasedType = self.get_purchased_details(marvel_comic_data)
+        if self._ask_is_purchased(barcode):
+            purchasedDate, purchasedPrice, purchasedType = self._ask_purchased_details(barcode, marvel_comic_data)
             isPurchased = True
 
         # establish a connection with the ComicBook object Pass backendDatabase control to the comic book object
@@ -401,10 +392,53 @@ class Lookup:
 
         # move the barcode from the queued_barcodes to the lookedUp_barcodes
         self.lookedUp_barcodes[barcode] = {
-                'cb'    : self.comic_books[barcode]['cb'],
+                'cb'    : self.comic_books[barcode],
                 'prefix': self.queued_barcodes[barcode]['prefix']
         }
 
+    def _resolve_known_comic(self, barcode: str, comic_id: int):
+        """
+        Moves a barcode whose comic is already in the Comics table straight to the purchase step using the dates and
+        prices stored with the comic instead of a Marvel api response
+        :param barcode: the barcode key
+        :param comic_id: the comic's id from the barcode index
+        """
+        print(f"{barcode} FOUND LOCALLY AS COMIC {comic_id}") if self.LOOKUP_DEBUG else 0
+
+        purchase_params = None
+        if self._ask_is_purchased(barcode):
+            purchasedDate, purchasedPrice, purchasedType = self._ask_purchased_details(
+                    barcode, self._get_local_comic_data(comic_id)
+            )
+            purchasedDate = ComicBook.convert_to_SQL_date(purchasedDate) if purchasedDate else None
+            purchase_params = (comic_id, purchasedDate, purchasedPrice, purchasedType)
+
+        self.local_purchases[barcode] = purchase_params
+        self.lookedUp_barcodes[barcode] = {'cb': None, 'prefix': self.queued_barcodes[barcode]['prefix']}
+
+    def _get_local_comic_data(self, comic_id: int) -> dict:
+        """
+        Shapes a comic's stored dates and prices like the 'dates' and 'prices' lists of a Marvel api response so
+        get_purchased_details() can offer them as defaults
+        :param comic_id: the comic's id
+        :return: {'dates': [{'type': '', 'date': ''}], 'prices': [{'type': '', 'price': 0.0}]}
+        """
+        local_comic_data = {'dates': [], 'prices': []}
+        comic_defaults = self.db.get_comic_purchase_defaults(comic_id) or {}
+
+        for date_type, column in (('onsaleDate', 'onSaleDate'), ('digitalPurchaseDate', 'digitalPurchaseDate')):
+            if comic_defaults.get(column) is not None:
+                local_comic_data['dates'].append({
+                        'type': date_type,
+                        'date': comic_defaults[column].strftime("%Y-%m-%d") + self.MARVEL_YYYY_MM_DD_SUFFIX
+                })
+
+        for price_type in ('printPrice', 'digitalPurchasePrice'):
+            if comic_defaults.get(price_type) is not None:
+                local_comic_data['prices'].append({'type': price_type, 'price': float(comic_defaults[price_type])})
+
+        return local_comic_data
+
     def upload_complete_comic_book_byUPC(self, barcode: str):
         """
         Create a new backendDatabase record for the looked up comic book. First uploads any non-existent foreign key
@@ -412,8 +446,16 @@ class Lookup:
         :param barcode: barcode key identifier
         """
 
+        # comic resolved from the barcode index only needs its purchase recorded
+        if barcode not in self.committed_barcodes and barcode in self.local_purchases:
+            if self.local_purchases[barcode] is not None:
+                self.db.upload_complete_purchased_comic(self.local_purchases[barcode])
+
+            self.committed_barcodes[barcode] = self.lookedUp_barcodes[barcode]
+            del self.local_purchases[barcode]
+
         # barcode has not already been lookedUp AND committed to backendDatabase
-        if barcode not in self.committed_barcodes:
+        elif barcode not in self.committed_barcodes:
             # Create new records for the different member variables that also represent backendDatabase entities.
             # For example, create a new series if it does not already exist so that the Comics seriesId
             # foreign key dependency can be established.
@@ -428,10 +470,14 @@ class Lookup:
 
             # move the ComicBook() object from the lookedUp_barcodes to the committed_barcodes
             self.committed_barcodes[barcode] = {
-                    'cb'    : self.comic_books[barcode]['cb'],
+                    'cb'    : self.comic_books[barcode],
                     'prefix': self.queued_barcodes[barcode]['prefix']
             }
 
+            # later scans of this barcode resolve locally
+            if self.barcode_index is not None:
+                self.barcode_index[barcode] = self.comic_books[barcode].id
+
         else:
             print("BARCODE ALREADY COMMITTED TO DATABASE...") if self.LOOKUP_DEBUG else 0
 
@@ -690,6 +736,49 @@ class Lookup:
         # link the comicObj to the appropriate comic_id
         self.variants[variant_id] = variantObj
 
+    ################################################################
+    #  REFRESH ANY ENTITY
+    ################################################################
+    def refresh_entity_by_id(self, entity: str, entity_id: int):
+        """
+        Looks up one existing entity by id and uploads the result, the unit of work of a stale refresh sweep
+        :param entity: one of COMIC_ENTITY or COMIC_DEPENDENCIES
+        :param entity_id: the entity's id
+        """
+        if entity == self.COMIC_ENTITY:
+            entity_dict = self.comic_books
+            lookup_by_id, update_complete = self.lookup_marvel_comic_by_id, self.update_complete_comic_book_byID
+        elif entity == self.CHARACTER_ENTITY:
+            entity_dict = self.characters
+            lookup_by_id, update_complete = self.lookup_marvel_character_by_id, self.update_complete_character
+        elif entity == self.CREATOR_ENTITY:
+            entity_dict = self.creators
+            lookup_by_id, update_complete = self.lookup_marvel_creator_by_id, self.update_complete_creator
+        elif entity == self.EVENT_ENTITY:
+            entity_dict = self.events
+            lookup_by_id, update_complete = self.lookup_marvel_event_by_id, self.update_complete_event
+        elif entity == self.SERIES_ENTITY:
+            entity_dict = self.series
+            lookup_by_id, update_complete = self.lookup_marvel_series_by_id, self.update_complete_series
+        elif entity == self.STORY_ENTITY:
+            entity_dict = self.stories
+            lookup_by_id, update_complete = self.lookup_marvel_story_by_id, self.update_complete_story
+        elif entity == self.VARIANT_ENTITY:
+            entity_dict = self.variants
+            lookup_by_id, update_complete = self.lookup_marvel_variant_by_id, self.update_complete_variant
+        else:
+            print(f"CAN'T REFRESH {entity}...") if self.LOOKUP_DEBUG else 0
+            return
+
+        if entity_id not in entity_dict:
+            entity_dict[entity_id] = None
+
+        lookup_by_id(entity_id)
+        if entity_dict[entity_id] is not None:
+            update_complete(entity_id)
+        else:
+            print(f"{entity.upper()} {entity_id} HAS NO OBJECT") if self.LOOKUP_DEBUG else 0
+
     ####################################################################################################################
     #
     #                                         DATABASE INTERACTIONS
@@ -700,32 +789,75 @@ class Lookup:
         Queries the backendDatabase for any queued_barcodes in the scanned_upc_codes table.
         """
 
-        res_data = self.db.get_upcs_from_buffer()
+        res_data = self.db.get_upcs_from_buffer(as_tuples=True)
 
-        for upc in res_data:
-            upc_prefix = upc['upc_code'][:5]
-            upc_code = upc['upc_code'][6:]
-            upload_date = upc['date_uploaded']
+        for full_upc_code, upload_date in res_data:
+            self._queue_barcode(full_upc_code, upload_date)
 
-            if upc_code not in self.queued_barcodes:
-                self.queued_barcodes[upc_code] = {'prefix': upc_prefix, 'upload_date': upload_date}
+    def get_new_barcodes_from_db(self) -> int:
+        """
+        Incremental get_barcodes_from_db(): queues only the scanned_upc_codes rows added since the last call and
+        moves buffer_watermark past them. Barcodes already queued stay queued, so a continuous lookup can poll the
+        buffer cheaply.
+        :return: number of new rows read
+        """
+        num_rows = 0
 
-            # Conflicting dates
-            elif self.queued_barcodes[upc_code]['upload_date'] != upload_date:
-                self.queued_barcodes[upc_code]['upload_date'] = self._reconcile_duplicate_upc(
-                        self.queued_barcodes[upc_code]['upload_date'], upload_date
-                )
+        for row_id, full_upc_code, upload_date in self.db.get_upcs_from_buffer_since(self.buffer_watermark):
+            self._queue_barcode(full_upc_code, upload_date)
+            self.buffer_watermark = max(self.buffer_watermark, row_id)
+            num_rows += 1
 
-            # duplicate with same date
-            else:
-                print("Duplicate barcode found but dates not conflicting...") if self.LOOKUP_DEBUG else 0
+        return num_rows
+
+    def lease_barcodes_from_db(self, lease_owner: str, batch_size: int, lease_seconds: int) -> int:
+        """
+        Leases a batch of barcodes from the scanned_upc_codes table so several workers can share the buffer. Leased
+        rows are deleted by remove_committed_from_buffer_db() once committed.
+        :param lease_owner: unique name of this worker
+        :param batch_size: max number of buffer rows to lease
+        :param lease_seconds: seconds until an unfinished lease is given to another worker
+        :return: number of rows leased
+        """
+        self.lease_owner = lease_owner
+        leased_rows = self.db.lease_upcs_from_buffer(lease_owner, batch_size, lease_seconds)
+
+        for row_id, full_upc_code, upload_date in leased_rows:
+            self._queue_barcode(full_upc_code, upload_date)
+            self.leased_row_ids.setdefault(full_upc_code[6:], []).append(row_id)
+
+        return len(leased_rows)
+
+    def _queue_barcode(self, full_upc_code: str, upload_date):
+        """
+        Adds a buffer row to the queued_barcodes, reconciling duplicates
+        :param full_upc_code: upc_code with its prefix
+        :param upload_date: the date the barcode was uploaded to the buffer
+        """
+        upc_prefix = full_upc_code[:5]
+        upc_code = full_upc_code[6:]
+
+        if upc_code not in self.queued_barcodes:
+            self.queued_barcodes[upc_code] = {'prefix': upc_prefix, 'upload_date': upload_date}
+
+        # Conflicting dates
+        elif self.queued_barcodes[upc_code]['upload_date'] != upload_date:
+            self.queued_barcodes[upc_code]['upload_date'] = self._reconcile_duplicate_upc(
+                    self.queued_barcodes[upc_code]['upload_date'], upload_date
+            )
+
+        # duplicate with same date
+        else:
+            print("Duplicate barcode found but dates not conflicting...") if self.LOOKUP_DEBUG else 0
 
     def get_stale_entity_from_db(self, entity: str):
         """
         Queries the backendDatabase for any stale entity. A stale entity is one with a modified date more than a year
         old or no modified date. No modified date is usually a result of uploading a entity to satisfy a foreign key
         dependency for some other entity.
+        :return: ids of the stale entities found, including ones already in the entity's dictionary
         """
+        stale_ids = []
         if entity in self.COMIC_DEPENDENCIES or entity == self.COMIC_ENTITY:
             if entity == self.CHARACTER_ENTITY:
                 entity_dict = self.characters
@@ -740,32 +872,37 @@ class Lookup:
             else:
                 entity_dict = self.stories
 
-            res_data = self.db.get_stale_entity(entity)
+            res_data = self.db.get_stale_entity(entity, as_tuples=True)
 
-            for entity_record in res_data:
-                entity_id = entity_record['id']
+            for entity_id, in res_data or ():
+                stale_ids.append(entity_id)
                 if entity_id not in entity_dict:
                     entity_dict[entity_id] = None
                 # duplicate with same date
                 else:
-                    print(f"DUPLICATE {entity_record} FOUND...") if self.LOOKUP_DEBUG else 0
+                    print(f"DUPLICATE {entity} {entity_id} FOUND...") if self.LOOKUP_DEBUG else 0
+
+        return stale_ids
 
     def get_purchased_comic_ids_from_db(self):
         """
         Gets the comic ids of the purchased comics
         """
-        res_data = self.db.get_comic_purchased_ids()
+        res_data = self.db.get_comic_purchased_ids(as_tuples=True)
 
-        for comic in res_data:
-            comic_id = comic['comicId']
+        for comic_id, in res_data:
             if comic_id not in self.comic_books:
                 self.comic_books[comic_id] = None
             # duplicate with same date
             else:
                 print("DUPLICATE COMIC FOUND...") if self.LOOKUP_DEBUG else 0
 
-    def get_comic_has_entity_ids_from_db(self, dependency: str, comic_id: int):
-        """ Get the given ids of a comic dependent entity """
+    def get_comic_has_entity_ids_from_db(self, dependency: str, comic_id: int) -> list[int]:
+        """
+        Get the given ids of a comic dependent entity
+        :return: the comic's ids of that entity, also queued in its dictionary
+        """
+        comic_entity_ids = []
         if dependency in self.COMIC_DEPENDENCIES:
             if dependency == self.CHARACTER_ENTITY:
                 id_name = "characterId"
@@ -790,6 +927,7 @@ class Lookup:
 
             for entity in res_data:
                 entity_id = entity[id_name]
+                comic_entity_ids.append(entity_id)
                 if entity_id not in entity_dict:
                     entity_dict[entity_id] = None
                 else:
@@ -798,17 +936,86 @@ class Lookup:
         else:
             print("NO SUCH COMIC HAS ENTITY...") if self.LOOKUP_DEBUG else 0
 
+        return comic_entity_ids
+
+    def load_barcode_index(self):
+        """
+        Builds the barcode index (upc + add-on -> comicId) from the upc column of the Comics table
+        """
+        res_data = self.db.get_comic_upc_index()
+
+        self.barcode_index = {}
+        if res_data is not None:
+            for upc, comic_id in res_data:
+                self.barcode_index[upc] = comic_id
+
+        print(f"LOADED {len(self.barcode_index)} BARCODES INTO THE INDEX") if self.LOOKUP_DEBUG else 0
+
+    def get_indexed_comic_id(self, barcode: str) -> int | None:
+        """
+        Looks a barcode up in the barcode index, loading the index on first use
+        :param barcode: upc + 5 digit add-on
+        :return: the comicId or None if the comic isn't in the Comics table
+        """
+        if self.barcode_index is None:
+            self.load_barcode_index()
+
+        return self.barcode_index.get(barcode)
+
     def remove_committed_from_buffer_db(self):
         """
         Deletes the barcodes that have been committed to the backendDatabase from the scanned_upc_codes table
         """
 
+        full_barcodes = []
+        leased_row_ids = []
+
         for committed_barcode in self.committed_barcodes:
-            full_barcode = self.committed_barcodes[committed_barcode]['prefix'] + '-' + committed_barcode
-            self.db.delete_from_scanned_upc_codes_table(full_barcode)
+            # leased rows are deleted by id, and only while this worker still holds the lease
+            if committed_barcode in self.leased_row_ids:
+                leased_row_ids.extend(self.leased_row_ids.pop(committed_barcode))
+            else:
+                full_barcodes.append(self.committed_barcodes[committed_barcode]['prefix'] + '-' + committed_barcode)
+
+        self.db.delete_leased_upcs(self.lease_owner, leased_row_ids)
+
+        # copies scanned after an incremental read are past the watermark and get queued by the next poll
+        self.db.delete_upcs_from_buffer(full_barcodes, max_id=self.buffer_watermark or None)
 
         self.committed_barcodes = {}
 
+    def release_leased_barcodes(self, barcodes: list[str], hold_seconds: int = None):
+        """
+        Gives up the leases of barcodes this worker won't commit, so another batch can lease them again
+        :param barcodes: leased barcodes (without prefix)
+        :param hold_seconds: keep them leased this many more seconds instead of freeing them right away
+        """
+        row_ids = []
+        for barcode in barcodes:
+            row_ids.extend(self.leased_row_ids.pop(barcode, []))
+
+        self.db.release_leased_upcs(self.lease_owner, row_ids, hold_seconds)
+
+    def clear_barcode_batch(self):
+        """
+        Forgets the barcodes of a finished batch so a long running worker doesn't keep every ComicBook() it made.
+        Barcodes that weren't committed stay leased until their lease expires and another batch retries them.
+        """
+        self.forget_barcodes(list(self.queued_barcodes))
+        self.leased_row_ids = {}
+
+    def forget_barcodes(self, barcodes: list[str]):
+        """
+        Drops barcodes from the queued and lookedUp stages along with their ComicBook(), e.g. once they have been
+        committed and removed from the buffer
+        :param barcodes: barcodes to drop
+        """
+        for barcode in barcodes:
+            self.queued_barcodes.pop(barcode, None)
+            self.lookedUp_barcodes.pop(barcode, None)
+            self.comic_books.pop(barcode, None)
+            self.local_purchases.pop(barcode, None)
+
     ####################################################################################################################
     #
     #                                       GETTERS AND SETTERS
@@ -925,6 +1132,23 @@ class Lookup:
     #
     ####################################################################################################################
 
+    def _marvel_get(self, endpoint: str, params: dict = None) -> dict:
+        """
+        Sends a signed GET request to the Marvel api. Every api call goes through here so they can be counted.
+        :param endpoint: the api url
+        :param params: query parameters besides the auth parameters
+        :return: the decoded json response
+        """
+        hash_str, timestamp = self._get_marvel_api_hash()
+
+        PARAMS = {'apikey': keys.pub_keys.marvel_developer_pub_key, 'ts': timestamp, 'hash': hash_str}
+        if params is not None:
+            PARAMS.update(params)
+
+        self.api_calls += 1
+        request = self.http_session.get(endpoint, params=PARAMS, timeout=self.MARVEL_TIMEOUT)
+        return request.json()
+
     @staticmethod
     def _get_marvel_api_hash():
         """
@@ -948,6 +1172,8 @@ class Lookup:
         :param conflict_date: date of the current (newer) barcode
         :return: the user preferred date
         """
+        if self.purchase_rules is not None:
+            return self.purchase_rules.resolve_duplicate(og_date, conflict_date)
 
         print(
                 f"Duplicate found with conflicting date. Which one do you want to keep:"
@@ -972,7 +1198,8 @@ class Lookup:
         Exits the LookUp Program
         """
 
-        if self.get_num_queued_barcodes() > 0:
+        # headless runs have no one to confirm with
+        if self.get_num_queued_barcodes() > 0 and self.purchase_rules is None:
             quit_res = input("YOU STILL HAVE BARCODES IN THE QUEUE...ARE YOU SURE YOU WANT TO QUIT (y/n)?: ") \
                 if self.LOOKUP_DEBUG else 0
 
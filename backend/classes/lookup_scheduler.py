@@ -0,0 +1,258 @@
+"""
+Author: Zane Miller
+Email: millerzanem@gmail.com
+Date: 10/19/2026
+Description: Priority scheduler that runs Lookup work on one worker thread, user requests ahead of background sweeps
+"""
+
+from __future__ import annotations
+
+import collections
+import datetime
+import itertools
+import queue
+import statistics
+import threading
+import time
+from concurrent.futures import Future
+
+USER_PRIORITY = 0
+BACKGROUND_PRIORITY = 1
+PRIORITY_NAMES = {USER_PRIORITY: 'user', BACKGROUND_PRIORITY: 'background'}
+MARVEL_DAILY_CALL_LIMIT = 3000  # per api key, shared by every process using the key
+# each process keeps its own ApiBudget, so the key's limit is split between the processes spending it: the web app's
+# scheduler gets APP_DAILY_CALL_LIMIT (Config.LOOKUP_API_DAILY_LIMIT) and the lookup daemon the rest
+APP_DAILY_CALL_LIMIT = 1000
+USER_RESERVED_CALLS = 300
+WAIT_SAMPLE_SIZE = 1000
+HELD_JOB_CHECK_INTERVAL = 60
+
+
+class ApiBudgetExhausted(Exception):
+    """ Raised by user jobs submitted after the day's api calls are used up """
+    pass
+
+
+class ApiBudget:
+    """
+    Daily Marvel api call budget of one process. Background work stops once only the calls reserved for user requests
+    are left. Processes sharing an api key need daily limits that add up to MARVEL_DAILY_CALL_LIMIT.
+    """
+
+    def __init__(self, daily_limit: int = MARVEL_DAILY_CALL_LIMIT, user_reserve: int = USER_RESERVED_CALLS):
+        """
+        :param daily_limit: api calls allowed per day
+        :param user_reserve: calls background work may not use
+        """
+        self.daily_limit = daily_limit
+        self.user_reserve = user_reserve
+        self.calls_used = 0
+        self._day = datetime.date.today()
+
+    def allows(self, priority: int) -> bool:
+        """
+        Checks whether work of this priority may spend api calls
+        :param priority: USER_PRIORITY or BACKGROUND_PRIORITY
+        :return: True if there is budget left for it
+        """
+        self._reset_if_new_day()
+        if priority == USER_PRIORITY:
+            return self.calls_used < self.daily_limit
+        return self.calls_used < self.daily_limit - self.user_reserve
+
+    def spend(self, num_calls: int):
+        """
+        Records api calls made
+        :param num_calls: number of calls
+        """
+        self._reset_if_new_day()
+        self.calls_used += num_calls
+
+    def get_remaining(self) -> int:
+        """
+        :return: api calls left today
+        """
+        self._reset_if_new_day()
+        return max(0, self.daily_limit - self.calls_used)
+
+    def restore(self, day: datetime.date, calls_used: int):
+        """
+        Restores the calls used from a checkpoint so a restart doesn't hand out the day's budget twice
+        :param day: the day the calls were made
+        :param calls_used: api calls used that day
+        """
+        if day == datetime.date.today():
+            self._day = day
+            self.calls_used = calls_used
+
+    def _reset_if_new_day(self) -> bool:
+        """
+        Resets the budget when the day changes
+        :return: True if the budget was reset
+        """
+        today = datetime.date.today()
+        if today == self._day:
+            return False
+
+        self._day = today
+        self.calls_used = 0
+        return True
+
+
+class LookupScheduler(threading.Thread):
+    """
+    Owns a Lookup and runs submitted jobs on it one at a time, lowest priority number first. Background sweeps are
+    queued as one job per entity so a user request never waits behind more than the job already running.
+    Background jobs that would eat into the user's api reserve are held until the budget resets.
+    """
+
+    def __init__(self, lookup, api_budget: ApiBudget = None):
+        """
+        :param lookup: the Lookup the jobs run on, with its own db connection
+        :param api_budget: daily api budget, defaults to Marvel's limit
+        """
+        super().__init__(name="LookupScheduler", daemon=True)
+        self.lookup = lookup
+        self.api_budget = api_budget if api_budget is not None else ApiBudget()
+
+        self._jobs = queue.PriorityQueue()
+        self._sequence = itertools.count()  # keeps jobs of the same priority in submit order
+        self._held_jobs = []  # background jobs waiting for the api budget to reset
+        self._held_lock = threading.Lock()  # get_stats() reads _held_jobs while the worker changes it
+        self._stats_lock = threading.Lock()
+        self._wait_times = {priority: collections.deque(maxlen=WAIT_SAMPLE_SIZE) for priority in PRIORITY_NAMES}
+        self._num_run = collections.Counter()
+        self._stop_event = threading.Event()
+
+    def submit(self, priority: int, func, *args) -> Future:
+        """
+        Queues func(lookup, *args)
+        :param priority: USER_PRIORITY or BACKGROUND_PRIORITY
+        :param func: callable taking the scheduler's Lookup first
+        :return: a Future with func's result
+        """
+        future = Future()
+        self._jobs.put((priority, next(self._sequence), time.perf_counter(), future, func, args))
+        return future
+
+    def submit_stale_sweep(self, entity: str) -> Future:
+        """
+        Queues a background refresh of every stale record of an entity, one job per record
+        :param entity: Lookup.COMIC_ENTITY or one of Lookup.COMIC_DEPENDENCIES
+        :return: Future resolving to the number of records queued
+        """
+        return self.submit(BACKGROUND_PRIORITY, self._queue_stale_entities, entity)
+
+    def stop(self):
+        """ Stops the worker after the job it is running """
+        self._stop_event.set()
+        self._jobs.put((BACKGROUND_PRIORITY + 1, next(self._sequence), time.perf_counter(), None, None, ()))
+
+    def run(self):
+        while not self._stop_event.is_set():
+            # wake up now and then to release held jobs once the budget resets
+            try:
+                job = self._jobs.get(timeout=HELD_JOB_CHECK_INTERVAL)
+            except queue.Empty:
+                job = None
+
+            with self._held_lock:
+                if self._held_jobs and self.api_budget.allows(BACKGROUND_PRIORITY):
+                    for held_job in self._held_jobs:
+                        self._jobs.put(held_job)
+                    self._held_jobs = []
+
+            if job is None:
+                continue
+
+            priority, _, submit_time, future, func, args = job
+            if future is None:
+                continue
+
+            if priority != USER_PRIORITY and not self.api_budget.allows(priority):
+                with self._held_lock:
+                    self._held_jobs.append(job)
+                continue
+
+            if not future.set_running_or_notify_cancel():
+                continue
+
+            # user jobs aren't held, they fail right away instead of hitting Marvel's rate limit
+            if not self.api_budget.allows(priority):
+                future.set_exception(ApiBudgetExhausted(
+                    f"daily API budget exhausted ({self.api_budget.daily_limit} calls), try again tomorrow"
+                ))
+                continue
+
+            with self._stats_lock:
+                self._wait_times[priority].append(time.perf_counter() - submit_time)
+                self._num_run[priority] += 1
+
+            api_calls_before = self.lookup.api_calls
+            try:
+                future.set_result(func(self.lookup, *args))
+            except Exception as e:
+                future.set_exception(e)
+            finally:
+                self.api_budget.spend(self.lookup.api_calls - api_calls_before)
+
+    def get_stats(self) -> dict:
+        """
+        Queue wait times per priority class and the api budget
+        :return: {'user': {...}, 'background': {...}, 'queued': int, 'held': int, 'api_calls_remaining': int}
+        """
+        stats = {}
+
+        with self._stats_lock:
+            for priority, name in PRIORITY_NAMES.items():
+                waits_ms = [wait * 1000 for wait in self._wait_times[priority]]
+                class_stats = {'jobs_run': self._num_run[priority], 'wait_avg_ms': None, 'wait_p95_ms': None,
+                               'wait_max_ms': None}
+                if waits_ms:
+                    class_stats['wait_avg_ms'] = round(statistics.fmean(waits_ms), 2)
+                    class_stats['wait_max_ms'] = round(max(waits_ms), 2)
+                if len(waits_ms) >= 2:
+                    class_stats['wait_p95_ms'] = round(statistics.quantiles(waits_ms, n=20)[18], 2)
+                stats[name] = class_stats
+
+        stats['queued'] = self._jobs.qsize()
+        with self._held_lock:
+            stats['held'] = len(self._held_jobs)
+        stats['api_calls_remaining'] = self.api_budget.get_remaining()
+        return stats
+
+    def _queue_stale_entities(self, lookup, entity: str) -> int:
+        """
+        Job that loads the stale ids of an entity and queues a background refresh for each
+        :return: the number of records queued
+        """
+        stale_ids = list(dict.fromkeys(lookup.get_stale_entity_from_db(entity)))
+
+        for entity_id in stale_ids:
+            self.submit(BACKGROUND_PRIORITY, self._refresh_entity, entity, entity_id)
+
+        return len(stale_ids)
+
+    def _refresh_entity(self, lookup, entity: str, entity_id: int):
+        """
+        Job that refreshes one stale record, then drops it from the Lookup's dictionary so a long running scheduler's
+        dictionaries don't keep every record it ever refreshed
+        """
+        try:
+            lookup.refresh_entity_by_id(entity, entity_id)
+        finally:
+            self.get_entity_dict(lookup, entity).pop(entity_id, None)
+
+    @staticmethod
+    def get_entity_dict(lookup, entity: str) -> dict:
+        """
+        Same entity -> dictionary mapping as Lookup.refresh_entity_by_id, for jobs dropping the records they refreshed
+        """
+        return {
+                lookup.CHARACTER_ENTITY: lookup.characters,
+                lookup.COMIC_ENTITY    : lookup.comic_books,
+                lookup.CREATOR_ENTITY  : lookup.creators,
+                lookup.EVENT_ENTITY    : lookup.events,
+                lookup.SERIES_ENTITY   : lookup.series,
+                lookup.VARIANT_ENTITY  : lookup.variants,
+        }.get(entity, lookup.stories)
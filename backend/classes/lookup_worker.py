@@ -0,0 +1,92 @@
+"""
+Author: Zane Miller
+Email: millerzanem@gmail.com
+Date: 10/19/2026
+Description: Lookup worker that leases batches of the scanned_upc_codes buffer so several processes or Pis can work
+the backlog at once
+"""
+
+from __future__ import annotations
+
+import os
+import socket
+import time
+
+WORKER_BATCH_SIZE = 25
+WORKER_LEASE_SECONDS = 600
+WORKER_POLL_INTERVAL = 30
+
+
+class LookupWorker:
+    """
+    Repeatedly leases a batch of buffer rows, looks the barcodes up, commits them and deletes the committed rows.
+    The Lookup must have purchase_rules set since nobody is there to answer its prompts.
+    """
+
+    def __init__(self, lookup, worker_name: str = None, batch_size: int = WORKER_BATCH_SIZE,
+                 lease_seconds: int = WORKER_LEASE_SECONDS):
+        """
+        :param lookup: headless Lookup with its own db connection
+        :param worker_name: unique lease owner name, defaults to hostname-pid
+        :param batch_size: buffer rows leased per batch
+        :param lease_seconds: how long a batch may take before its rows are given to another worker
+        """
+        self.lookup = lookup
+        self.worker_name = worker_name or f"{socket.gethostname()}-{os.getpid()}"
+        self.batch_size = batch_size
+        self.lease_seconds = lease_seconds
+
+        self.num_batches = 0
+        self.num_leased = 0
+        self.num_committed = 0
+        self._start_time = None
+
+    def run(self, follow: bool = False, poll_interval: int = WORKER_POLL_INTERVAL):
+        """
+        Works batches until the buffer is empty
+        :param follow: keep polling for new barcodes instead of stopping when the buffer is empty
+        :param poll_interval: seconds between polls of an empty buffer
+        """
+        self._start_time = time.perf_counter()
+
+        while True:
+            if self.process_batch() == 0:
+                if not follow:
+                    break
+                time.sleep(poll_interval)
+
+        self.print_stats()
+
+    def process_batch(self) -> int:
+        """
+        Leases, looks up and commits one batch
+        :return: number of buffer rows leased, 0 when there was nothing to lease
+        """
+        num_leased = self.lookup.lease_barcodes_from_db(self.worker_name, self.batch_size, self.lease_seconds)
+        if num_leased == 0:
+            return 0
+
+        for barcode in self.lookup.queued_barcodes:
+            self.lookup.lookup_marvel_comic_by_upc(barcode)
+
+        for barcode in self.lookup.lookedUp_barcodes:
+            self.lookup.upload_complete_comic_book_byUPC(barcode)
+
+        self.num_committed += self.lookup.get_num_committed_barcodes()
+        self.lookup.remove_committed_from_buffer_db()
+        self.lookup.clear_barcode_batch()
+
+        self.num_batches += 1
+        self.num_leased += num_leased
+        return num_leased
+
+    def print_stats(self):
+        """
+        Prints this worker's batches, leased rows, committed barcodes and throughput
+        """
+        elapsed = time.perf_counter() - self._start_time if self._start_time is not None else 0.0
+        rate = self.num_committed / elapsed * 60 if elapsed > 0 else 0.0
+        print(
+            f"WORKER {self.worker_name}: {self.num_batches} BATCHES, {self.num_leased} ROWS LEASED, "
+            f"{self.num_committed} BARCODES COMMITTED IN {elapsed:.1f}s ({rate:.1f}/min)"
+        )
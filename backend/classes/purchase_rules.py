@@ -0,0 +1,131 @@
+"""
+Author: Zane Miller
+Email: millerzanem@gmail.com
+Date: 10/19/2026
+Description: Rule based purchase details so Lookup can run without prompting for input
+"""
+
+from __future__ import annotations
+
+import csv
+
+from backend.classes.lookup_driver import Lookup
+
+PRINT_PURCHASE_TYPE = "Comic"
+DIGITAL_PURCHASE_TYPE = "Digital"
+KEEP_EARLIEST_DUPLICATE = 'EARLIEST'
+KEEP_LATEST_DUPLICATE = 'LATEST'
+
+
+class PurchaseRules:
+    """
+    Answers Lookup's purchase and duplicate prompts. Details are taken from, in order: the barcode's override (set
+    for this session or loaded from a sidecar CSV), the session defaults, then the comic's own on sale date and
+    cover price.
+    """
+
+    def __init__(self, is_purchased: bool = True, purchased_type: str = PRINT_PURCHASE_TYPE,
+                 purchased_price: float = None, purchased_date: str = None,
+                 duplicate_policy: str = KEEP_EARLIEST_DUPLICATE, sidecar_path: str = None):
+        """
+        :param is_purchased: whether looked up comics are recorded as purchased
+        :param purchased_type: PRINT_PURCHASE_TYPE or DIGITAL_PURCHASE_TYPE
+        :param purchased_price: price for every comic, None uses the comic's cover price
+        :param purchased_date: YYYY-MM-DD date for every comic, None uses the comic's on sale date
+        :param duplicate_policy: which upload date to keep for duplicate barcodes
+        :param sidecar_path: optional CSV of per barcode overrides, see load_sidecar()
+        """
+        self.is_purchased = is_purchased
+        self.purchased_type = purchased_type
+        self.purchased_price = purchased_price
+        self.purchased_date = purchased_date
+        self.duplicate_policy = duplicate_policy
+        self.overrides = {}  # (overrides[barcode] = {is_purchased, purchased_type, purchased_price, purchased_date})
+
+        if sidecar_path is not None:
+            self.load_sidecar(sidecar_path)
+
+    def load_sidecar(self, sidecar_path: str):
+        """
+        Loads per barcode overrides from a CSV with an upc column and any of purchased (y/n), format (print/digital),
+        price and date (YYYY-MM-DD) columns. Empty cells fall back to the session defaults.
+        :param sidecar_path: path of the CSV file
+        """
+        with open(sidecar_path, newline='') as sidecar_file:
+            for row in csv.DictReader(sidecar_file):
+                barcode = row['upc'].strip()
+                # accept barcodes copied from scanned_upc_codes
+                barcode = barcode.split('-', 1)[1] if '-' in barcode else barcode
+
+                override = {}
+                if row.get('purchased'):
+                    override['is_purchased'] = row['purchased'].strip().upper() in ('Y', 'YES', '1', 'TRUE')
+                if row.get('format'):
+                    digital = row['format'].strip().upper() == 'DIGITAL'
+                    override['purchased_type'] = DIGITAL_PURCHASE_TYPE if digital else PRINT_PURCHASE_TYPE
+                if row.get('price'):
+                    override['purchased_price'] = float(row['price'])
+                if row.get('date'):
+                    override['purchased_date'] = row['date'].strip()
+
+                self.set_override(barcode, **override)
+
+    def set_override(self, barcode: str, **details):
+        """
+        Overrides the purchase details of one barcode for this session
+        :param barcode: upc + 5 digit add-on
+        :param details: any of is_purchased, purchased_type, purchased_price, purchased_date
+        """
+        self.overrides.setdefault(barcode, {}).update(details)
+
+    def get_is_purchased(self, barcode: str) -> bool:
+        """
+        Answers "Did you purchase this comic"
+        :param barcode: upc + 5 digit add-on
+        :return: True if the comic is recorded as purchased
+        """
+        return self.overrides.get(barcode, {}).get('is_purchased', self.is_purchased)
+
+    def get_purchased_details(self, barcode: str, marvel_comic_data) -> tuple[str, float, str]:
+        """
+        Same result as Lookup.get_purchased_details() without the prompts
+        :param barcode: upc + 5 digit add-on
+        :param marvel_comic_data: api response (or local data shaped like it) with 'dates' and 'prices' lists
+        :return: purchased date in the Marvel date format, price and purchase type
+        """
+        override = self.overrides.get(barcode, {})
+        purchasedType = override.get('purchased_type', self.purchased_type)
+
+        if purchasedType == DIGITAL_PURCHASE_TYPE:
+            dateType, priceType = 'digitalPurchaseDate', 'digitalPurchasePrice'
+        else:
+            dateType, priceType = 'onsaleDate', 'printPrice'
+
+        purchasedDate = override.get('purchased_date', self.purchased_date)
+        if purchasedDate is not None:
+            purchasedDate = purchasedDate + Lookup.MARVEL_YYYY_MM_DD_SUFFIX
+        else:
+            for date in marvel_comic_data['dates']:
+                if date['type'] == dateType:
+                    purchasedDate = date['date']
+                    break
+
+        purchasedPrice = override.get('purchased_price', self.purchased_price)
+        if purchasedPrice is None:
+            for price in marvel_comic_data['prices']:
+                if price['type'] == priceType:
+                    purchasedPrice = price['price']
+                    break
+
+        return purchasedDate, purchasedPrice, purchasedType
+
+    def resolve_duplicate(self, og_date, conflict_date):
+        """
+        Picks the upload date to keep for a barcode scanned more than once
+        :param og_date: date from barcode previously scanned
+        :param conflict_date: date of the current (newer) barcode
+        :return: the date the duplicate_policy keeps
+        """
+        if self.duplicate_policy == KEEP_LATEST_DUPLICATE:
+            return max(og_date, conflict_date)
+        return min(og_date, conflict_date)
@@ -0,0 +1,197 @@
+"""
+Author: Zane Miller
+Email: millerzanem@gmail.com
+Date: 10/19/2026
+Description: Comic refreshes run as jobs on the LookupScheduler, with progress the web ui polls and duplicate
+refreshes of a comic merged into one job
+"""
+
+from __future__ import annotations
+
+import secrets
+import threading
+import time
+
+from backend.classes.lookup_scheduler import USER_PRIORITY
+
+QUEUED_STATUS = 'queued'
+RUNNING_STATUS = 'running'
+DONE_STATUS = 'done'
+FAILED_STATUS = 'failed'
+FINISHED_STATUSES = (DONE_STATUS, FAILED_STATUS)
+JOB_RETENTION_SECONDS = 15 * 60  # finished jobs stay readable this long
+
+
+class RefreshJob:
+    """
+    Progress of one comic refresh: its status, the phase (entity) it is in and how many records of each phase are
+    done. Updated from the scheduler thread, read from request threads.
+    """
+
+    def __init__(self, comic_id: int):
+        """
+        :param comic_id: the comic being refreshed
+        """
+        self.id = secrets.token_hex(8)
+        self.comic_id = comic_id
+        self.status = QUEUED_STATUS
+        self.phase = None
+        self.counts = {}  # (counts[phase] = {'done': int, 'total': int})
+        self.error = None
+        self.submitted = time.time()
+        self.started = None
+        self.finished = None
+        self.merged = 0  # refreshes of the same comic answered with this job
+
+        self._version = 0
+        self._changed = threading.Condition()
+
+    def start(self):
+        with self._changed:
+            self.status = RUNNING_STATUS
+            self.started = time.time()
+            self._notify()
+
+    def set_totals(self, totals: dict[str, int]):
+        """
+        Sets the number of records of the phases still to come, so the progress shows all of them up front
+        :param totals: {phase: records}
+        """
+        with self._changed:
+            for phase, total in totals.items():
+                self.counts[phase] = {'done': 0, 'total': total}
+            self._notify()
+
+    def progress(self, phase: str, done: int, total: int = None):
+        """
+        Reports the records of a phase done so far
+        :param phase: the entity being refreshed, e.g. Lookup.CHARACTER_ENTITY
+        :param done: records of the phase done
+        :param total: records in the phase, unchanged if None
+        """
+        with self._changed:
+            self.phase = phase
+            counts = self.counts.setdefault(phase, {'done': 0, 'total': 0})
+            counts['done'] = done
+            if total is not None:
+                counts['total'] = total
+            self._notify()
+
+    def finish(self, error: Exception = None):
+        """
+        :param error: the exception the refresh failed with, None if it succeeded
+        """
+        with self._changed:
+            self.status = FAILED_STATUS if error is not None else DONE_STATUS
+            self.error = str(error) if error is not None else None
+            self.finished = time.time()
+            self._notify()
+
+    def wait_for_change(self, version: int, timeout: float) -> tuple[dict, int]:
+        """
+        Blocks until the job changes past version (or the timeout passes)
+        :param version: the version the caller has seen, -1 for none
+        :param timeout: seconds to wait at most
+        :return: (to_dict(), its version)
+        """
+        with self._changed:
+            self._changed.wait_for(lambda: self._version != version, timeout)
+            return self.to_dict(), self._version
+
+    def to_dict(self) -> dict:
+        """
+        :return: {'id', 'comicId', 'status', 'phase', 'counts', 'error', 'merged', 'queuedSeconds', 'runSeconds'}
+        """
+        with self._changed:
+            run_end = self.finished if self.finished is not None else time.time()
+            return {
+                    'id'           : self.id,
+                    'comicId'      : self.comic_id,
+                    'status'       : self.status,
+                    'phase'        : self.phase,
+                    'counts'       : {phase: dict(counts) for phase, counts in self.counts.items()},
+                    'error'        : self.error,
+                    'merged'       : self.merged,
+                    'queuedSeconds': round((self.started or run_end) - self.submitted, 2),
+                    'runSeconds'   : round(run_end - self.started, 2) if self.started is not None else None,
+            }
+
+    def _notify(self):
+        """ Wakes wait_for_change() callers, the caller holds _changed """
+        self._version += 1
+        self._changed.notify_all()
+
+
+class RefreshJobs:
+    """
+    Submits comic refreshes to a LookupScheduler as user priority jobs and keeps their RefreshJob. A refresh of a
+    comic whose job hasn't finished yet is answered with that job instead of queueing another one.
+    """
+
+    def __init__(self, scheduler, retention: int = JOB_RETENTION_SECONDS):
+        """
+        :param scheduler: the LookupScheduler the refreshes run on
+        :param retention: seconds a finished job stays readable
+        """
+        self.scheduler = scheduler
+        self.retention = retention
+
+        self._jobs = {}  # (jobs[job id] = RefreshJob)
+        self._active = {}  # (active[comic id] = its unfinished RefreshJob)
+        self._lock = threading.Lock()
+
+    def submit(self, comic_id: int, refresh) -> RefreshJob:
+        """
+        Queues refresh(lookup, comic_id, job) unless the comic already has an unfinished job
+        :param comic_id: the comic to refresh
+        :param refresh: function doing the refresh on the scheduler's Lookup and reporting to the job
+        :return: the comic's job, new or merged into
+        """
+        with self._lock:
+            self._prune()
+            job = self._active.get(comic_id)
+            if job is not None:
+                job.merged += 1
+                return job
+
+            job = RefreshJob(comic_id)
+            self._jobs[job.id] = job
+            self._active[comic_id] = job
+
+        def run(lookup):
+            job.start()
+            try:
+                refresh(lookup, comic_id, job)
+            except Exception as e:
+                self._finish(job, e)
+                raise
+            self._finish(job)
+
+        def finish_refused(future):
+            # a job the scheduler refuses (ApiBudgetExhausted) never calls run()
+            if job.finished is None and not future.cancelled():
+                self._finish(job, future.exception())
+
+        self.scheduler.submit(USER_PRIORITY, run).add_done_callback(finish_refused)
+        return job
+
+    def get(self, job_id: str) -> RefreshJob | None:
+        """
+        :return: the job, None if unknown or finished longer than retention ago
+        """
+        with self._lock:
+            self._prune()
+            return self._jobs.get(job_id)
+
+    def _finish(self, job: RefreshJob, error: Exception = None):
+        with self._lock:
+            if self._active.get(job.comic_id) is job:
+                del self._active[job.comic_id]
+        job.finish(error)
+
+    def _prune(self):
+        """ Drops jobs finished longer than retention ago, the caller holds _lock """
+        expired = time.time() - self.retention
+        for job_id in [job_id for job_id, job in self._jobs.items()
+                       if job.finished is not None and job.finished < expired]:
+            del self._jobs[job_id]
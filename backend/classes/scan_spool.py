@@ -0,0 +1,118 @@
+"""
+Author: Zane Miller
+Email: millerzanem@gmail.com
+Date: 10/19/2026
+Description: Local on-device spool for scanned barcodes so scanning never depends on the database being reachable
+"""
+
+from __future__ import annotations
+
+import os
+import sqlite3
+import threading
+
+SCAN_SPOOL_PATH = os.path.join(os.path.expanduser('~'), '.pi-comic-scanner', 'scan_spool.sqlite3')
+
+
+class ScanSpool:
+    """
+    Append-only SQLite log of scanned barcodes on the Pi. Every accepted scan is committed here first; rows are
+    marked sent once a sync has committed them to the scanned_upc_codes buffer table.
+    """
+
+    def __init__(self, spool_path: str = SCAN_SPOOL_PATH):
+        """
+        Opens (and creates if needed) the spool file
+        :param spool_path: path of the SQLite spool file
+        """
+        spool_dir = os.path.dirname(spool_path)
+        if spool_dir:
+            os.makedirs(spool_dir, exist_ok=True)
+
+        self.spool_path = spool_path
+        self._lock = threading.Lock()
+
+        # autocommit; the scanner thread and the sync worker share the connection behind _lock
+        self._connection = sqlite3.connect(spool_path, isolation_level=None, check_same_thread=False)
+        self._connection.execute("PRAGMA journal_mode=WAL;")
+        # fsync every commit so an acknowledged scan survives a power cut
+        self._connection.execute("PRAGMA synchronous=FULL;")
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS spooled_scans ("
+            "id INTEGER PRIMARY KEY AUTOINCREMENT, "
+            "upc_code TEXT NOT NULL, "
+            "date_scanned TEXT NOT NULL, "
+            "sent INTEGER NOT NULL DEFAULT 0, "
+            "discarded INTEGER NOT NULL DEFAULT 0, "
+            "created TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP);"
+        )
+        self._connection.execute(
+            "CREATE INDEX IF NOT EXISTS spooled_scans_pending ON spooled_scans (sent, discarded, id);"
+        )
+
+    def append(self, upc_code: str, date_scanned: str) -> int:
+        """
+        Durably records a scanned barcode
+        :param upc_code: the formatted barcode
+        :param date_scanned: YYYY-MM-DD date uploaded to the buffer with the barcode
+        :return: the spool row id
+        """
+        with self._lock:
+            cursor = self._connection.execute(
+                "INSERT INTO spooled_scans (upc_code, date_scanned) VALUES (?, ?);", (upc_code, date_scanned)
+            )
+            return cursor.lastrowid
+
+    def get_pending(self, limit: int = None) -> list[tuple[int, str, str]]:
+        """
+        Gets the rows that haven't been synced to the buffer yet, oldest first
+        :param limit: max number of rows to return, None for all
+        :return: [(spool id, upc_code, date_scanned), ...]
+        """
+        query = "SELECT id, upc_code, date_scanned FROM spooled_scans WHERE sent = 0 AND discarded = 0 ORDER BY id"
+        params = ()
+        if limit is not None:
+            query += " LIMIT ?"
+            params = (limit,)
+
+        with self._lock:
+            return self._connection.execute(query + ";", params).fetchall()
+
+    def mark_sent(self, spool_ids: list[int]):
+        """
+        Marks rows as committed to the scanned_upc_codes buffer
+        :param spool_ids: the spool row ids that were synced
+        """
+        with self._lock:
+            self._connection.executemany("UPDATE spooled_scans SET sent = 1 WHERE id = ?;", [(i,) for i in spool_ids])
+
+    def discard(self, upc_code: str) -> bool:
+        """
+        Marks every spooled copy of a barcode as discarded (removed during review)
+        :param upc_code: the formatted barcode
+        :return: True if a copy had already been synced to the buffer
+        """
+        with self._lock:
+            already_sent = self._connection.execute(
+                "SELECT COUNT(*) FROM spooled_scans WHERE upc_code = ? AND sent = 1 AND discarded = 0;", (upc_code,)
+            ).fetchone()[0] > 0
+            self._connection.execute("UPDATE spooled_scans SET discarded = 1 WHERE upc_code = ?;", (upc_code,))
+
+        return already_sent
+
+    def get_num_pending(self) -> int:
+        """
+        Counts the rows waiting to be synced
+        :return: number of pending rows
+        """
+        with self._lock:
+            return self._connection.execute(
+                "SELECT COUNT(*) FROM spooled_scans WHERE sent = 0 AND discarded = 0;"
+            ).fetchone()[0]
+
+    def close(self):
+        """
+        Closes the spool file
+        """
+        with self._lock:
+            self._connection.close()
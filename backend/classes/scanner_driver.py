@@ -6,14 +6,20 @@ Date: 04/13/2023
 Description: Class drivers for scanning by different methods
 """
 
-from __future__ import print_function
+from __future__ import annotations, print_function
 
+import collections
 import datetime
+import queue
+import threading
 import time
 
 import de2120_barcode_scanner
 import serial
 
+from backend.classes.lookup_daemon import notify_lookup_daemon
+from backend.classes.scan_spool import ScanSpool
+
 
 class InvalidConnectionException(Exception):
     """Raised the program cant connect to the serial port"""
@@ -23,9 +29,134 @@ class InvalidConnectionException(Exception):
 BARCODE_CODE = "MAV18"
 KEYBOARD_ENTRY_MODE = 'KYBD'
 SCANNER_ENTRY_MODE = 'SCNR'
+MULTI_SCANNER_ENTRY_MODE = 'MSCN'
+BATCH_UPLOAD_MODE = 'BTCH'
+WRITE_BEHIND_UPLOAD_MODE = 'WBHD'
+WRITE_BEHIND_INTERVAL = 3
+WRITE_BEHIND_BATCH_SIZE = 25
 IDLE_SCANNER_TIMEOUT = 10
 MAV18_LENGTH = 17
 MAV18_LENGTH_SCANNED = 18
+UPC_A_LENGTH = 12
+BARCODE_TERMINATOR = b'\r'
+
+# reasons a read is rejected by validate_marvel_barcode()
+REJECT_LENGTH = 'LENGTH'
+REJECT_NON_DIGIT = 'NON_DIGIT'
+REJECT_UPC_CHECK_DIGIT = 'UPC_CHECK_DIGIT'
+REJECT_ADDON_COVER = 'ADDON_COVER'
+REJECT_ADDON_PRINT = 'ADDON_PRINT'
+
+
+def upc_a_check_digit(upc_digits: str) -> int:
+    """
+    Computes the UPC-A check digit of the first 11 digits
+    :param upc_digits: at least 11 digits, anything after the 11th is ignored
+    :return: the check digit (0-9)
+    """
+    odd_sum = sum(int(digit) for digit in upc_digits[0:11:2])
+    even_sum = sum(int(digit) for digit in upc_digits[1:11:2])
+    return (10 - (odd_sum * 3 + even_sum) % 10) % 10
+
+
+def validate_marvel_barcode(mav18_barcode: str):
+    """
+    Checks a 17 digit MAV18 barcode (12 digit UPC-A + 5 digit add-on) before it is queued for lookup. The add-on's
+    own checksum is encoded in its bar parity and verified by the scanner's decoder, so only its structure is checked
+    here: 3 issue digits, then a cover and a print digit that both start at 1.
+    :param mav18_barcode: the barcode without the MAV18- prefix or terminator
+    :return: None if the barcode is valid, otherwise one of the REJECT_* reasons
+    """
+    if len(mav18_barcode) != MAV18_LENGTH:
+        return REJECT_LENGTH
+
+    if not (mav18_barcode.isascii() and mav18_barcode.isdigit()):
+        return REJECT_NON_DIGIT
+
+    if upc_a_check_digit(mav18_barcode) != int(mav18_barcode[UPC_A_LENGTH - 1]):
+        return REJECT_UPC_CHECK_DIGIT
+
+    if mav18_barcode[UPC_A_LENGTH + 3] == '0':
+        return REJECT_ADDON_COVER
+
+    if mav18_barcode[UPC_A_LENGTH + 4] == '0':
+        return REJECT_ADDON_PRINT
+
+    return None
+
+
+class SerialBarcodeReader(threading.Thread):
+    """
+    Background thread that blocks on the scanner's serial port and pushes every complete read onto a queue, so the
+    foreground can wait on the queue (or sit in an input() prompt) without missing scans.
+    """
+
+    def __init__(self, serial_port: serial.Serial, barcode_queue: queue.Queue, source=None,
+                 terminator: bytes = BARCODE_TERMINATOR):
+        """
+        :param serial_port: open serial port the scanner writes to. Its timeout bounds how long stop() takes.
+        :param barcode_queue: queue the decoded reads (including the terminator) are put on as (source, read)
+        :param source: tags which device a read came from when several readers share the queue
+        :param terminator: byte the scanner appends to the end of every read
+        """
+        super().__init__(name=f"SerialBarcodeReader({serial_port.port})", daemon=True)
+        self._serial_port = serial_port
+        self._barcode_queue = barcode_queue
+        self._source = source
+        self._terminator = terminator
+        self._stop_event = threading.Event()
+
+    def run(self):
+        """
+        Reads until the terminator. A read cut off by the port timeout is kept and completed by the next read.
+        """
+        partial_read = b''
+
+        while not self._stop_event.is_set():
+            try:
+                raw_read = self._serial_port.read_until(self._terminator)
+            except serial.SerialException as e:
+                print(f"SERIAL READ ERROR ON {self._serial_port.port}: {e}")
+                break
+
+            if not raw_read:
+                continue
+
+            partial_read += raw_read
+            if partial_read.endswith(self._terminator):
+                self._barcode_queue.put((self._source, partial_read.decode(errors='replace')))
+                partial_read = b''
+
+    def stop(self):
+        """ Asks the reader to exit after its current read returns """
+        self._stop_event.set()
+
+
+class SpoolSyncWorker(threading.Thread):
+    """
+    Background thread that syncs a Scanner's spooled barcodes to the scanned_upc_codes buffer every few seconds
+    while scanning continues. While the database is unreachable the scans simply stay in the spool.
+    """
+
+    def __init__(self, scanner, interval: float = WRITE_BEHIND_INTERVAL, batch_size: int = WRITE_BEHIND_BATCH_SIZE):
+        """
+        :param scanner: the Scanner whose spool is synced
+        :param interval: seconds between syncs
+        :param batch_size: max number of barcodes per multi-row insert
+        """
+        super().__init__(name="SpoolSyncWorker", daemon=True)
+        self._scanner = scanner
+        self._interval = interval
+        self._batch_size = batch_size
+        self._stop_event = threading.Event()
+
+    def run(self):
+        while not self._stop_event.wait(self._interval):
+            self._scanner._upload_upcs_to_db(batch_size=self._batch_size, verbose=False)
+
+    def stop(self):
+        """ Stops the sync loop. Callers do the final sync themselves. """
+        self._stop_event.set()
 
 
 class Scanner:
@@ -34,17 +165,52 @@ class Scanner:
     Handles most of the middleware between entry modes and review for upload to db.
     """
 
-    def __init__(self, scanner_db):
-        self.scanned_barcodes_list = []
+    def __init__(self, scanner_db, upload_mode: str = BATCH_UPLOAD_MODE, spool: ScanSpool = None):
+        self.scanned_barcodes = {}  # insertion-ordered set of this session's barcodes (scanned_barcodes[barcode] = None)
+        self.known_barcodes = set()  # barcodes already in the scanned_upc_codes buffer or the purchased collection
+        self.uploaded_barcodes = set()  # session barcodes already written to the scanned_upc_codes buffer
+        self.num_reads = 0  # reads checked by _validate_read(), accepted or not
+        self.rejected_reads = collections.Counter()  # rejected_reads[REJECT_* reason] = count
         self.entry_mode = None
+        self.upload_mode = upload_mode
         self.db = scanner_db
 
+        # every accepted scan is written to the local spool before anything else
+        self._owns_spool = spool is None
+        self.spool = spool if spool is not None else ScanSpool()
+
+        # the sync thread and the foreground share the barcodes and the db connection
+        self._barcodes_lock = threading.Lock()
+        self._db_lock = threading.Lock()
+        self._upload_lock = threading.Lock()  # held from reading the pending spool rows until they're marked sent
+        self._write_behind = None
+
+        self._load_known_barcodes()
+        self._restore_spooled_barcodes()
+
+        if self.upload_mode == WRITE_BEHIND_UPLOAD_MODE:
+            self._write_behind = SpoolSyncWorker(self)
+            self._write_behind.start()
+
     def enter_marvel_barcodes(self):
         """
         Generic function definition
         """
         pass
 
+    def close(self):
+        """
+        Stops the sync thread, syncs anything it hasn't uploaded yet and closes the spool
+        """
+        if self._write_behind is not None:
+            self._write_behind.stop()
+            self._write_behind.join()
+            self._write_behind = None
+            self._upload_upcs_to_db()
+
+        if self._owns_spool:
+            self.spool.close()
+
     ####################################################################################################################
     #
     #                                           REVIEW
@@ -69,7 +235,7 @@ class Scanner:
         while str(edit_response).upper() != "N" and num_barcodes > 0:
             edit_index = int(edit_response)
             edit_index -= 1
-            edit_barcode = self.scanned_barcodes_list[edit_index]
+            edit_barcode = list(self.scanned_barcodes)[edit_index]
             edit_result = False
 
             while edit_result is False:
@@ -102,7 +268,9 @@ class Scanner:
         delete_confirm = input()
 
         if delete_confirm.upper() == "Y":
-            del self.scanned_barcodes_list[del_index]
+            with self._barcodes_lock:
+                del self.scanned_barcodes[barcode]
+            self._remove_uploaded_barcode(barcode)
             print(f"Deleted {barcode}\n")
             return True
 
@@ -113,15 +281,23 @@ class Scanner:
         edit_confirm = input()
 
         if edit_confirm.upper() == 'Y':
-            edited_barcode = input("Enter the updated barcode:\n")
-            if len(edited_barcode) == MAV18_LENGTH:
-                self.scanned_barcodes_list[edit_index] = str(edited_barcode)
+            edited_barcode = input("Enter the updated barcode:\n").strip()
+            if self._validate_read(edited_barcode):
+                formatted_barcode = self.format_marvel_barcode(str(edited_barcode))
+
+                if formatted_barcode in self.scanned_barcodes or formatted_barcode in self.known_barcodes:
+                    print(f"{formatted_barcode} already scanned.")
+                    return False
+
+                # swap the barcode in place so the scan order is kept
+                self.spool.append(formatted_barcode, self.get_formatted_YYYY_MM_DD_string())
+                with self._barcodes_lock:
+                    barcodes = list(self.scanned_barcodes)
+                    barcodes[edit_index] = formatted_barcode
+                    self.scanned_barcodes = dict.fromkeys(barcodes)
+                self._remove_uploaded_barcode(barcode)
                 return True
             else:
-                print(
-                    f"MAV18 Barcode {edited_barcode} of length"
-                    f" {len(edited_barcode)} is invalid (needs to be 17 digits)"
-                )
                 return False
 
         return False
@@ -165,26 +341,83 @@ class Scanner:
         ).strip()
 
         if upload_confirm == 'N' or upload_confirm == 'n':
+            if self.uploaded_barcodes:
+                print(f"{len(self.uploaded_barcodes)} barcodes were already written to the buffer while scanning.")
             return False
         elif upload_confirm == 'Y' or upload_confirm == 'y':
-            self._upload_upcs_to_db()
-            return True
+            uploaded = self._upload_upcs_to_db()
+            if not uploaded:
+                print(
+                    f"Database unavailable. {self.spool.get_num_pending()} barcodes are saved on this device "
+                    f"and will be uploaded on the next sync."
+                )
+            return uploaded
 
-    def _upload_upcs_to_db(self):
+    def _upload_upcs_to_db(self, batch_size: int = None, verbose: bool = True) -> bool:
         """
-        Uploads the list of scanned _barcodes to scanned_upc_codes buffer table in comic_books db,
-        commits to db.
+        Syncs the spooled barcodes that aren't in the scanned_upc_codes buffer table yet with multi-row inserts,
+        one commit per insert, and marks them sent in the spool.
+        :param batch_size: max barcodes per insert, None uploads everything pending in one insert
+        :param verbose: print progress (the sync thread runs quietly)
         :return: returns True if the upcs were uploaded to the db, false otherwise.
         """
+        # the sync thread and a foreground upload would otherwise both read the same pending rows and insert them
+        # twice before either marks them sent
+        with self._upload_lock:
+            pending_rows = self.spool.get_pending()
+
+            if not pending_rows:
+                return True
+
+            if not self._db_available():
+                return False
+
+            print(f"Uploading {len(pending_rows)} barcodes to db...") if verbose else 0
+
+            batch_size = batch_size or len(pending_rows)
+
+            for batch_start in range(0, len(pending_rows), batch_size):
+                batch = pending_rows[batch_start:batch_start + batch_size]
+
+                with self._db_lock:
+                    uploaded = self.db.upload_upcs_to_buffer([(upc, date_scanned) for _, upc, date_scanned in batch])
+
+                if not uploaded:
+                    return False
+
+                self.spool.mark_sent([spool_id for spool_id, _, _ in batch])
+                with self._barcodes_lock:
+                    self.uploaded_barcodes.update(upc for _, upc, _ in batch)
+
+        # a lookup daemon on this machine picks the new rows up right away
+        notify_lookup_daemon()
+        return True
+
+    def _db_available(self) -> bool:
+        """
+        Checks the db connection and tries to reconnect if it was lost
+        :return: True if the db can be written to
+        """
+        with self._db_lock:
+            return self.db.is_connected() or self.db.reconnect()
 
-        print("Uploading to db...")
+    def _remove_uploaded_barcode(self, barcode: str):
+        """
+        Discards a barcode removed during review from the spool and deletes it from the buffer if it was already
+        synced
+        :param barcode: the formatted barcode that was deleted or edited
+        """
+        with self._barcodes_lock:
+            self.uploaded_barcodes.discard(barcode)
 
-        formatted_date = self.get_formatted_YYYY_MM_DD_string()
+        if not self.spool.discard(barcode):
+            return
 
-        # uploads each upc backend to db
-        for upc in self.scanned_barcodes_list:
-            query_params = (upc, formatted_date)
-            self.db.upload_upc_to_buffer(query_params)
+        if self._db_available():
+            with self._db_lock:
+                self.db.delete_from_scanned_upc_codes_table(barcode)
+        else:
+            print(f"Database unavailable. Remove {barcode} from scanned_upc_codes before the next lookup.")
 
     ####################################################################################################################
     #
@@ -194,10 +427,10 @@ class Scanner:
 
     def get_num_barcodes(self) -> int:
         """
-        Counts the number of upc codes in scanned_barcodes_list buffer
+        Counts the number of upc codes in scanned_barcodes buffer
         :return: an integer representing the number of upcs in list
         """
-        return len(self.scanned_barcodes_list)
+        return len(self.scanned_barcodes)
 
     def get_entry_method(self):
         """
@@ -205,17 +438,107 @@ class Scanner:
         """
         return self.entry_mode
 
+    def get_rejection_rate(self) -> float:
+        """
+        Gets the fraction of reads rejected by validation this session
+        :return: rejected reads / all reads, 0.0 before the first read
+        """
+        if self.num_reads == 0:
+            return 0.0
+        return sum(self.rejected_reads.values()) / self.num_reads
+
+    def print_rejection_report(self):
+        """
+        Prints how many reads were rejected and why, to help tune the scanner
+        """
+        num_rejected = sum(self.rejected_reads.values())
+        print(f"{num_rejected} of {self.num_reads} reads rejected ({self.get_rejection_rate():.1%})")
+
+        for reason, count in self.rejected_reads.most_common():
+            print(f"\t{reason:<18}{count}")
+
     ####################################################################################################################
     #
     #                                       PARENT UTILITIES
     #
     ####################################################################################################################
 
+    def _validate_read(self, mav18_barcode: str) -> bool:
+        """
+        Validates a read and counts it towards the rejection stats
+        :param mav18_barcode: the barcode without the MAV18- prefix or terminator
+        :return: True if the barcode passed validate_marvel_barcode()
+        """
+        self.num_reads += 1
+        reject_reason = validate_marvel_barcode(mav18_barcode)
+
+        if reject_reason is None:
+            return True
+
+        self.rejected_reads[reject_reason] += 1
+        print(f"Barcode {mav18_barcode} rejected: {reject_reason}")
+        return False
+
+    def _add_scanned_barcode(self, formatted_barcode: str) -> bool:
+        """
+        Adds a formatted barcode to the session unless it was already scanned this session, is still waiting in the
+        scanned_upc_codes buffer or belongs to a purchased comic.
+        :param formatted_barcode: barcode with the MAV18- prefix
+        :return: True if the barcode was added, False if it was a duplicate
+        """
+        if formatted_barcode in self.scanned_barcodes:
+            print(f"{formatted_barcode} already scanned.")
+            return False
+
+        if formatted_barcode in self.known_barcodes:
+            print(f"{formatted_barcode} is already in your collection or waiting in the lookup buffer.")
+            return False
+
+        self.spool.append(formatted_barcode, self.get_formatted_YYYY_MM_DD_string())
+
+        with self._barcodes_lock:
+            self.scanned_barcodes[formatted_barcode] = None
+        return True
+
+    def _load_known_barcodes(self):
+        """
+        Bulk loads the barcodes already in the scanned_upc_codes buffer and in the purchased collection so rescans are
+        caught at scan time instead of at lookup time.
+        """
+        if not self.db.is_connected():
+            print("Database unavailable. Only this session's barcodes will be checked for duplicates.")
+            return
+
+        res_data = self.db.get_known_upcs(BARCODE_CODE)
+
+        if res_data is not None:
+            self.known_barcodes = {upc_code for upc_code, in res_data}
+
+    def _restore_spooled_barcodes(self):
+        """
+        Brings barcodes left in the spool by an earlier offline or interrupted session back into this session so they
+        can be reviewed and get uploaded with it.
+        """
+        restored = 0
+
+        for spool_id, upc_code, _ in self.spool.get_pending():
+            # already reached the buffer before the spool row was marked sent
+            if upc_code in self.known_barcodes:
+                self.spool.mark_sent([spool_id])
+                continue
+
+            if upc_code not in self.scanned_barcodes:
+                self.scanned_barcodes[upc_code] = None
+                restored += 1
+
+        if restored > 0:
+            print(f"Restored {restored} barcodes from an earlier session that were never uploaded.")
+
     def _print_list_barcodes(self):
         """ Prints a formatted list of _barcodes with line numbers """
         line_no = 1
 
-        for barcode in self.scanned_barcodes_list:
+        for barcode in self.scanned_barcodes:
             print(f"({str(line_no) + ')':<5}{barcode}")
             line_no += 1
 
@@ -239,26 +562,114 @@ class Scanner:
         return "MAV18-" + mav18_barcode
 
 
+class ScannerDevice:
+    """
+    One DE2120 scanner on a serial port, the reader thread feeding the shared barcode queue and its scan stats
+    """
+
+    def __init__(self, device_driver: str, baud_rate: int = 115200, timeout: int = 1):
+        """
+        :param device_driver: path of the scanner's serial device
+        :param baud_rate: serial baud rate
+        :param timeout: serial read timeout, bounds how long stopping the reader takes
+        """
+        self.device_driver = device_driver
+        self.baud_rate = baud_rate
+        self.timeout = timeout
+
+        self.serial_port = serial.Serial(self.device_driver, self.baud_rate, timeout=self.timeout)
+        self.serial_scanner = de2120_barcode_scanner.DE2120BarcodeScanner(self.serial_port)
+        self.connection_status = False
+        self._barcode_reader = None
+
+        self.num_reads = 0
+        self.num_added = 0
+        self.num_duplicates = 0
+        self.num_rejected = 0
+        self.first_read_time = None
+        self.last_read_time = None
+
+    def connect(self) -> bool:
+        """
+        Checks the scanner answers on its serial port
+        :return: True if the scanner is connected
+        """
+        self.connection_status = self.serial_scanner.begin()
+        return self.connection_status
+
+    def start_reader(self, barcode_queue: queue.Queue):
+        """
+        Starts the SerialBarcodeReader thread if it isn't already running. The reader is started after begin() so it
+        doesn't consume the scanner's command responses.
+        :param barcode_queue: the queue shared by every device, reads are put on it as (device, read)
+        """
+        if self._barcode_reader is None or not self._barcode_reader.is_alive():
+            self._barcode_reader = SerialBarcodeReader(self.serial_port, barcode_queue, source=self)
+            self._barcode_reader.start()
+
+    def close(self):
+        """
+        Stops the reader thread and closes the serial port
+        """
+        if self._barcode_reader is not None:
+            self._barcode_reader.stop()
+            self._barcode_reader.join()
+            self._barcode_reader = None
+
+        self.serial_port.close()
+
+    def record_read(self, validated: bool, added: bool):
+        """
+        Counts a processed read towards this device's stats
+        :param validated: the read passed validation
+        :param added: the barcode was added to the session (not a duplicate)
+        """
+        self.last_read_time = time.perf_counter()
+        if self.first_read_time is None:
+            self.first_read_time = self.last_read_time
+
+        self.num_reads += 1
+        if not validated:
+            self.num_rejected += 1
+        elif added:
+            self.num_added += 1
+        else:
+            self.num_duplicates += 1
+
+    def get_scan_rate(self) -> float:
+        """
+        Gets the rate barcodes were added from this device between its first and last read
+        :return: added barcodes per minute, 0.0 with fewer than two reads
+        """
+        if self.first_read_time is None or self.last_read_time == self.first_read_time:
+            return 0.0
+        return self.num_added / (self.last_read_time - self.first_read_time) * 60
+
+
 class ScannerBarcodeEntry(Scanner):
     """
     Scanner object to handle connecting to scanner serial port,
     scanning _barcodes, and saving scanned _barcodes to file
     """
 
-    def __init__(self, scanner_db, device_driver: str, baud_rate: int = 115200, timeout: int = 1):
+    def __init__(self, scanner_db, device_driver: str | list[str], baud_rate: int = 115200, timeout: int = 1,
+                 upload_mode: str = BATCH_UPLOAD_MODE, spool: ScanSpool = None):
         """
-        Scanner object with hard_port, connection_status, DE2120BarcodeScanner
-        serial_scanner object, and a list of scanned _barcodes
+        Scanner object with one ScannerDevice per serial device, a shared barcode queue and a list of scanned
+        _barcodes
+        :param device_driver: serial device path, or a list of paths to scan with several devices at once
         """
-        super().__init__(scanner_db)
+        super().__init__(scanner_db, upload_mode, spool)
         self.entry_mode = SCANNER_ENTRY_MODE
-        self.device_driver = device_driver
+        self.device_drivers = [device_driver] if isinstance(device_driver, str) else list(device_driver)
         self.baud_rate = baud_rate
         self.timeout = timeout
+        self.idle_timeout = IDLE_SCANNER_TIMEOUT
+
+        self.devices = [ScannerDevice(driver, self.baud_rate, self.timeout) for driver in self.device_drivers]
 
-        self._serial_port = serial.Serial("/dev/cu.usbmodem141101", 115200, timeout=1)
-        self.serial_scanner = de2120_barcode_scanner.DE2120BarcodeScanner(self._serial_port)
-        self._scanner_connection_status = False
+        # reads from every device's reader thread waiting to be processed, as (device, read)
+        self._barcode_queue = queue.Queue()
 
         # try to connect to serial port
         try:
@@ -268,13 +679,12 @@ class ScannerBarcodeEntry(Scanner):
 
     def _connect_scanner(self):
         """
-        Creates a connection to the supplied serial port and saves the status
-        as self._connection_status.
+        Connects every device and raises if any of them doesn't answer
         """
-        self._scanner_connection_status = self.serial_scanner.begin()
-
-        if not self._scanner_connection_status:
-            raise InvalidConnectionException
+        for device in self.devices:
+            if not device.connect():
+                print(f"Scanner on {device.device_driver} not responding...")
+                raise InvalidConnectionException
 
         print("Scanner ready! Begin scanning...")
 
@@ -284,64 +694,114 @@ class ScannerBarcodeEntry(Scanner):
         serial_scanner with a 5 digit add on backend. The first 3 digits of the
         add-on backend represent the issue number, the 4th digit represents the
         cover variant and the 5th digit represents the print variant.
+        Each serial port is read by its own SerialBarcodeReader thread; this loop
+        only waits on their shared queue, so nothing is polled while the scanners
+        are idle and scans made while the idle prompt is open are kept.
         """
 
-        if self._scanner_connection_status:
+        if all(device.connection_status for device in self.devices):
+            for device in self.devices:
+                device.start_reader(self._barcode_queue)
             user_continue_res = ""
 
             while user_continue_res.upper() != 'Q':
 
                 print("Enter barcode with 5-digit add-on: ")
-                marvel_barcode = False
-                idle_time = time.time()
-
-                # continue scanning or wait
-                while marvel_barcode is False and user_continue_res.upper() != "Q":
-                    # clear buffer before trying to read again
-                    marvel_barcode = self.serial_scanner.read_barcode()
-
-                    if not marvel_barcode and time.time() - idle_time >= IDLE_SCANNER_TIMEOUT:
-                        user_continue_res = input(
-                            "IDLE...What would you like to do?"
-                            "\n\t(s) to continue scanning"
-                            "\n\t(q) to save and continue:\n"
-                        )
-
-                        if user_continue_res.upper() == 'S':
-                            break
-
-                # check if a barcode was scanned
-                if marvel_barcode:
-                    marvel_barcode_length = len(str(marvel_barcode))
-
-                    # check if the scanned barcode includes the 5 digit add on
-                    # scanned barcode has an extra byte appended to the end
-                    if marvel_barcode_length == MAV18_LENGTH_SCANNED:
-                        formatted_marvel_barcode = self.format_marvel_barcode(str(marvel_barcode[:MAV18_LENGTH]))
-                        if formatted_marvel_barcode not in self.scanned_barcodes_list:
-                            print(f"Scanned {formatted_marvel_barcode}")
-                            self.scanned_barcodes_list.append(formatted_marvel_barcode)
-                        else:
-                            print(f"{formatted_marvel_barcode} already scanned.")
-
-                    # otherwise prompt to try again
-                    else:
-                        print(
-                            f"Barcode {marvel_barcode[:marvel_barcode_length - 1]} of length {marvel_barcode_length} is invalid (needs to be 18 digits)"
-                        )
-
-                time.sleep(0.02)
+
+                # wait for the reader threads or go idle
+                try:
+                    device, marvel_barcode = self._barcode_queue.get(timeout=self.idle_timeout)
+                except queue.Empty:
+                    user_continue_res = input(
+                        "IDLE...What would you like to do?"
+                        "\n\t(s) to continue scanning"
+                        "\n\t(q) to save and continue:\n"
+                    )
+                    continue
+
+                self._process_scanned_barcode(marvel_barcode, device)
+
+            # process anything scanned while the last prompt was open
+            while not self._barcode_queue.empty():
+                device, marvel_barcode = self._barcode_queue.get_nowait()
+                self._process_scanned_barcode(marvel_barcode, device)
+
+            if self.rejected_reads:
+                self.print_rejection_report()
 
         else:
             raise InvalidConnectionException
 
+    def print_device_report(self):
+        """
+        Prints each device's reads, added barcodes, duplicates, rejections and scan rate
+        """
+        print(f"{'device':<28}{'reads':>8}{'added':>8}{'dupes':>8}{'rejected':>10}{'scans/min':>11}")
+        for device in self.devices:
+            print(
+                f"{device.device_driver:<28}{device.num_reads:>8}{device.num_added:>8}{device.num_duplicates:>8}"
+                f"{device.num_rejected:>10}{device.get_scan_rate():>11.1f}"
+            )
+
+    def close(self):
+        """
+        Stops the reader threads, closes the serial ports and flushes any write behind uploads
+        """
+        for device in self.devices:
+            device.close()
+
+        super().close()
+
+    def _process_scanned_barcode(self, marvel_barcode: str, device: ScannerDevice = None):
+        """
+        Validates a raw read from the scanner and adds it to the scanned list
+        :param marvel_barcode: the raw read including the trailing terminator byte
+        :param device: the device the read came from, for its stats
+        """
+        # scanned barcode has an extra byte appended to the end
+        mav18_barcode = marvel_barcode[:-1] if marvel_barcode.endswith(BARCODE_TERMINATOR.decode()) else marvel_barcode
+
+        # check digit and 5 digit add on are verified before the barcode is spooled
+        validated = self._validate_read(mav18_barcode)
+        added = False
+        if validated:
+            formatted_marvel_barcode = self.format_marvel_barcode(mav18_barcode)
+            added = self._add_scanned_barcode(formatted_marvel_barcode)
+            if added:
+                print(f"Scanned {formatted_marvel_barcode}")
+
+        if device is not None:
+            device.record_read(validated, added)
+
+
+class MultiScannerBarcodeEntry(ScannerBarcodeEntry):
+    """
+    Scanner entry mode for several scanners at once. Every device gets its own reader thread and they all feed the
+    one deduplicating queue, spool and buffer upload of ScannerBarcodeEntry.
+    """
+
+    def __init__(self, scanner_db, device_drivers: list[str], baud_rate: int = 115200, timeout: int = 1,
+                 upload_mode: str = BATCH_UPLOAD_MODE, spool: ScanSpool = None):
+        """
+        :param device_drivers: serial device paths, one per scanner
+        """
+        super().__init__(scanner_db, device_drivers, baud_rate, timeout, upload_mode, spool)
+        self.entry_mode = MULTI_SCANNER_ENTRY_MODE
+
+    def enter_marvel_barcodes(self):
+        """
+        Scans from every device until the idle prompt is answered with (q), then reports each device's scan rate
+        """
+        super().enter_marvel_barcodes()
+        self.print_device_report()
+
 
 class KeyboardBarcodeEntry(Scanner):
     """Keyboard entry mode that inherits from Scanner parent class"""
 
-    def __init__(self, scanner_db):
+    def __init__(self, scanner_db, upload_mode: str = BATCH_UPLOAD_MODE, spool: ScanSpool = None):
 
-        super().__init__(scanner_db)
+        super().__init__(scanner_db, upload_mode, spool)
         self.entry_mode = KEYBOARD_ENTRY_MODE
 
     def enter_marvel_barcodes(self):
@@ -359,15 +819,10 @@ class KeyboardBarcodeEntry(Scanner):
             if marvel_barcode == 'q' or marvel_barcode == 'Q':
                 break
 
-            if len(marvel_barcode) == MAV18_LENGTH:
-                formatted_marvel_barcode = self.format_marvel_barcode(marvel_barcode)
-                if formatted_marvel_barcode not in self.scanned_barcodes_list:
+            if self._validate_read(marvel_barcode.strip()):
+                formatted_marvel_barcode = self.format_marvel_barcode(marvel_barcode.strip())
+                if self._add_scanned_barcode(formatted_marvel_barcode):
                     print(f"\nScanned {formatted_marvel_barcode}")
-                    self.scanned_barcodes_list.append(formatted_marvel_barcode)
-                else:
-                    print(f"{formatted_marvel_barcode} already scanned.")
-            else:
-                print(
-                    f"MAV18 Barcode {marvel_barcode} of length "
-                    f"{len(marvel_barcode)} is invalid (needs to be 17 digits)"
-                )
+
+        if self.rejected_reads:
+            self.print_rejection_report()
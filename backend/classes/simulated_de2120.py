@@ -0,0 +1,177 @@
+"""
+Author: Zane Miller
+Email: millerzanem@gmail.com
+Date: 10/19/2026
+Description: pty based stand-in for the DE2120 barcode scanner HAT so ScannerBarcodeEntry can be run and benchmarked
+without the hardware (POSIX only)
+"""
+
+from __future__ import annotations
+
+import os
+import random
+import select
+import threading
+import time
+import tty
+
+from backend.classes.scanner_driver import upc_a_check_digit
+
+ACK = b'\x06'
+COMMAND_START = b'^_^'
+COMMAND_END = b'.'
+SCAN_TERMINATOR = b'\r'
+
+VALID_SCAN = 'VALID'  # 17 digit MAV18 barcode + terminator (18 byte read)
+SHORT_SCAN = 'SHORT'  # add-on missed, 16 digits + terminator (17 byte read)
+UPC_ONLY_SCAN = 'UPCA'  # only the 12 digit UPC-A was decoded
+MISREAD_SCAN = 'MISREAD'  # 18 byte read with one digit misread
+
+
+def build_scan_stream(num_scans: int, short_rate: float = 0.0, upc_only_rate: float = 0.0,
+                      misread_rate: float = 0.0, seed: int = None) -> list[tuple[str, bytes]]:
+    """
+    Builds a replayable stream of scanner reads. Valid barcodes are unique so none of them are dropped as duplicates:
+    every 1000 reads share one random UPC (a series) and get issue numbers 000-999 on it.
+    :param num_scans: total number of reads
+    :param short_rate: fraction of 17 byte reads
+    :param upc_only_rate: fraction of reads missing the whole add-on
+    :param misread_rate: fraction of 18 byte reads with one digit changed
+    :param seed: random seed so runs can be compared
+    :return: [(scan kind, raw bytes written to the port), ...]
+    """
+    rng = random.Random(seed)
+    scan_stream = []
+    # distinct UPCs, one per 1000 reads
+    upc_offsets = rng.sample(range(100000), -(-num_scans // 1000))
+
+    for scan_no in range(num_scans):
+        upc = f"{75960600000 + upc_offsets[scan_no // 1000]:011d}"
+        upc += str(upc_a_check_digit(upc))
+        barcode = f"{upc}{scan_no % 1000:03d}11"
+        roll = rng.random()
+
+        if roll < short_rate:
+            scan_stream.append((SHORT_SCAN, barcode[:-1].encode() + SCAN_TERMINATOR))
+        elif roll < short_rate + upc_only_rate:
+            scan_stream.append((UPC_ONLY_SCAN, upc.encode() + SCAN_TERMINATOR))
+        elif roll < short_rate + upc_only_rate + misread_rate:
+            bad_index = rng.randrange(len(barcode))
+            bad_digit = rng.choice([digit for digit in '0123456789' if digit != barcode[bad_index]])
+            garbled = barcode[:bad_index] + bad_digit + barcode[bad_index + 1:]
+            scan_stream.append((MISREAD_SCAN, garbled.encode() + SCAN_TERMINATOR))
+        else:
+            scan_stream.append((VALID_SCAN, barcode.encode() + SCAN_TERMINATOR))
+
+    return scan_stream
+
+
+class SimulatedDE2120(threading.Thread):
+    """
+    Opens a pseudo terminal and acts as the DE2120 on its master side: every ^_^...  command is answered with an ACK
+    and, once start_replay() is called, the scan stream is written at scan_rate reads per second in bursts of
+    burst_size. Open self.port with serial.Serial like the real device.
+    """
+
+    def __init__(self, scan_stream: list[tuple[str, bytes]], scan_rate: float = 10.0, burst_size: int = 1,
+                 split_rate: float = 0.0, seed: int = None):
+        """
+        :param scan_stream: reads to replay, see build_scan_stream()
+        :param scan_rate: average reads per second
+        :param burst_size: reads written back to back before pausing for burst_size / scan_rate seconds
+        :param split_rate: fraction of reads written in two chunks to exercise partial reads
+        :param seed: random seed for split_rate
+        """
+        super().__init__(name="SimulatedDE2120", daemon=True)
+        self.scan_stream = scan_stream
+        self.scan_rate = scan_rate
+        self.burst_size = max(1, burst_size)
+        self.split_rate = split_rate
+        self.sent_times = []  # perf_counter() of each read in scan_stream once written
+
+        self._rng = random.Random(seed)
+        self._master_fd, self._slave_fd = os.openpty()
+        tty.setraw(self._slave_fd)
+        self.port = os.ttyname(self._slave_fd)
+
+        self._replay_event = threading.Event()
+        self._stop_event = threading.Event()
+        self.replay_done = threading.Event()
+
+    def start_replay(self):
+        """ Starts writing the scan stream """
+        self._replay_event.set()
+
+    def stop(self):
+        """ Stops the device and closes the pty """
+        self._stop_event.set()
+        self.join()
+        os.close(self._master_fd)
+        os.close(self._slave_fd)
+
+    def run(self):
+        """
+        Answers commands until the replay starts, then writes the stream while still answering commands
+        """
+        command_buffer = b''
+        scan_index = 0
+        next_burst = None
+
+        while not self._stop_event.is_set():
+            if next_burst is None and self._replay_event.is_set():
+                next_burst = time.perf_counter()
+
+            wait = 0.05
+            if next_burst is not None and scan_index < len(self.scan_stream):
+                wait = max(0.0, next_burst - time.perf_counter())
+
+            readable, _, _ = select.select([self._master_fd], [], [], wait)
+            if readable:
+                try:
+                    command_buffer += os.read(self._master_fd, 1024)
+                except OSError:
+                    # host side closed the port
+                    command_buffer = b''
+                command_buffer = self._answer_commands(command_buffer)
+                continue
+
+            if next_burst is None or scan_index >= len(self.scan_stream):
+                continue
+
+            for _, raw_read in self.scan_stream[scan_index:scan_index + self.burst_size]:
+                self._write_read(raw_read)
+                scan_index += 1
+
+            next_burst += self.burst_size / self.scan_rate
+
+            if scan_index >= len(self.scan_stream):
+                self.replay_done.set()
+
+    def _answer_commands(self, command_buffer: bytes) -> bytes:
+        """
+        ACKs every complete command in the buffer
+        :return: the unfinished tail of the buffer
+        """
+        while COMMAND_START in command_buffer and COMMAND_END in command_buffer:
+            command_start = command_buffer.index(COMMAND_START)
+            command_end = command_buffer.find(COMMAND_END, command_start)
+            if command_end == -1:
+                break
+            os.write(self._master_fd, ACK)
+            command_buffer = command_buffer[command_end + 1:]
+
+        return command_buffer
+
+    def _write_read(self, raw_read: bytes):
+        """
+        Writes one read to the port, sometimes in two chunks
+        """
+        self.sent_times.append(time.perf_counter())
+
+        if self._rng.random() < self.split_rate:
+            split = self._rng.randrange(1, len(raw_read))
+            os.write(self._master_fd, raw_read[:split])
+            time.sleep(0.001)
+            os.write(self._master_fd, raw_read[split:])
+        else:
+            os.write(self._master_fd, raw_read)
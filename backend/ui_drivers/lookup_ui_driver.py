@@ -5,8 +5,16 @@ Date: 04/15/2023
 Description: Command Line interface driver
 """
 
+from __future__ import annotations
+
+import argparse
+import json
+
 from backend.backendDatabase.backendDB import BackEndDB
+from backend.classes.lookup_daemon import *
 from backend.classes.lookup_driver import Lookup
+from backend.classes.lookup_worker import *
+from backend.classes.purchase_rules import *
 
 
 class LookupUI:
@@ -25,13 +33,15 @@ class LookupUI:
     ENTITIES = (CHARACTER_ENTITY, COMIC_ENTITY, CREATOR_ENTITY, EVENT_ENTITY, IMAGE_ENTITY,
                 SERIES_ENTITY, STORY_ENTITY, URL_ENTITY, PURCHASED_COMICS_ENTITY, VARIANT_ENTITY)
 
-    def __init__(self):
+    def __init__(self, purchase_rules: PurchaseRules = None):
         """
         LookupUI Object with db and lookup object
         scanner if scanner mode active
+        :param purchase_rules: answers the purchase and duplicate prompts for headless runs
         """
         self.db = BackEndDB()  # BackEndDB object controller passed to Lookup class
         self.lookup = Lookup(self.db)  # lookup controller
+        self.lookup.purchase_rules = purchase_rules
 
     ####################################################################################################################
     #
@@ -456,6 +466,98 @@ class LookupUI:
         exit(1)
 
 
+def parse_args() -> argparse.Namespace:
+    """
+    python -m backend.ui_drivers.lookup_ui_driver --headless [--format print|digital] [--price 3.99]
+        [--date YYYY-MM-DD] [--not-purchased] [--sidecar purchases.csv] [--duplicates earliest|latest]
+    python -m backend.ui_drivers.lookup_ui_driver --worker [--batch-size 25] [--lease-seconds 600] [--follow]
+        [same purchase rule options]
+    python -m backend.ui_drivers.lookup_ui_driver --daemon [--poll-interval 60] [--daemon-host 0.0.0.0]
+        [--daemon-port 47020] [--batch-size 25] [--lease-seconds 600] [--api-daily-limit 2000]
+        [same purchase rule options]
+    python -m backend.ui_drivers.lookup_ui_driver --daemon-status | --daemon-shutdown [--daemon-host host]
+        [--daemon-port 47020]
+    python -m backend.ui_drivers.lookup_ui_driver --rebuild-summaries
+    :return: the parsed command line
+    """
+    parser = argparse.ArgumentParser(description="Lookup scanned barcodes")
+    parser.add_argument("--headless", action="store_true", help="look up every queued barcode without prompting")
+    parser.add_argument("--worker", action="store_true", help="lease buffer batches alongside other workers")
+    parser.add_argument("--batch-size", type=int, default=WORKER_BATCH_SIZE, help="buffer rows leased per batch")
+    parser.add_argument("--lease-seconds", type=int, default=WORKER_LEASE_SECONDS, help="lease length per batch")
+    parser.add_argument("--follow", action="store_true", help="keep polling the buffer when it is empty")
+    parser.add_argument("--daemon", action="store_true", help="run the resident lookup service")
+    parser.add_argument("--poll-interval", type=int, default=DAEMON_POLL_INTERVAL,
+                        help="seconds between daemon passes when no scanner wakes it")
+    parser.add_argument("--api-daily-limit", type=int, default=DAEMON_DAILY_CALL_LIMIT,
+                        help="Marvel api calls per day the daemon may make, the web app gets the rest of the key's")
+    parser.add_argument("--daemon-host", default=None,
+                        help="address the daemon listens on, or the daemon to ask for its status / shut down")
+    parser.add_argument("--daemon-port", type=int, default=DAEMON_PORT, help="port of the daemon's command socket")
+    parser.add_argument("--daemon-status", action="store_true", help="print the running daemon's status")
+    parser.add_argument("--daemon-shutdown", action="store_true", help="stop the running daemon gracefully")
+    parser.add_argument("--rebuild-summaries", action="store_true",
+                        help="rebuild the purchased comics and series listing summary tables")
+    parser.add_argument("--format", choices=("print", "digital"), default="print", help="default purchase format")
+    parser.add_argument("--price", type=float, default=None, help="default price (cover price if omitted)")
+    parser.add_argument("--date", default=None, help="default YYYY-MM-DD purchase date (on sale date if omitted)")
+    parser.add_argument("--not-purchased", action="store_true", help="don't record the comics as purchased")
+    parser.add_argument("--sidecar", default=None, help="CSV of per barcode purchase overrides")
+    parser.add_argument("--duplicates", choices=("earliest", "latest"), default="earliest",
+                        help="upload date kept for duplicate barcodes")
+    return parser.parse_args()
+
+
+def make_purchase_rules(args: argparse.Namespace) -> PurchaseRules | None:
+    """
+    Builds the PurchaseRules for a headless, worker or daemon run from the command line
+    :param args: parse_args() result
+    :return: the rules, or None to run the interactive menu
+    """
+    if not args.headless and not args.worker and not args.daemon:
+        return None
+
+    return PurchaseRules(
+        is_purchased=not args.not_purchased,
+        purchased_type=DIGITAL_PURCHASE_TYPE if args.format == "digital" else PRINT_PURCHASE_TYPE,
+        purchased_price=args.price,
+        purchased_date=args.date,
+        duplicate_policy=KEEP_LATEST_DUPLICATE if args.duplicates == "latest" else KEEP_EARLIEST_DUPLICATE,
+        sidecar_path=args.sidecar
+    )
+
+
 if __name__ == '__main__':
-    lookup_ui = LookupUI()
-    lookup_ui.start_menu()
+    cli_args = parse_args()
+
+    # talking to a running daemon doesn't need a db connection
+    if cli_args.daemon_status or cli_args.daemon_shutdown:
+        reply = send_daemon_command(STATUS_COMMAND if cli_args.daemon_status else SHUTDOWN_COMMAND,
+                                    cli_args.daemon_host or DAEMON_HOST, cli_args.daemon_port)
+        print(json.dumps(reply, indent=4) if reply is not None else "NO LOOKUP DAEMON RUNNING")
+        exit(0 if reply is not None else 1)
+
+    if cli_args.rebuild_summaries:
+        summary_db = BackEndDB()
+        num_comics, num_series = summary_db.rebuild_purchased_summaries()
+        print(f"REBUILT PURCHASED SUMMARIES: {num_comics} COMICS, {num_series} SERIES")
+        summary_db.close_cursor()
+        exit(0)
+
+    lookup_ui = LookupUI(make_purchase_rules(cli_args))
+
+    if cli_args.daemon:
+        LookupDaemon(lookup_ui.lookup, ApiBudget(cli_args.api_daily_limit, user_reserve=0),
+                     host=cli_args.daemon_host or DAEMON_BIND_HOST, port=cli_args.daemon_port,
+                     poll_interval=cli_args.poll_interval, batch_size=cli_args.batch_size,
+                     lease_seconds=cli_args.lease_seconds).run()
+    elif cli_args.worker:
+        LookupWorker(lookup_ui.lookup, batch_size=cli_args.batch_size, lease_seconds=cli_args.lease_seconds).run(
+            follow=cli_args.follow
+        )
+        lookup_ui.db.close_cursor()
+    elif cli_args.headless:
+        lookup_ui.get_comic_barcodes()
+        lookup_ui.exit_program()
+    else:
+        lookup_ui.start_menu()
@@ -6,6 +6,8 @@ Date: 04/15/2023
 Description: Command Line interface driver
 """
 
+import sys
+
 from backend.backendDatabase.backendDB import BackEndDB
 from backend.classes.scanner_driver import *
 
@@ -13,17 +15,24 @@ SCANNER_INPUT_MODE = '1'
 KEYBOARD_INPUT_MODE = '2'
 QUIT_INPUT_MODE = '3'
 MENU_NAV_MODE = '4'
+MULTI_SCANNER_INPUT_MODE = '5'
+DEFAULT_DEVICE_DRIVER = "/dev/cu.usbmodem141101"
 
 
 class ScannerUI:
     """ UI Driver class that handles menu navigation and control functions """
 
-    def __init__(self):
+    def __init__(self, upload_mode: str = BATCH_UPLOAD_MODE, device_drivers: list[str] = None):
         """
         UI Object with input method (scanner, keyboard, etc) and a serial port
         scanner if scanner mode active
+        :param upload_mode: BATCH_UPLOAD_MODE uploads at the end of the session,
+        WRITE_BEHIND_UPLOAD_MODE uploads in the background while scanning
+        :param device_drivers: serial devices for multiple scanner mode, asked for if None
         """
         self.input_method = None
+        self.upload_mode = upload_mode
+        self.device_drivers = device_drivers
         self.scanner = None  # Defined in ask_scan_mode (dependent on input method)
         self.db = BackEndDB()  # BackEndDB object will be passed to *Scanner class
 
@@ -88,11 +97,12 @@ class ScannerUI:
         """
         Asks the user what mode they would like to enter _barcodes
         """
-        while self.input_method != SCANNER_INPUT_MODE and self.input_method != KEYBOARD_INPUT_MODE and self.input_method != QUIT_INPUT_MODE:
+        while self.input_method not in (SCANNER_INPUT_MODE, KEYBOARD_INPUT_MODE, MULTI_SCANNER_INPUT_MODE, QUIT_INPUT_MODE):
             print(
                 f"How would you like to upload _barcodes?"
                 f"\n\t({SCANNER_INPUT_MODE}) Barcode Scanner"
                 f"\n\t({KEYBOARD_INPUT_MODE}) Keyboard Entry"
+                f"\n\t({MULTI_SCANNER_INPUT_MODE}) Multiple Barcode Scanners"
                 f"\n\t({MENU_NAV_MODE}) Return to Navigation Menu"
                 f"\n\t({QUIT_INPUT_MODE}) Quit"
             )
@@ -100,11 +110,22 @@ class ScannerUI:
 
             # Scanner
             if self.input_method == SCANNER_INPUT_MODE:
-                self.scanner = ScannerBarcodeEntry(self.db, device_driver="/dev/cu.usbmodem141101")
+                self.scanner = ScannerBarcodeEntry(
+                    self.db, device_driver=DEFAULT_DEVICE_DRIVER, upload_mode=self.upload_mode
+                )
+
+            # Multiple Scanners
+            elif self.input_method == MULTI_SCANNER_INPUT_MODE:
+                if not self.device_drivers:
+                    devices_res = input("Enter the scanner serial devices separated by commas:\n>>> ")
+                    self.device_drivers = [device.strip() for device in devices_res.split(',') if device.strip()]
+                self.scanner = MultiScannerBarcodeEntry(
+                    self.db, device_drivers=self.device_drivers, upload_mode=self.upload_mode
+                )
 
             # Keyboard
             elif self.input_method == KEYBOARD_INPUT_MODE:
-                self.scanner = KeyboardBarcodeEntry(self.db)
+                self.scanner = KeyboardBarcodeEntry(self.db, upload_mode=self.upload_mode)
 
             # Quit
             elif self.input_method == QUIT_INPUT_MODE:
@@ -189,11 +210,18 @@ class ScannerUI:
         """
         Prints exit message and quits
         """
+        if self.scanner is not None:
+            self.scanner.close()
         self.db.close_cursor()
         print("Exiting...")
         exit(1)
 
 
 if __name__ == '__main__':
-    ui = ScannerUI()
+    # python -m backend.ui_drivers.scanner_ui_driver [--write-behind] [--devices /dev/ttyACM0,/dev/ttyACM1]
+    devices = None
+    if '--devices' in sys.argv and sys.argv.index('--devices') + 1 < len(sys.argv):
+        devices = sys.argv[sys.argv.index('--devices') + 1].split(',')
+
+    ui = ScannerUI(WRITE_BEHIND_UPLOAD_MODE if '--write-behind' in sys.argv else BATCH_UPLOAD_MODE, devices)
     ui.get_menu_nav()
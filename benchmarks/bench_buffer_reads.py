@@ -0,0 +1,78 @@
+"""
+Author: Zane Miller
+Email: millerzanem@gmail.com
+Date: 10/19/2026
+Description: Benchmarks buffered vs streamed BackEndDB reads of a large scanned_upc_codes style table
+
+Run from the repository root:
+    python -m benchmarks.bench_buffer_reads [num_rows]
+"""
+import sys
+import time
+import tracemalloc
+
+from backend.backendDatabase.backendDB import BackEndDB
+
+BENCH_TABLE = "bench_scanned_upc_codes"
+DEFAULT_NUM_ROWS = 100000
+INSERT_CHUNK_SIZE = 5000
+
+
+def seed_bench_table(db: BackEndDB, num_rows: int):
+    """
+    Creates a scratch copy of scanned_upc_codes and fills it with num_rows fake barcodes
+    :param db: BackEndDB connection
+    :param num_rows: the number of rows to insert
+    """
+    db.cursor.execute(f"DROP TABLE IF EXISTS {BENCH_TABLE};")
+    db.cursor.execute(f"CREATE TABLE {BENCH_TABLE} LIKE scanned_upc_codes;")
+
+    query = f"INSERT INTO {BENCH_TABLE} (upc_code, date_uploaded, updated) VALUES (%s, %s, CURRENT_TIMESTAMP);"
+    for chunk_start in range(0, num_rows, INSERT_CHUNK_SIZE):
+        chunk_end = min(chunk_start + INSERT_CHUNK_SIZE, num_rows)
+        params = [(f"MAV18-{759606000000 + i:012d}00111", '2023-4-21') for i in range(chunk_start, chunk_end)]
+        db.cursor.executemany(query, params)
+        db._commit_to_db()
+
+
+def time_read(db: BackEndDB, stream: bool, as_tuples: bool) -> tuple[int, float, float]:
+    """
+    Reads every row of the bench table the same way Lookup.get_barcodes_from_db consumes the buffer
+    :return: (rows read, elapsed seconds, peak traced MiB)
+    """
+    query = f"SELECT upc_code, date_uploaded FROM {BENCH_TABLE};"
+    queued = {}
+
+    tracemalloc.start()
+    start = time.perf_counter()
+
+    for row in db._fetch_rows(query, stream=stream, as_tuples=as_tuples):
+        upc_code = row[0] if as_tuples else row['upc_code']
+        queued[upc_code[6:]] = upc_code[:5]
+
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return len(queued), elapsed, peak / (1024 * 1024)
+
+
+def main(num_rows: int):
+    db = BackEndDB()
+    print(f"Seeding {BENCH_TABLE} with {num_rows} rows...")
+    seed_bench_table(db, num_rows)
+
+    try:
+        print(f"{'mode':<22}{'rows':>10}{'seconds':>12}{'peak MiB':>12}")
+        for stream in (False, True):
+            for as_tuples in (False, True):
+                mode = ("streamed" if stream else "buffered") + (" tuples" if as_tuples else " dicts")
+                rows, elapsed, peak = time_read(db, stream, as_tuples)
+                print(f"{mode:<22}{rows:>10}{elapsed:>12.3f}{peak:>12.2f}")
+    finally:
+        db.cursor.execute(f"DROP TABLE IF EXISTS {BENCH_TABLE};")
+        db.close_cursor()
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_NUM_ROWS)
@@ -0,0 +1,84 @@
+"""
+Author: Zane Miller
+Email: millerzanem@gmail.com
+Date: 10/19/2026
+Description: Times the comic detail page's data loading: the separate FrontEndDB calls view_comic used to make vs
+FrontEndDB.get_comic_page(), with the number of cursors and queries each needs
+
+Run from the repository root against a populated database:
+    python -m benchmarks.bench_comic_page 12345 [12346 ...] [--repeat 50]
+"""
+import argparse
+import statistics
+import time
+import types
+from unittest import mock
+
+from app import app, f_db as cached_f_db
+from benchmarks.bench_url_queries import RecordingCursor
+
+f_db = cached_f_db.uncached  # time the queries, not the front end cache
+
+
+def load_separately(comic_id: int):
+    """ The FrontEndDB calls view_comic made before get_comic_page() """
+    comic_detail = f_db.get_single_comic_detail(comic_id)
+    if comic_detail.seriesId is not None:
+        f_db.get_single_series_detail(comic_detail.seriesId)
+    f_db.get_comic_stories(comic_id)
+    f_db.get_comic_creators(comic_id)
+    f_db.get_comic_events(comic_id)
+    f_db.get_comic_characters(comic_id)
+    f_db.get_comic_variants(comic_id)
+    f_db.get_comic_images(comic_id)
+
+
+def load_page(comic_id: int):
+    f_db.get_comic_page(comic_id)
+
+
+def count_round_trips(connection, loader, comic_id: int) -> tuple[int, int]:
+    """ :return: (cursors opened, queries executed) by one call of loader """
+    executed = []
+    cursors = []
+
+    def open_cursor():
+        cursors.append(None)
+        return RecordingCursor(connection.cursor(), executed)
+
+    recording_mysql = types.SimpleNamespace(connection=types.SimpleNamespace(cursor=open_cursor))
+    with mock.patch.object(f_db, 'mysql', recording_mysql):
+        loader(comic_id)
+    return len(cursors), len(executed)
+
+
+def time_loader(loader, comic_id: int, repeat: int) -> tuple[float, float]:
+    """ :return: (p50 ms, p95 ms) per call """
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        loader(comic_id)
+        timings.append((time.perf_counter() - start) * 1000)
+
+    if len(timings) < 2:
+        return timings[0], timings[0]
+    return statistics.median(timings), statistics.quantiles(timings, n=20)[18]
+
+
+def main(args: argparse.Namespace):
+    with app.app_context():
+        connection = f_db.mysql.connection
+        print(f"{'comic':<10}{'loader':<12}{'cursors':>9}{'queries':>9}{'p50 ms':>10}{'p95 ms':>10}")
+
+        for comic_id in args.comic_ids:
+            for name, loader in (('separate', load_separately), ('page', load_page)):
+                num_cursors, num_queries = count_round_trips(connection, loader, comic_id)
+                p50, p95 = time_loader(loader, comic_id, args.repeat)
+                print(f"{comic_id:<10}{name:<12}{num_cursors:>9}{num_queries:>9}{p50:>10.2f}{p95:>10.2f}")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Comic detail page loading, separate calls vs get_comic_page()")
+    parser.add_argument("comic_ids", type=int, nargs='+', help="comic ids to load")
+    parser.add_argument("--repeat", type=int, default=50, help="page loads timed per comic and loader")
+    main(parser.parse_args())
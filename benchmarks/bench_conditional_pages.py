@@ -0,0 +1,61 @@
+"""
+Author: Zane Miller
+Email: millerzanem@gmail.com
+Date: 10/19/2026
+Description: Times full page loads vs revalidations (If-None-Match answered with 304) of the comic and series detail
+pages and the /comics and /series listings
+
+Run from the repository root against a populated database (after Resources/sql/005_validator_indexes.sql):
+    python -m benchmarks.bench_conditional_pages --comic 12345 --series 678 [--repeat 50] [--cold]
+"""
+import argparse
+import statistics
+import time
+
+from app import app, f_db
+
+
+def time_requests(client, url: str, headers: dict, repeat: int, cold: bool) -> tuple[float, float, int]:
+    """ :return: (p50 ms, p95 ms, status of the last response) of GET url """
+    timings = []
+    status = None
+    for _ in range(repeat):
+        if cold:
+            f_db.cache.backend.clear()
+        start = time.perf_counter()
+        status = client.get(url, headers=headers).status_code
+        timings.append((time.perf_counter() - start) * 1000)
+
+    if len(timings) < 2:
+        return timings[0], timings[0], status
+    return statistics.median(timings), statistics.quantiles(timings, n=20)[18], status
+
+
+def main(args: argparse.Namespace):
+    urls = ['/comics', '/series', f'/view/comic/{args.comic}']
+    if args.series is not None:
+        urls.append(f'/view/series/{args.series}')
+
+    client = app.test_client()
+    print(f"{'url':<24}{'request':<14}{'status':>8}{'p50 ms':>10}{'p95 ms':>10}")
+
+    for url in urls:
+        etag = client.get(url).headers.get('ETag')
+        kinds = [('full', {})]
+        if etag is not None:
+            kinds.append(('revalidate', {'If-None-Match': etag}))
+        else:
+            print(f"{url:<24}NO ETAG (missing record or written this second)")
+
+        for name, headers in kinds:
+            p50, p95, status = time_requests(client, url, headers, args.repeat, args.cold)
+            print(f"{url:<24}{name:<14}{status:>8}{p50:>10.2f}{p95:>10.2f}")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Full page loads vs 304 revalidations")
+    parser.add_argument("--comic", type=int, required=True, help="comic id of the detail page to load")
+    parser.add_argument("--series", type=int, default=None, help="series id of the detail page to load")
+    parser.add_argument("--repeat", type=int, default=50, help="requests timed per url and kind")
+    parser.add_argument("--cold", action="store_true", help="clear the front end cache before every request")
+    main(parser.parse_args())
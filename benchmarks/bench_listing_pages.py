@@ -0,0 +1,67 @@
+"""
+Author: Zane Miller
+Email: millerzanem@gmail.com
+Date: 10/19/2026
+Description: Times the /comics and /series listings: the full purchased lists they used to load vs keyset pages of
+every sort order, walked from the first page to the last
+
+Run from the repository root against a populated database (after Resources/sql/004_purchased_summaries.sql):
+    python -m benchmarks.bench_listing_pages [--limit 50] [--repeat 20]
+"""
+import argparse
+import statistics
+import time
+
+from app import app, f_db as cached_f_db
+
+f_db = cached_f_db.uncached  # time the queries, not the front end cache
+
+
+def time_ms(func) -> tuple[float, object]:
+    """ :return: (milliseconds, result) of one call """
+    start = time.perf_counter()
+    result = func()
+    return (time.perf_counter() - start) * 1000, result
+
+
+def walk_pages(get_page, sort: str, descending: bool, limit: int) -> list[float]:
+    """ :return: milliseconds per page, following the next cursors from the first page to the last """
+    timings = []
+    after = None
+    while True:
+        elapsed, page = time_ms(lambda: get_page(sort, descending, after, None, limit))
+        timings.append(elapsed)
+        after = page['next']
+        if after is None:
+            return timings
+
+
+def main(args: argparse.Namespace):
+    listings = (
+            ('comics', f_db.get_purchased_comics, f_db.get_purchased_comics_page, f_db.COMIC_SORTS),
+            ('series', f_db.get_purchased_comics_related_series, f_db.get_purchased_series_page, f_db.SERIES_SORTS),
+    )
+
+    with app.app_context():
+        print(f"{'listing':<10}{'loader':<18}{'rows/pages':>12}{'p50 ms':>10}{'p95 ms':>10}{'last ms':>10}")
+
+        for name, get_all, get_page, sorts in listings:
+            timings = [time_ms(get_all) for _ in range(args.repeat)]
+            num_rows = len(timings[0][1])
+            full = sorted(elapsed for elapsed, _ in timings)
+            print(f"{name:<10}{'full list':<18}{num_rows:>12}{statistics.median(full):>10.2f}{full[-1]:>10.2f}")
+
+            for sort in sorts:
+                for descending in (False, True):
+                    timings = walk_pages(get_page, sort, descending, args.limit)
+                    p95 = statistics.quantiles(timings, n=20)[18] if len(timings) > 1 else timings[0]
+                    loader = f"{sort} {'desc' if descending else 'asc'}"
+                    print(f"{name:<10}{loader:<18}{len(timings):>12}{statistics.median(timings):>10.2f}"
+                          f"{p95:>10.2f}{timings[-1]:>10.2f}")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Full purchased listings vs keyset pages")
+    parser.add_argument("--limit", type=int, default=50, help="rows per page")
+    parser.add_argument("--repeat", type=int, default=20, help="full list loads timed")
+    main(parser.parse_args())
@@ -0,0 +1,100 @@
+"""
+Author: Zane Miller
+Email: millerzanem@gmail.com
+Date: 10/19/2026
+Description: Construction time and memory of the front end models on a full /comics listing: the __dict__ models
+with eagerly decoded descriptions they replaced vs the __slots__ models
+
+Run from the repository root against a populated database:
+    python -m benchmarks.bench_models [--rows 20000] [--repeat 5]
+"""
+import argparse
+import itertools
+import time
+import tracemalloc
+
+from app import app, f_db
+from app.frontendModels.Comic import FrontEndComic
+
+LISTING_QUERY = \
+    "SELECT PC.*, C.*, I.pathExtension as thumbnailExtension " \
+    "FROM PurchasedComics PC " \
+    "INNER JOIN Comics C " \
+    "ON C.id = PC.comicId " \
+    "INNER JOIN Images I " \
+    "ON C.thumbnail = I.path;"
+
+
+class LegacyFrontEndComic:
+    """ FrontEndEntity/FrontEndComic before __slots__: one setattr per column into __dict__, descriptions decoded """
+
+    def __init__(self, entity_detail_dict):
+        self.id = None
+        self.title = None
+        self.description = None
+        self.seriesId = None
+        self.variantDescription = None
+        self.purchaseDate = None
+        self.purchaseType = None
+        self.purchasePrice = None
+        self.isPurchased = None
+        self.textObjects = {}
+
+        self.ENTITY = None
+
+        for key in entity_detail_dict:
+            setattr(self, key, entity_detail_dict[key])
+
+        if self.description:
+            self.description = self.description.decode()
+        if self.variantDescription:
+            self.variantDescription = self.variantDescription.decode()
+
+        if self.purchaseDate and self.purchaseType and self.purchasePrice:
+            self.isPurchased = True
+
+        self.ENTITY = "Comics"
+
+
+def measure(model, rows: list[dict], repeat: int) -> tuple[float, float]:
+    """ :return: (best construction ms, MiB held by the built models) for the whole listing """
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        [model(row) for row in rows]
+        best = min(best, (time.perf_counter() - start) * 1000)
+
+    tracemalloc.start()
+    models = [model(row) for row in rows]
+    size = tracemalloc.get_traced_memory()[0] / 2 ** 20
+    tracemalloc.stop()
+    del models
+
+    return best, size
+
+
+def main(args: argparse.Namespace):
+    with app.app_context():
+        cursor = f_db.uncached.mysql.connection.cursor()
+        cursor.execute(LISTING_QUERY, ())
+        rows = list(cursor)
+
+    if not rows:
+        print("NO PURCHASED COMICS TO BUILD")
+        return
+    if args.rows:
+        # repeat the collection to the requested size
+        rows = list(itertools.islice(itertools.cycle(rows), args.rows))
+
+    print(f"{len(rows)} ROWS OF {len(rows[0])} COLUMNS")
+    print(f"{'model':<12}{'build ms':>10}{'us/row':>9}{'MiB':>9}")
+    for name, model in (('legacy', LegacyFrontEndComic), ('slots', FrontEndComic)):
+        build_ms, size = measure(model, rows, args.repeat)
+        print(f"{name:<12}{build_ms:>10.1f}{build_ms * 1000 / len(rows):>9.2f}{size:>9.2f}")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Front end model construction time and memory on a full listing")
+    parser.add_argument("--rows", type=int, default=None, help="repeat the listing rows up to this many")
+    parser.add_argument("--repeat", type=int, default=5, help="builds timed per model, the best is reported")
+    main(parser.parse_args())
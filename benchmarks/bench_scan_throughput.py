@@ -0,0 +1,136 @@
+"""
+Author: Zane Miller
+Email: millerzanem@gmail.com
+Date: 10/19/2026
+Description: Benchmarks ScannerBarcodeEntry.enter_marvel_barcodes against a simulated DE2120 on a pty
+
+Run from the repository root (POSIX only):
+    python -m benchmarks.bench_scan_throughput --scans 2000 --rate 50 --burst 5 --misread 0.02 --short 0.02
+    python -m benchmarks.bench_scan_throughput --devices 3 --scans 1000 --rate 20
+"""
+import argparse
+import contextlib
+import io
+import os
+import statistics
+import tempfile
+import time
+from unittest import mock
+
+from backend.backendDatabase.backendDB import BackEndDB
+from backend.classes.scan_spool import ScanSpool
+from backend.classes.scanner_driver import MAV18_LENGTH, ScannerBarcodeEntry
+from backend.classes.simulated_de2120 import VALID_SCAN, SimulatedDE2120, build_scan_stream
+
+BENCH_IDLE_TIMEOUT = 1
+
+
+class TimedScannerBarcodeEntry(ScannerBarcodeEntry):
+    """ ScannerBarcodeEntry that records when each barcode reaches the scanned_barcodes buffer """
+
+    def __init__(self, *args, **kwargs):
+        self.added_times = {}
+        super().__init__(*args, **kwargs)
+
+    def _add_scanned_barcode(self, formatted_barcode: str) -> bool:
+        added = super()._add_scanned_barcode(formatted_barcode)
+        if added:
+            self.added_times[formatted_barcode] = time.perf_counter()
+        return added
+
+
+def run_benchmark(args: argparse.Namespace):
+    devices = []
+    for device_no in range(args.devices):
+        seed = None if args.seed is None else args.seed + device_no
+        scan_stream = build_scan_stream(
+            args.scans, short_rate=args.short, upc_only_rate=args.upc_only, misread_rate=args.misread, seed=seed
+        )
+        devices.append(
+            SimulatedDE2120(scan_stream, scan_rate=args.rate, burst_size=args.burst, split_rate=args.split, seed=seed)
+        )
+
+    for device in devices:
+        device.start()
+
+    with tempfile.TemporaryDirectory() as spool_dir:
+        spool = ScanSpool(os.path.join(spool_dir, "bench_spool.sqlite3"))
+        db = BackEndDB()
+
+        scanner = TimedScannerBarcodeEntry(db, device_driver=[device.port for device in devices], spool=spool)
+        scanner.idle_timeout = BENCH_IDLE_TIMEOUT
+
+        # answer the idle prompt with (q) once the streams have been replayed
+        for device in devices:
+            device.start_replay()
+        with mock.patch('builtins.input', return_value='q'), contextlib.redirect_stdout(io.StringIO()):
+            scanner.enter_marvel_barcodes()
+
+        scanner.close()
+        spool.close()
+        db.close_cursor()
+
+    for device in devices:
+        device.stop()
+
+    report(
+        [scan for device in devices for scan in device.scan_stream],
+        [sent_time for device in devices for sent_time in device.sent_times],
+        scanner.added_times
+    )
+    scanner.print_rejection_report()
+    scanner.print_device_report()
+
+
+def report(scan_stream: list, sent_times: list[float], added_times: dict[str, float]):
+    """
+    Prints throughput, scan-to-buffer latency percentiles and drop counts. Misreads confined to the add-on's issue
+    digits can't be caught, so some invalid reads may still be accepted.
+    """
+    latencies_ms = []
+    valid_sent = 0
+    invalid_sent = 0
+    invalid_accepted = 0
+
+    for (scan_kind, raw_read), sent_time in zip(scan_stream, sent_times):
+        formatted_barcode = ScannerBarcodeEntry.format_marvel_barcode(raw_read[:MAV18_LENGTH].decode(errors='replace'))
+
+        if scan_kind == VALID_SCAN:
+            valid_sent += 1
+            if formatted_barcode in added_times:
+                latencies_ms.append((added_times[formatted_barcode] - sent_time) * 1000)
+        else:
+            invalid_sent += 1
+            if formatted_barcode in added_times:
+                invalid_accepted += 1
+
+    print(f"{'valid reads sent':<28}{valid_sent:>10}")
+    print(f"{'valid reads buffered':<28}{len(latencies_ms):>10}")
+    print(f"{'dropped scans':<28}{valid_sent - len(latencies_ms):>10}")
+    print(f"{'invalid reads sent':<28}{invalid_sent:>10}")
+    print(f"{'invalid reads accepted':<28}{invalid_accepted:>10}")
+
+    if len(latencies_ms) < 2:
+        return
+
+    elapsed = max(added_times.values()) - min(sent_times)
+    percentiles = statistics.quantiles(latencies_ms, n=100)
+    print(f"{'scans/sec':<28}{len(latencies_ms) / elapsed:>10.1f}")
+    print(f"{'latency p50 ms':<28}{percentiles[49]:>10.2f}")
+    print(f"{'latency p95 ms':<28}{percentiles[94]:>10.2f}")
+    print(f"{'latency p99 ms':<28}{percentiles[98]:>10.2f}")
+    print(f"{'latency max ms':<28}{max(latencies_ms):>10.2f}")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Scan throughput against a simulated DE2120")
+    parser.add_argument("--devices", type=int, default=1, help="number of simulated scanners")
+    parser.add_argument("--scans", type=int, default=1000, help="number of reads to replay per scanner")
+    parser.add_argument("--rate", type=float, default=20.0, help="average reads per second")
+    parser.add_argument("--burst", type=int, default=1, help="reads written back to back")
+    parser.add_argument("--short", type=float, default=0.0, help="fraction of 17 byte reads")
+    parser.add_argument("--upc-only", type=float, default=0.0, help="fraction of reads missing the add-on")
+    parser.add_argument("--misread", type=float, default=0.0, help="fraction of garbled 18 byte reads")
+    parser.add_argument("--split", type=float, default=0.0, help="fraction of reads written in two chunks")
+    parser.add_argument("--seed", type=int, default=None, help="random seed")
+    run_benchmark(parser.parse_args())
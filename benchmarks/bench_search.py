@@ -0,0 +1,49 @@
+"""
+Author: Zane Miller
+Email: millerzanem@gmail.com
+Date: 10/19/2026
+Description: Builds the /search index from the database and times queries against it: exact words, prefixes and
+words with a typo
+
+Run from the repository root against a populated database:
+    python -m benchmarks.bench_search ["amazing spider" "spdier" ...] [--repeat 100]
+"""
+import argparse
+import statistics
+import time
+
+from app import app, f_db
+from app.frontendDatabase.searchIndex import SearchIndex
+
+DEFAULT_QUERIES = ("spider-man", "amazing spider", "spid", "spdier man", "x-men", "wolverine 1", "stan lee", "venom")
+
+
+def main(args: argparse.Namespace):
+    search_index = SearchIndex(f_db.uncached, refresh_interval=3600)
+
+    with app.app_context():
+        start = time.perf_counter()
+        search_index.refresh()
+        build_seconds = time.perf_counter() - start
+
+    stats = search_index.get_stats()
+    print(f"INDEX BUILT IN {build_seconds:.2f}s: {stats['documents']}, {stats['tokens']} TOKENS")
+    print(f"{'query':<24}{'matches':>10}{'p50 ms':>10}{'p95 ms':>10}")
+
+    for query in args.queries or DEFAULT_QUERIES:
+        timings = []
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            results = search_index.search(query)
+            timings.append((time.perf_counter() - start) * 1000)
+
+        matches = sum(entity_results['total'] for entity_results in results.values())
+        p95 = statistics.quantiles(timings, n=20)[18] if len(timings) > 1 else timings[0]
+        print(f"{query:<24}{matches:>10}{statistics.median(timings):>10.2f}{p95:>10.2f}")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Search index build time and query latency")
+    parser.add_argument("queries", nargs='*', help="queries to time, defaults to a few titles, prefixes and typos")
+    parser.add_argument("--repeat", type=int, default=100, help="searches timed per query")
+    main(parser.parse_args())
@@ -0,0 +1,189 @@
+"""
+Author: Zane Miller
+Email: millerzanem@gmail.com
+Date: 10/19/2026
+Description: Compares the correlated url subqueries the detail pages used to run (six per row) with FrontEndDB's bulk
+*_has_URLs fetch: mean time per call, queries run and their EXPLAIN plans
+
+Run from the repository root against a populated database:
+    python -m benchmarks.bench_url_queries --comic 12345 [--series 678] [--repeat 50] [--explain]
+"""
+import argparse
+import statistics
+import time
+import types
+from unittest import mock
+
+from app import app, f_db as cached_f_db
+
+f_db = cached_f_db.uncached  # time the queries, not the front end cache
+
+LEGACY_URL_TYPES = (
+        ('purchase', 'purchaseURL'), ('detail', 'detailURL'), ('comiclink', 'comicLink'),
+        ('reader', 'readerURL'), ('inAppLink', 'inAppLink'), ('wiki', 'wiki'),
+)
+
+
+def correlated_urls(url_table: str, id_column: str, owner_id: str) -> str:
+    """ The six correlated url subqueries the detail queries selected for every row """
+    return ", ".join(
+            f"(SELECT hUL.url FROM {url_table} hUL LEFT JOIN URLs UL ON hUL.url = UL.url "
+            f"WHERE hUL.{id_column} = {owner_id} AND UL.type = '{url_type}') as {column}"
+            for url_type, column in LEGACY_URL_TYPES
+    )
+
+
+# FrontEndDB method -> the queries it ran before the bulk url fetch
+LEGACY_QUERIES = {
+        'get_comic_characters'    : [
+                f"SELECT Cha.*, I.pathExtension as thumbnailExtension, "
+                f"{correlated_urls('Characters_has_URLs', 'characterId', 'ChCha.characterId')} "
+                f"FROM Comics_has_Characters ChCha LEFT JOIN Characters Cha on ChCha.characterId = Cha.id "
+                f"LEFT JOIN Images I on Cha.thumbnail = I.path WHERE ChCha.comicId=%s;",
+        ],
+        'get_comic_creators'      : [
+                "SELECT ChCr.creatorRole as role, Cr.*, I.pathExtension as thumbnailExtension "
+                "FROM Comics_has_Creators ChCr INNER JOIN Creators Cr ON ChCr.creatorId = Cr.id "
+                "LEFT JOIN Images I ON Cr.thumbnail = I.path WHERE ChCr.comicId=%s;",
+                f"SELECT ChCr.creatorId, {correlated_urls('Creators_has_URLs', 'creatorId', 'ChCr.creatorId')} "
+                f"FROM Comics_has_Creators ChCr WHERE ChCr.comicId=%s;",
+        ],
+        'get_single_comic_detail' : [
+                "SELECT Comics.*, PurchasedComics.*, Images.pathExtension AS thumbnailExtension FROM Comics "
+                "LEFT JOIN Images ON Comics.thumbnail = Images.path "
+                "LEFT JOIN PurchasedComics ON Comics.id = PurchasedComics.comicId WHERE Comics.id=%s;",
+                f"SELECT {correlated_urls('Comics_has_URLs', 'comicId', 'C.id')} FROM Comics C WHERE C.id=%s;",
+        ],
+        'get_comic_events'        : [
+                f"SELECT E.*, I.pathExtension as thumbnailExtension, "
+                f"{correlated_urls('Events_has_URLs', 'eventId', 'ChE.eventId')} "
+                f"FROM Comics_has_Events ChE LEFT JOIN Events E on ChE.eventId = E.id "
+                f"LEFT JOIN Images I on E.thumbnail = I.path WHERE ChE.comicId=%s;",
+        ],
+        'get_comic_variants'      : [
+                "SELECT C.*, I.pathExtension as thumbnailExtension FROM Comics_has_Variants ChV "
+                "INNER JOIN Comics C on ChV.variantId = C.id LEFT JOIN Images I on C.thumbnail = I.path "
+                "WHERE ChV.comicId = %s;",
+                f"SELECT ChV.variantId, {correlated_urls('Comics_has_URLs', 'comicId', 'ChV.variantId')} "
+                f"FROM Comics_has_Variants ChV WHERE ChV.comicId=%s;",
+        ],
+        'get_single_series_detail': [
+                f"SELECT S.*, Images.pathExtension AS thumbnailExtension, "
+                f"{correlated_urls('Series_has_URLs', 'seriesId', 'S.id')} "
+                f"FROM Series S LEFT JOIN Images ON S.thumbnail = Images.path WHERE S.id=%s;",
+        ],
+        'get_series_characters'   : [
+                f"SELECT Cha.*, I.pathExtension as thumbnailExtension, "
+                f"{correlated_urls('Characters_has_URLs', 'characterId', 'ShCha.characterId')} "
+                f"FROM Series_has_Characters ShCha LEFT JOIN Characters Cha on ShCha.characterId = Cha.id "
+                f"LEFT JOIN Images I on Cha.thumbnail = I.path WHERE ShCha.seriesId=%s;",
+        ],
+        'get_series_events'       : [
+                f"SELECT E.*, I.pathExtension as thumbnailExtension, "
+                f"{correlated_urls('Events_has_URLs', 'eventId', 'ShE.eventId')} "
+                f"FROM Series_has_Events ShE LEFT JOIN Events E on ShE.eventId = E.id "
+                f"LEFT JOIN Images I on E.thumbnail = I.path WHERE ShE.seriesId=%s;",
+        ],
+}
+COMIC_METHODS = ('get_comic_characters', 'get_comic_creators', 'get_single_comic_detail', 'get_comic_events',
+                 'get_comic_variants')
+SERIES_METHODS = ('get_single_series_detail', 'get_series_characters', 'get_series_events')
+
+
+class RecordingCursor:
+    """ Passes everything through to a real cursor and keeps the queries run on it """
+
+    def __init__(self, cursor, executed: list):
+        self._cursor = cursor
+        self._executed = executed
+
+    def execute(self, query, params=None):
+        self._executed.append((query, params))
+        return self._cursor.execute(query, params)
+
+    def __iter__(self):
+        return iter(self._cursor)
+
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+
+
+def run_legacy(connection, method: str, entity_id: int):
+    cursor = connection.cursor()
+    for query in LEGACY_QUERIES[method]:
+        cursor.execute(query, (entity_id,))
+        cursor.fetchall()
+
+
+def record_bulk_queries(connection, method: str, entity_id: int) -> list[tuple]:
+    """ Runs the FrontEndDB method once and returns the (query, params) it executed """
+    executed = []
+    recording_mysql = types.SimpleNamespace(
+            connection=types.SimpleNamespace(cursor=lambda: RecordingCursor(connection.cursor(), executed))
+    )
+    with mock.patch.object(f_db, 'mysql', recording_mysql):
+        getattr(f_db, method)(entity_id)
+    return executed
+
+
+def time_calls(func, repeat: int) -> float:
+    """ :return: mean milliseconds per call """
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.fmean(timings)
+
+
+def explain(connection, queries: list[tuple]) -> tuple[int, int]:
+    """
+    :return: (dependent subqueries, estimated rows examined) summed over the EXPLAIN of every query
+    """
+    cursor = connection.cursor()
+    dependent = 0
+    rows = 0
+    for query, params in queries:
+        cursor.execute("EXPLAIN " + query, params)
+        for plan_row in cursor.fetchall():
+            dependent += plan_row['select_type'] == 'DEPENDENT SUBQUERY'
+            rows += plan_row['rows'] or 0
+    return dependent, rows
+
+
+def main(args: argparse.Namespace):
+    methods = [(method, args.comic) for method in COMIC_METHODS]
+    if args.series is not None:
+        methods += [(method, args.series) for method in SERIES_METHODS]
+
+    with app.app_context():
+        connection = f_db.mysql.connection
+
+        header = f"{'method':<26}{'before ms':>11}{'after ms':>11}{'queries':>10}"
+        if args.explain:
+            header += f"{'dep. subq':>12}{'rows est.':>14}"
+        print(header)
+
+        for method, entity_id in methods:
+            legacy_queries = [(query, (entity_id,)) for query in LEGACY_QUERIES[method]]
+            bulk_queries = record_bulk_queries(connection, method, entity_id)
+
+            before = time_calls(lambda: run_legacy(connection, method, entity_id), args.repeat)
+            after = time_calls(lambda: getattr(f_db, method)(entity_id), args.repeat)
+            line = f"{method:<26}{before:>11.2f}{after:>11.2f}{f'{len(legacy_queries)}->{len(bulk_queries)}':>10}"
+
+            if args.explain:
+                legacy_dependent, legacy_rows = explain(connection, legacy_queries)
+                bulk_dependent, bulk_rows = explain(connection, bulk_queries)
+                line += f"{f'{legacy_dependent}->{bulk_dependent}':>12}{f'{legacy_rows}->{bulk_rows}':>14}"
+
+            print(line)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Correlated url subqueries vs the bulk *_has_URLs fetch")
+    parser.add_argument("--comic", type=int, required=True, help="comic id to load the detail page queries for")
+    parser.add_argument("--series", type=int, default=None, help="series id for the series page queries")
+    parser.add_argument("--repeat", type=int, default=50, help="calls timed per method")
+    parser.add_argument("--explain", action="store_true", help="also EXPLAIN the queries of both versions")
+    main(parser.parse_args())
@@ -1,5 +1,8 @@
+import os
+
 import keys.db_credentials
 import keys.private_keys
+from backend.classes.lookup_scheduler import APP_DAILY_CALL_LIMIT
 
 
 class Config:
@@ -9,3 +12,19 @@ class Config:
     MYSQL_DB = keys.db_credentials.db
     MYSQL_CURSORCLASS = 'DictCursor'
     SECRET_KEY = keys.private_keys.secret_key
+    # read-through cache of the FrontEndDB pages, see app/frontendDatabase/frontendCache.py
+    FRONTEND_CACHE_TTL = 300
+    FRONTEND_CACHE_ENTRIES = 1024
+    FRONTEND_CACHE_MEMCACHED = None  # 'host:port' of a memcached daemon shared by several app processes
+    # seconds between /search index checks for records updated by other processes (lookup daemon, workers)
+    SEARCH_REFRESH_INTERVAL = 30
+    # Marvel api calls per day the refresh scheduler may make. The lookup daemon spends the same key, so it gets the
+    # rest of the key's limit (--api-daily-limit); keep the two adding up to it
+    LOOKUP_API_DAILY_LIMIT = APP_DAILY_CALL_LIMIT
+    # part of the page ETags along with the templates' contents, bump it when a view change alters the pages
+    PAGE_VERSION = 1
+    # local cover images served by /covers, see app/frontendDatabase/coverStore.py
+    COVER_STORE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'Resources', 'covers')
+    COVER_STORE_HOSTS = ('i.annihil.us',)
+    COVER_PREFETCH_WORKERS = 4
+    COVER_PREFETCH_ON_START = True  # run.py stores every size of the purchased covers in the background at startup
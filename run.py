@@ -1,3 +1,13 @@
-from app import app
+import os
+
+from app import app, cover_store, f_db, search_index
+from app.frontendDatabase.coverStore import purchased_cover_keys
+
+# the debug reloader runs this file in its watcher process too, only the process serving requests loads
+if os.environ.get('WERKZEUG_RUN_MAIN') == 'true':
+    search_index.start_loading(app)
+    if app.config['COVER_PREFETCH_ON_START']:
+        cover_store.start_prefetch(app, lambda: purchased_cover_keys(f_db.uncached),
+                                   app.config['COVER_PREFETCH_WORKERS'])
 
 app.run(debug=True, host='0.0.0.0', port=5011)